@@ -5,8 +5,12 @@
 Run the full ETL process for all companies in the input files
 """
 
+import logging
 import os
 from src.api_clients.xiniu_api_client import process_excel_file
+from src.utils.structured_logging import configure_logging
+
+logger = logging.getLogger(__name__)
 
 def main():
     """
@@ -17,15 +21,16 @@ def main():
     # Get all Excel files in the input directory
     input_files = [f for f in os.listdir(input_dir) if f.endswith('.xlsx') and not f.startswith('~$')]
     
-    print(f"Found {len(input_files)} Excel files to process")
+    logger.info("Found %d Excel files to process", len(input_files))
     
     # Process each file
     for file_name in input_files:
         input_file = os.path.join(input_dir, file_name)
-        print(f"\nProcessing file: {file_name}")
+        logger.info("Processing file: %s", file_name)
         process_excel_file(input_file)
         
-    print("\nAll files processed successfully!")
+    logger.info("All files processed successfully!")
 
 if __name__ == "__main__":
+    configure_logging()
     main()
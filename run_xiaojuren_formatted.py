@@ -8,9 +8,10 @@ without using the Metaso API with formatted funding history
 
 import os
 import sys
+import argparse
 import importlib.util
+import logging
 import pandas as pd
-from openpyxl.styles import Alignment, Border, Side
 import json
 import requests
 import asyncio
@@ -28,17 +29,87 @@ spec = importlib.util.spec_from_file_location("xiniu_api_client",
 xiniu_api_client = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(xiniu_api_client)
 
-async def query_metaso_async(company_name, session):
+from src.utils.response_cache import get_cache
+from src.utils.rate_limiter import get_rate_limiter, MAX_THROTTLE_RETRIES
+from src.utils.metrics import DEFAULT_EXPORT_INTERVAL, MetricsExporter, get_metrics
+from src.utils.run_journal import RunJournal, journal_path_for, read_journal, completed_rows
+from src.utils.single_flight import SingleFlight, normalize_company_name
+from src.utils.name_resolution import NameResolver, get_name_map
+from src.utils.company_identity import get_identity_index
+from src.utils.sse_json import read_sse_json_async
+from src.utils.deallog_index import DeallogIndex
+from src.utils.peer_fund_matcher import PeerFundMatcher, load_peer_fund_aliases
+from src.utils.funding_analytics import FUNDING_FLAG_COLUMNS, derive_funding_flags
+from src.utils.workbook_reader import read_workbook, sheet_names
+from src.utils.excel_writer import write_formatted_workbook
+from src.utils.output_sinks import STREAMING_SINKS, ExcelSink, ReorderBuffer, SinkGroup, make_sink
+from src.utils.parquet_store import parquet_available, store_path_for, write_company_store
+from src.utils.cassettes import DEFAULT_REPLAY_TIMING, REPLAY_TIMINGS, CassetteServer, CassetteStore
+from src.utils.structured_logging import LOG_FORMATS, configure_logging
+from src.utils.tracing import span, start_tracing, stop_tracing
+from src.utils.resilience import (
+    RETRY_MARKER,
+    RETRYABLE_STATUS,
+    RetryableError,
+    call_with_retry_async,
+    has_retry_marker
+)
+
+logger = logging.getLogger(__name__)
+
+# Row ranges to process for each sheet (0-based, end exclusive)
+SHEET_RANGES = {
+    '第一批': (238, 248),    # Rows 239-248
+    '第二批': (1694, 1744),  # Rows 1695-1744
+    '第三批': (2881, 2931),  # Rows 2882-2931
+    '第四批': (3500, 4357),  # Rows 3501-4357
+    '第五批': (3500, 3671),  # Rows 3501-3671
+    '第六批': (2962, 3012),  # Rows 2963-3012
+}
+
+# Metaso answers stream for a while, so only bound the connect and idle-read time
+METASO_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=60)
+
+# Maximum number of companies processed at the same time within one sheet
+ROW_CONCURRENCY = 20
+
+# Finished rows released to the output sinks (and their funding flags derived) per batch
+OUTPUT_BATCH_ROWS = 200
+
+# Estimated API calls behind one company lookup (Xiniu ID + get_2 + 4 sub-requests, 2 Metaso in split mode)
+CALLS_PER_LOOKUP = 8
+
+# How the Metaso facts are asked for: 'split' sends the parent-company and
+# stock-reform prompts as two searches, 'combined' (opt-in) asks for all four fields in one
+METASO_MODES = ('split', 'combined')
+DEFAULT_METASO_MODE = 'split'
+PARENT_COMPANY_FIELDS = ("母公司名称", "母公司是否上市")
+STOCK_REFORM_FIELDS = ("是否是股份公司", "股改时间")
+
+# Shared company lookups, deduplicated across all sheets of a run
+company_lookups = SingleFlight()
+
+# Columns added to every processed sheet
+NEW_COLUMNS = ['成立时间', '是否上市', '母公司', '母公司是否上市', '融资历史', 'Peer Fund',
+               '某一年融资超2次', '单轮3家以上fund', '2家以上Peer Fund', '已在Deal List',
+               '行业属性', '赛道名称', '产品/公司介绍', '创始人信息', '是否是股份公司', '股改时间']
+
+async def search_metaso_async(question, session, company_name):
     """
-    Query the Metaso API for company information and return structured data
-    
+    Send a question to the Metaso search API and parse the JSON answer
+
+    Parsed answers are served from and stored in the shared response cache.
+
     Args:
-        company_name (str): Name of the company to query
+        question (str): Rendered prompt
         session (aiohttp.ClientSession): Async HTTP session
+        company_name (str): Company the question is about (for log messages)
     Returns:
-        dict: Dictionary containing parent company name and listing status
+        dict: Parsed JSON answer, or None if the request or parsing failed
+    Raises:
+        RetryableError: The search kept failing transiently or its circuit breaker is open
     """
-    url = "https://metaso.cn/api/open/search"
+    url = xiniu_api_client.METASO_SEARCH_URL
     
     # Get API key from environment variable
     metaso_key = os.getenv('METASO_SECRET_KEY')
@@ -51,64 +122,90 @@ async def query_metaso_async(company_name, session):
         "Connection": "keep-alive",
         "secret-key": metaso_key
     }
+    
+    data = {
+        "question": question,
+        "lang": "zh"
+    }
+    
+    metrics = get_metrics()
+    cache = get_cache()
+    if cache is not None:
+        # SQLite reads and commits run in a worker thread so they do not stall the event loop
+        cached = await asyncio.to_thread(cache.get, 'metaso/search', data)
+        metrics.record_cache('metaso', 'search', cached is not None)
+        if cached is not None:
+            return cached
+    
+    rate_limiter = get_rate_limiter()
+    
+    async def send():
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            await rate_limiter.acquire_async('metaso', 'search')
+            
+            # Make async API call; the timing covers reading the streamed answer
+            with metrics.request('metaso', 'search') as call:
+                async with session.post(url, headers=headers, json=data, timeout=METASO_TIMEOUT) as response:
+                    call.status = response.status
+                    if response.status == 429:
+                        rate_limiter.throttled('metaso', 'search', response.headers.get('Retry-After'))
+                        if attempt < MAX_THROTTLE_RETRIES:
+                            continue
+                    if response.status in RETRYABLE_STATUS:
+                        response.raise_for_status()
+                    if response.status != 200:
+                        logger.warning("Metaso API request failed for %s with status %s", company_name, response.status)
+                        return None
+                    
+                    # Stop reading as soon as the answer's JSON object is complete;
+                    # leaving the block closes the rest of the stream
+                    try:
+                        return await read_sse_json_async(response.content)
+                    except json.JSONDecodeError as e:
+                        logger.warning("Error parsing Metaso answer for %s: %s", company_name, e)
+                        logger.debug("Raw Metaso answer: %s", e.doc)
+                        return None
+                    finally:
+                        call.bytes = response.content.total_bytes
+    
+    # A search is read-only, so transient failures (including a broken stream) are retried
+    result = await call_with_retry_async(send, 'metaso', 'search')
+    
+    if cache is not None and isinstance(result, dict):
+        await asyncio.to_thread(cache.set, 'metaso/search', data, result)
+    return result
 
+async def query_metaso_async(company_name, session):
+    """
+    Query the Metaso API for company information and return structured data
+    
+    Args:
+        company_name (str): Name of the company to query
+        session (aiohttp.ClientSession): Async HTTP session
+    Returns:
+        dict: Dictionary containing parent company name and listing status
+    """
     try:
         # Load and render template
         template = template_env.get_template('parent_company_prompt.j2')
         question = template.render(company_name=company_name)
         
-        data = {
-            "question": question,
-            "lang": "zh"
-        }
-        
-        # Make async API call
-        async with session.post(url, headers=headers, json=data) as response:
-            if response.status == 200:
-                full_response = ""
-                # Read the response as a stream
-                async for line in response.content:
-                    decoded_line = line.decode('utf-8')
-                    if decoded_line.startswith("data:") and not decoded_line.startswith("data:[DONE]"):
-                        try:
-                            json_str = decoded_line[5:]  # Remove "data:" prefix
-                            data = json.loads(json_str)
-                            if data.get("type") == "append-text":
-                                full_response += data.get("text", "")
-                        except json.JSONDecodeError:
-                            continue
-                
-                try:
-                    # Clean up the response string to ensure it's valid JSON
-                    full_response = full_response.strip()
-                    if full_response.startswith('```json'):
-                        full_response = full_response[7:]  # Remove ```json
-                    if full_response.endswith('```'):
-                        full_response = full_response[:-3]  # Remove ```
-                    full_response = full_response.strip()
-                    
-                    # Parse the JSON response
-                    result = json.loads(full_response)
-                    return result
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing JSON response: {e}")
-                    print(f"Raw response: {full_response}")
-                    return {
-                        "母公司名称": "NULL",
-                        "母公司是否上市": "NULL"
-                    }
-            else:
-                print(f"Metaso API request failed for {company_name} with status {response.status}")
-                return {
-                    "母公司名称": "NULL",
-                    "母公司是否上市": "NULL"
-                }
-    except Exception as e:
-        print(f"Error querying Metaso API for {company_name}: {e}")
+        with span('metaso parent company', cat='metaso'):
+            result = await search_metaso_async(question, session, company_name)
+        if result is not None:
+            return result
+    except RetryableError as e:
+        logger.warning("Retryable error querying Metaso API for %s: %s", company_name, e)
         return {
-            "母公司名称": "NULL",
-            "母公司是否上市": "NULL"
+            "母公司名称": RETRY_MARKER,
+            "母公司是否上市": RETRY_MARKER
         }
+    except Exception as e:
+        logger.warning("Error querying Metaso API for %s: %s", company_name, e)
+    return {
+        "母公司名称": "NULL",
+        "母公司是否上市": "NULL"
+    }
 
 async def query_stock_reform_async(company_name, session):
     """
@@ -120,122 +217,116 @@ async def query_stock_reform_async(company_name, session):
     Returns:
         dict: Dictionary containing whether it's a joint-stock company and its stock reform time
     """
-    url = "https://metaso.cn/api/open/search"
-    
-    # Get API key from environment variable
-    metaso_key = os.getenv('METASO_SECRET_KEY')
-    if not metaso_key:
-        raise ValueError("METASO_SECRET_KEY environment variable is not set")
-        
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "text/event-stream",
-        "Connection": "keep-alive",
-        "secret-key": metaso_key
-    }
-
     try:
         # Load and render template
         template = template_env.get_template('stock_reform_prompt.j2')
         question = template.render(company_name=company_name)
         
-        data = {
-            "question": question,
-            "lang": "zh"
+        with span('metaso stock reform', cat='metaso'):
+            result = await search_metaso_async(question, session, company_name)
+        if result is not None:
+            return result
+    except RetryableError as e:
+        logger.warning("Retryable error querying Metaso API for %s: %s", company_name, e)
+        return {
+            "是否是股份公司": RETRY_MARKER,
+            "股改时间": RETRY_MARKER
         }
+    except Exception as e:
+        logger.warning("Error querying Metaso API for %s: %s", company_name, e)
+    return {
+        "是否是股份公司": "NULL",
+        "股改时间": "NULL"
+    }
+
+async def query_company_facts_async(company_name, session):
+    """
+    Query the parent company and stock reform facts with one Metaso search
+    
+    Args:
+        company_name (str): Name of the company to query
+        session (aiohttp.ClientSession): Async HTTP session
+    Returns:
+        tuple: (parent_info, stock_info) in the same shape as query_metaso_async
+            and query_stock_reform_async return them
+    """
+    try:
+        # Load and render template
+        template = template_env.get_template('company_facts_prompt.j2')
+        question = template.render(company_name=company_name)
         
-        # Make async API call
-        async with session.post(url, headers=headers, json=data) as response:
-            if response.status == 200:
-                full_response = ""
-                # Read the response as a stream
-                async for line in response.content:
-                    decoded_line = line.decode('utf-8')
-                    if decoded_line.startswith("data:") and not decoded_line.startswith("data:[DONE]"):
-                        try:
-                            json_str = decoded_line[5:]  # Remove "data:" prefix
-                            data = json.loads(json_str)
-                            if data.get("type") == "append-text":
-                                full_response += data.get("text", "")
-                        except json.JSONDecodeError:
-                            continue
-                
-                try:
-                    # Clean up the response string to ensure it's valid JSON
-                    full_response = full_response.strip()
-                    if full_response.startswith('```json'):
-                        full_response = full_response[7:]  # Remove ```json
-                    if full_response.endswith('```'):
-                        full_response = full_response[:-3]  # Remove ```
-                    full_response = full_response.strip()
-                    
-                    # Parse the JSON response
-                    result = json.loads(full_response)
-                    return result
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing JSON response: {e}")
-                    print(f"Raw response: {full_response}")
-                    return {
-                        "是否是股份公司": "NULL",
-                        "股改时间": "NULL"
-                    }
-            else:
-                print(f"Metaso API request failed for {company_name} with status {response.status}")
-                return {
-                    "是否是股份公司": "NULL",
-                    "股改时间": "NULL"
-                }
+        with span('metaso company facts', cat='metaso'):
+            result = await search_metaso_async(question, session, company_name)
+        if isinstance(result, dict):
+            # Missing fields are filled in with NULL by the validators
+            parent_info = {key: result[key] for key in PARENT_COMPANY_FIELDS if key in result}
+            stock_info = {key: result[key] for key in STOCK_REFORM_FIELDS if key in result}
+            return parent_info, stock_info
+    except RetryableError as e:
+        logger.warning("Retryable error querying Metaso API for %s: %s", company_name, e)
+        return (dict.fromkeys(PARENT_COMPANY_FIELDS, RETRY_MARKER),
+                dict.fromkeys(STOCK_REFORM_FIELDS, RETRY_MARKER))
     except Exception as e:
-        print(f"Error querying Metaso API for {company_name}: {e}")
-        return {
-            "是否是股份公司": "NULL",
-            "股改时间": "NULL"
-        }
+        logger.warning("Error querying Metaso API for %s: %s", company_name, e)
+    return dict.fromkeys(PARENT_COMPANY_FIELDS, "NULL"), dict.fromkeys(STOCK_REFORM_FIELDS, "NULL")
 
-async def get_xiniu_info_async(company_name):
+async def get_xiniu_info_async(company_name, session):
     """
     Get company information from Xiniu API asynchronously
     
     Args:
         company_name (str): Name of the company
+        session (aiohttp.ClientSession): Async HTTP session shared with the other API calls
     Returns:
-        tuple: (company_info, funding_history)
+        dict: Company information, None if the company could not be found, or
+            RETRY_MARKER if the lookup failed transiently
     """
-    company_id = xiniu_api_client.get_company_id(company_name)
+    try:
+        with span('xiniu info', cat='xiniu'):
+            return await lookup_xiniu_company(company_name, session)
+    except RetryableError as e:
+        logger.warning("Retryable error looking up %s on Xiniu: %s", company_name, e)
+        return RETRY_MARKER
+
+async def lookup_xiniu_company(company_name, session):
+    """
+    Resolve a company name to a Xiniu ID and fetch its record
     
-    # Try with modified name if parentheses are present and no ID was found
-    if not company_id and '(' in company_name and ')' in company_name:
-        # First try: Add spaces around parentheses
-        modified_name = company_name.replace('(', ' (').replace(')', ') ')
-        print(f"No match found. Trying with modified name: {modified_name}")
-        company_id = xiniu_api_client.get_company_id(modified_name)
-        
-        # Second try: Remove content in parentheses if still no match
-        if not company_id:
-            start_idx = company_name.find('(')
-            end_idx = company_name.find(')')
-            if start_idx != -1 and end_idx != -1 and start_idx < end_idx:
-                simplified_name = company_name[:start_idx] + company_name[end_idx+1:]
-                simplified_name = ' '.join(simplified_name.split())
-                print(f"Still no match. Trying with simplified name: {simplified_name}")
-                company_id = xiniu_api_client.get_company_id(simplified_name)
+    Known companies come from the identity index; otherwise all spellings of the
+    name are looked up at once and remembered in the persistent name map (see
+    src/utils/name_resolution.py).
+    """
+    xiniu_client = xiniu_api_client.XiniuAsyncClient(session)
+    resolver = NameResolver(xiniu_client, get_name_map(), get_identity_index())
+    company_id = await resolver.resolve(company_name)
     
     if company_id:
-        print(f"Found Company ID: {company_id}")
-        company_info = xiniu_api_client.get_company_info(company_id)
+        logger.debug("Found Company ID for %s: %s", company_name, company_id)
+        with span('company info', cat='xiniu', company_id=company_id):
+            company_info = await xiniu_client.get_company_info(company_id)
         return company_info
     else:
-        print(f"No company ID found for {company_name}")
+        logger.debug("No company ID found for %s", company_name)
         return None
 
-async def process_company_async(company_name, session):
+async def fetch_company_async(company_name, session, metaso_mode=DEFAULT_METASO_MODE):
     """
-    Process a single company asynchronously, making all API calls in parallel
+    Fetch a single company asynchronously, making all API calls in parallel
+    
+    Args:
+        metaso_mode (str): 'split' for two Metaso searches, 'combined' for one
     """
     try:
         # Create all API tasks at once
+        if metaso_mode == 'combined':
+            company_info, (parent_info, stock_info) = await asyncio.gather(
+                get_xiniu_info_async(company_name, session),
+                query_company_facts_async(company_name, session)
+            )
+            return company_info, parent_info, stock_info
+        
         tasks = [
-            get_xiniu_info_async(company_name),
+            get_xiniu_info_async(company_name, session),
             query_metaso_async(company_name, session),
             query_stock_reform_async(company_name, session)
         ]
@@ -245,232 +336,494 @@ async def process_company_async(company_name, session):
         return company_info, parent_info, stock_info
         
     except Exception as e:
-        print(f"Error processing company {company_name}: {e}")
+        logger.error("Error processing company %s: %s", company_name, e)
         return None, None, None
 
-async def process_single_company(idx, company_name, session, df, peer_funds, deallog_companies):
+async def process_company_async(company_name, session, metaso_mode=DEFAULT_METASO_MODE):
+    """
+    Process a single company asynchronously, making all API calls in parallel
+    
+    Lookups are deduplicated on the normalized company name: a company that is
+    already being fetched (e.g. listed on two 批 sheets) shares that fetch, and a
+    company fetched earlier in the run reuses its result. Results containing
+    RETRY_MARKER are not remembered, so a later row retries the lookup.
+    """
+    return await company_lookups.do(
+        normalize_company_name(company_name),
+        lambda: fetch_company_async(company_name, session, metaso_mode),
+        remember_if=lambda result: result[0] is not None and not has_retry_marker(result)
+    )
+
+def write_company_columns(df, idx, company_info, parent_info, stock_info):
+    """
+    Write the output columns of one row from the raw API results
+    
+    Peer Fund and the funding flag columns are not written here; they are derived
+    for the whole sheet by apply_funding_flags.
+    
+    Returns:
+        tuple: (parent_info, stock_info) after validation
+    """
+    # Update DataFrame with company information
+    df.at[idx, '成立时间'] = company_info.get('成立时间', '')
+    df.at[idx, '是否上市'] = company_info.get('是否上市', '')
+    
+    # Get funding history
+    funding_history = company_info.get('融资历史', [])
+    if funding_history == RETRY_MARKER:
+        for col in ['融资历史', 'Peer Fund', '某一年融资超2次', '单轮3家以上fund', '2家以上Peer Fund']:
+            df.at[idx, col] = RETRY_MARKER
+    else:
+        df.at[idx, '融资历史'] = format_funding_history(funding_history)
+    
+    # Get industry attributes and extract first tag name
+    industry_info = company_info.get('行业属性', {})
+    df.at[idx, '行业属性'] = format_industry_attributes(industry_info)
+    
+    # Extract first tag name from 所有行业标签
+    if industry_info == RETRY_MARKER:
+        df.at[idx, '赛道名称'] = RETRY_MARKER
+    elif isinstance(industry_info, dict) and '详细行业信息' in industry_info:
+        detailed_info = industry_info['详细行业信息']
+        if isinstance(detailed_info, dict) and '所有行业标签' in detailed_info:
+            all_tags = detailed_info['所有行业标签']
+            if all_tags and isinstance(all_tags, list) and len(all_tags) > 0:
+                first_tag = all_tags[0]
+                if isinstance(first_tag, dict) and '标签名' in first_tag:
+                    df.at[idx, '赛道名称'] = first_tag['标签名']
+    
+    df.at[idx, '产品/公司介绍'] = company_info.get('产品/公司介绍', '')
+    df.at[idx, '创始人信息'] = format_founder_info(company_info.get('创始人信息', ''))
+    
+    # Validate parent company and stock reform information
+    parent_info = validate_parent_company_response(parent_info)
+    df.at[idx, '母公司'] = parent_info.get('母公司名称', 'NULL')
+    df.at[idx, '母公司是否上市'] = parent_info.get('母公司是否上市', 'NULL')
+    
+    stock_info = validate_stock_reform_response(stock_info)
+    df.at[idx, '是否是股份公司'] = stock_info.get('是否是股份公司', 'NULL')
+    df.at[idx, '股改时间'] = stock_info.get('股改时间', 'NULL')
+    return parent_info, stock_info
+
+async def process_single_company(idx, company_name, session, df, peer_funds, deallog_companies,
+                                 metaso_mode=DEFAULT_METASO_MODE):
     """
     Process a single company and update the DataFrame
+    
+    Returns:
+        dict: Raw API results ('company_info', 'parent_info', 'stock_info') on success, None on failure
     """
     try:
         # Check if company is in deallog list (this is fast, so we do it synchronously)
-        df.at[idx, '已在Deal List'] = xiniu_api_client.check_in_deallog(company_name, deallog_companies)
+        with span('deallog match'):
+            df.at[idx, '已在Deal List'] = xiniu_api_client.check_in_deallog(company_name, deallog_companies)
         
         # Process company with parallel API calls
-        company_info, parent_info, stock_info = await process_company_async(company_name, session)
+        with span('fetch'):
+            company_info, parent_info, stock_info = await process_company_async(company_name, session, metaso_mode)
+        
+        if company_info == RETRY_MARKER:
+            # Xiniu failed transiently: mark the row so a --resume run fetches it again
+            with span('write columns'):
+                for col in NEW_COLUMNS:
+                    if col != '已在Deal List':
+                        df.at[idx, col] = RETRY_MARKER
+            logger.debug("Company will be retried: %s", company_name)
+            return None
         
         if company_info:
-            # Update DataFrame with company information
-            df.at[idx, '成立时间'] = company_info.get('成立时间', '')
-            df.at[idx, '是否上市'] = company_info.get('是否上市', '')
-            
-            # Get funding history
-            funding_history = company_info.get('融资历史', [])
-            df.at[idx, '融资历史'] = format_funding_history(funding_history)
-            
-            # Find peer fund intersection
-            df.at[idx, 'Peer Fund'] = xiniu_api_client.find_peer_fund_intersection(funding_history, peer_funds)
-            
-            # Add new funding analysis columns
-            df.at[idx, '某一年融资超2次'] = xiniu_api_client.check_multiple_fundings_in_year(funding_history)
-            df.at[idx, '单轮3家以上fund'] = xiniu_api_client.check_multiple_investors_in_round(funding_history)
-            df.at[idx, '2家以上Peer Fund'] = xiniu_api_client.check_multiple_peer_funds(funding_history, peer_funds)
-            
-            # Get industry attributes and extract first tag name
-            industry_info = company_info.get('行业属性', {})
-            df.at[idx, '行业属性'] = format_industry_attributes(industry_info)
-            
-            # Extract first tag name from 所有行业标签
-            if isinstance(industry_info, dict) and '详细行业信息' in industry_info:
-                detailed_info = industry_info['详细行业信息']
-                if isinstance(detailed_info, dict) and '所有行业标签' in detailed_info:
-                    all_tags = detailed_info['所有行业标签']
-                    if all_tags and isinstance(all_tags, list) and len(all_tags) > 0:
-                        first_tag = all_tags[0]
-                        if isinstance(first_tag, dict) and '标签名' in first_tag:
-                            df.at[idx, '赛道名称'] = first_tag['标签名']
-            
-            df.at[idx, '产品/公司介绍'] = company_info.get('产品/公司介绍', '')
-            df.at[idx, '创始人信息'] = format_founder_info(company_info.get('创始人信息', ''))
-            
-            # Validate parent company and stock reform information
-            parent_info = validate_parent_company_response(parent_info)
-            df.at[idx, '母公司'] = parent_info.get('母公司名称', 'NULL')
-            df.at[idx, '母公司是否上市'] = parent_info.get('母公司是否上市', 'NULL')
-            
-            stock_info = validate_stock_reform_response(stock_info)
-            df.at[idx, '是否是股份公司'] = stock_info.get('是否是股份公司', 'NULL')
-            df.at[idx, '股改时间'] = stock_info.get('股改时间', 'NULL')
+            with span('write columns'):
+                parent_info, stock_info = write_company_columns(df, idx, company_info, parent_info, stock_info)
             
-            print(f"Successfully processed company: {company_name}")
-            return True
+            logger.debug("Successfully processed company: %s", company_name)
+            return {
+                'company_info': company_info,
+                'parent_info': parent_info,
+                'stock_info': stock_info
+            }
         else:
-            print(f"Failed to process company: {company_name}")
-            return False
+            logger.debug("Failed to process company: %s", company_name)
+            return None
             
     except Exception as e:
-        print(f"Error processing company {company_name}: {e}")
-        return False
+        logger.error("Error processing company %s: %s", company_name, e)
+        return None
 
-async def process_sheet_async(sheet_name, df, peer_funds, deallog_companies, session):
+def apply_funding_flags(df, payloads, peer_funds, reported_matches=None):
     """
-    Process a single sheet asynchronously, one row at a time
+    Derive Peer Fund and the funding flag columns for all fetched rows of a sheet
+    in one vectorized pass over their funding histories
+    
+    Args:
+        df (pd.DataFrame): Sheet being processed
+        payloads (dict): {row: raw API results returned by process_single_company}
+        peer_funds (PeerFundMatcher): Peer fund matcher
+        reported_matches (set): Alias matches already logged for the sheet; new ones are
+            logged and added, so each is reported once per sheet across batches
     """
     start_time = time.time()
-    print(f"\nProcessing sheet: {sheet_name}")
-    
-    # Define row ranges for each sheet
-    sheet_ranges = {
-        '第一批': (238, 248),    # Rows 239-248 (0-based indexing)
-        '第二批': (1694, 1744),  # Rows 1695-1744
-        '第三批': (2881, 2931),  # Rows 2882-2931
-        '第四批': (3500, 4357),  # Rows 3501-4357
-        '第五批': (3500, 3671),  # Rows 3501-3671
-        '第六批': (2962, 3012),  # Rows 2963-3012
+    funding_histories = {
+        idx: payload['company_info'].get('融资历史')
+        for idx, payload in payloads.items()
+        if payload and isinstance(payload.get('company_info'), dict)
     }
+    flags, alias_matches = derive_funding_flags(funding_histories, peer_funds)
+    reported_matches = set() if reported_matches is None else reported_matches
+    for match in alias_matches:
+        if match not in reported_matches:
+            reported_matches.add(match)
+            logger.debug("Peer fund match: '%s' -> '%s' (via '%s')", match.investor, match.fund, match.alias)
+    if not flags.empty:
+        df.loc[flags.index, FUNDING_FLAG_COLUMNS] = flags[FUNDING_FLAG_COLUMNS]
+    logger.debug("Derived funding flags for %d companies in %.0f ms", len(flags), (time.time() - start_time) * 1000)
+
+def is_input_column(column):
+    """
+    Return True for the input columns the pipeline uses: the result columns and
+    every column the company name may be read from
+    """
+    column = str(column)
+    return column in NEW_COLUMNS or '名称' in column or 'name' in column.lower() or '企业' in column
+
+def read_input_sheets(input_file, sheet_ranges):
+    """
+    Read only the configured row range of each sheet, and only its company-name
+    and result columns, in one pass over the workbook
+    
+    Args:
+        sheet_ranges (dict): {sheet: (start_row, end_row)}; sheets without a range are not read
+    Returns:
+        dict: {sheet name: pd.DataFrame} indexed by the rows' position in the sheet
+    """
+    sheets = []
+    for sheet_name in sheet_names(input_file):
+        if sheet_name in sheet_ranges:
+            sheets.append(sheet_name)
+        else:
+            logger.warning("No row range defined for sheet %s", sheet_name)
+    return read_workbook(input_file, sheets=sheets, usecols=is_input_column,
+                         row_window={sheet_name: sheet_ranges[sheet_name] for sheet_name in sheets})
+
+def reorder_output_columns(df):
+    """
+    Reorder columns to put 赛道名称 after 行业属性
+    """
+    cols = df.columns.tolist()
+    industry_idx = cols.index('行业属性')
+    track_idx = cols.index('赛道名称')
+    cols.pop(track_idx)
+    cols.insert(industry_idx + 1, '赛道名称')
+    return df[cols]
+
+async def process_sheet_async(sheet_name, df, peer_funds, deallog_companies, session,
+                              max_concurrency=ROW_CONCURRENCY, journal=None, resumed_rows=None,
+                              metaso_mode=DEFAULT_METASO_MODE, sink=None, sheet_ranges=None):
+    """
+    Process a single sheet asynchronously, running up to max_concurrency rows at once
+    
+    Finished rows are released in sheet order in batches of OUTPUT_BATCH_ROWS; the
+    funding flags of a batch are derived when it is released and the batch is then
+    written to the sink.
     
+    Args:
+        journal (RunJournal): Journal each finished row is appended to
+        resumed_rows (dict): Journaled {row: record} from a previous run; these rows are
+            restored from the journal instead of being fetched again
+        metaso_mode (str): 'split' or 'combined' Metaso searches (see METASO_MODES)
+        sink (OutputSink): Sink the finished rows of the sheet's range are streamed to
+        sheet_ranges (dict): {sheet: (start_row, end_row)} to process, defaults to SHEET_RANGES
+    """
+    start_time = time.time()
+    logger.info("Processing sheet: %s", sheet_name)
+    
+    sheet_ranges = SHEET_RANGES if sheet_ranges is None else sheet_ranges
     if sheet_name not in sheet_ranges:
-        print(f"Warning: No row range defined for sheet {sheet_name}")
+        logger.warning("No row range defined for sheet %s", sheet_name)
         return sheet_name, df
         
     start_row, end_row = sheet_ranges[sheet_name]
     total_rows = end_row - start_row
     
-    print(f"Processing rows {start_row+1}-{end_row} ({total_rows} companies) in {sheet_name}")
+    logger.info("Processing rows %d-%d (%d companies) in %s", start_row + 1, end_row, total_rows, sheet_name)
     
     # Initialize new columns in the original DataFrame if they don't exist
-    new_columns = ['成立时间', '是否上市', '母公司', '母公司是否上市', '融资历史', 'Peer Fund',
-                  '某一年融资超2次', '单轮3家以上fund', '2家以上Peer Fund', '已在Deal List',
-                  '行业属性', '赛道名称', '产品/公司介绍', '创始人信息', '是否是股份公司', '股改时间']
-    
-    for col in new_columns:
+    for col in NEW_COLUMNS:
         if col not in df.columns:
             df[col] = ''
     
     # Find company name column
     company_name_column = '示范企业名称' if '示范企业名称' in df.columns else '企业名称'
     if company_name_column not in df.columns:
-        print(f"Warning: Could not find company name column in sheet {sheet_name}")
+        logger.warning("Could not find company name column in sheet %s", sheet_name)
         # Try to find a column that might contain company names
         for col in df.columns:
             if '名称' in col or 'name' in col.lower() or '企业' in col:
                 company_name_column = col
-                print(f"Using column '{company_name_column}' for company names")
+                logger.info("Using column '%s' for company names", company_name_column)
                 break
         if company_name_column not in df.columns:
-            print(f"Error: Could not find a suitable company name column in sheet {sheet_name}")
+            logger.error("Could not find a suitable company name column in sheet %s", sheet_name)
             return sheet_name, df
     
-    # Process companies one by one
+    if journal is not None:
+        journal.start_sheet(sheet_name, start_row, end_row, company_name_column)
+    output_columns = reorder_output_columns(df).columns.tolist()
+    if sink is not None:
+        sink.start_sheet(sheet_name, output_columns)
+    
+    # Restore rows finished in a previous run from the journal
+    resumed_rows = resumed_rows or {}
+    for idx, record in resumed_rows.items():
+        for col, value in record['values'].items():
+            df.at[idx, col] = value
+    pending_rows = [idx for idx in range(start_row, end_row) if idx not in resumed_rows]
+    if resumed_rows:
+        logger.info("Resuming %s: %d rows restored from journal, %d left", sheet_name, len(resumed_rows), len(pending_rows))
+    
+    # Process companies concurrently; each task writes back to its own df row
+    semaphore = asyncio.Semaphore(max_concurrency)
+    payloads = {idx: record.get('payload') for idx, record in resumed_rows.items()}
+    
+    # Rows finish out of order; release them in sheet order, batch by batch
+    reorder = ReorderBuffer(range(start_row, end_row))
+    released = []
+    reported_matches = set()
+    
+    def release(rows, final=False):
+        released.extend(row for row, _ in rows)
+        if not released or (len(released) < OUTPUT_BATCH_ROWS and not final):
+            return
+        batch = released[:]
+        released.clear()
+        apply_funding_flags(df, {idx: payloads.pop(idx, None) for idx in batch}, peer_funds, reported_matches)
+        if journal is not None:
+            # The rows were journaled when they finished; add the flags derived just now
+            journal.update_values(sheet_name, {idx: {col: df.at[idx, col] for col in FUNDING_FLAG_COLUMNS}
+                                               for idx in batch})
+        if sink is not None:
+            rows = df.loc[batch, output_columns].to_dict('index')
+            sink.write_rows(sheet_name, [(idx, rows[idx]) for idx in batch])
+    
+    for idx in resumed_rows:
+        release(reorder.push(idx, None))
+    
+    async def process_row(idx):
+        company_name = df.at[idx, company_name_column]
+        async with semaphore:
+            logger.debug("Processing company (Row %d): %s", idx + 1, company_name)
+            company_start = time.time()
+            with span('company', label=f"{sheet_name} row {idx + 1} {company_name}", sheet=sheet_name,
+                      row=idx + 1, company=company_name):
+                payload = await process_single_company(idx, company_name, session, df, peer_funds,
+                                                       deallog_companies, metaso_mode)
+            seconds = time.time() - company_start
+        
+        values = {col: df.at[idx, col] for col in NEW_COLUMNS}
+        if has_retry_marker(values):
+            status = 'retry'
+        else:
+            status = 'ok' if payload else 'failed'
+        if journal is not None:
+            journal.record_row(sheet_name, idx, company_name, status, values, payload)
+        payloads[idx] = payload
+        return idx, company_name, payload, status, seconds
+    
+    tasks = [asyncio.ensure_future(process_row(idx)) for idx in pending_rows]
+    total_rows = len(pending_rows)
+    
     successful = 0
     processed = 0
-    for idx in range(start_row, end_row):  
-        company_name = df.iloc[idx][company_name_column]
-        current_row = idx + 1  # Convert to 1-based indexing for display
-        current_count = processed + 1
-        print(f"\nProcessing company {current_count}/{total_rows} (Row {current_row}): {company_name}")
-        
-        if await process_single_company(idx, company_name, session, df, peer_funds, deallog_companies):
+    for finished in asyncio.as_completed(tasks):
+        idx, company_name, payload, status, seconds = await finished
+        if payload:
             successful += 1
         processed += 1
+        release(reorder.push(idx, None))
         
-        # Print progress
+        # One line per company, with the progress and time estimate
         elapsed_time = time.time() - start_time
-        avg_time_per_company = elapsed_time / processed
-        remaining = total_rows - processed
-        estimated_remaining = remaining * avg_time_per_company
-        
-        print(f"\nProgress update:")
-        print(f"Processed: {processed}/{total_rows} companies ({processed/total_rows*100:.1f}%)")
-        print(f"Successfully processed: {successful} companies")
-        print(f"Average time per company: {avg_time_per_company:.2f} seconds")
-        print(f"Estimated time remaining: {estimated_remaining/60:.1f} minutes")
+        eta_seconds = (total_rows - processed) * elapsed_time / processed
+        logger.info("[%s %d/%d] row %d %s: %s in %.1fs, ETA %.1f min", sheet_name, processed, total_rows,
+                    idx + 1, company_name, status, seconds, eta_seconds / 60,
+                    extra={'sheet': sheet_name, 'row': idx + 1, 'company': company_name, 'status': status,
+                           'seconds': round(seconds, 3), 'processed': processed, 'total': total_rows,
+                           'eta_seconds': round(eta_seconds, 1)})
     
-    # Reorder columns to put 赛道名称 after 行业属性
-    cols = df.columns.tolist()
-    industry_idx = cols.index('行业属性')
-    track_idx = cols.index('赛道名称')
-    cols.pop(track_idx)
-    cols.insert(industry_idx + 1, '赛道名称')
-    df = df[cols]
+    release([], final=True)
+    
+    df = reorder_output_columns(df)
     
     end_time = time.time()
     duration = end_time - start_time
-    print(f"\nFinished processing rows {start_row+1}-{end_row} in sheet {sheet_name} in {duration/60:.1f} minutes")
-    print(f"Successfully processed {successful}/{total_rows} companies")
+    logger.info("Finished processing rows %d-%d in sheet %s in %.1f minutes (up to %d in flight)",
+                start_row + 1, end_row, sheet_name, duration / 60, max_concurrency)
+    logger.info("Successfully processed %d/%d companies", successful, total_rows)
     return sheet_name, df
 
-async def process_without_metaso(input_file):
+async def process_without_metaso(input_file, row_concurrency=ROW_CONCURRENCY, resume=False,
+                                 metaso_mode=DEFAULT_METASO_MODE, streams=None, metrics_file=None,
+                                 metrics_interval=DEFAULT_EXPORT_INTERVAL, sheet_ranges=None):
     """
-    Process the top 20 rows of each sheet in the input file without using Metaso API
+    Process the configured row range of each sheet in the input file,
+    running up to row_concurrency companies of each sheet at once
+    
+    Every finished row is appended to the run journal. With resume=True, rows the
+    journal records as successful are restored from it instead of being fetched again.
+    Besides the formatted workbook, the rows can be streamed to the output formats
+    in streams ('csv', 'jsonl', 'parquet') while the run is going. With metrics_file,
+    the API metrics are written there (JSON, or Prometheus text for *.prom) every
+    metrics_interval seconds and at the end of the run. sheet_ranges overrides
+    SHEET_RANGES, e.g. {'第一批': (0, 1000)}; only those rows, and only the
+    company-name and result columns, are read from the input file.
     """
     start_time = time.time()
-    print(f"Reading Excel file: {input_file}")
+    logger.info("Reading Excel file: %s", input_file)
+    
+    company_lookups.reset()
+    get_metrics().reset()
+    exporter = MetricsExporter(get_metrics(), metrics_file, metrics_interval).start() if metrics_file else None
+    
+    journal_file = journal_path_for(input_file)
+    previous_journal = read_journal(journal_file) if resume else None
+    if resume:
+        logger.info("Resuming from journal: %s", journal_file)
     
     # Load peer funds and deallog companies
-    peer_funds = xiniu_api_client.load_peer_funds()
-    deallog_companies = xiniu_api_client.load_deallog_companies()
+    peer_funds = PeerFundMatcher(xiniu_api_client.load_peer_funds(), load_peer_fund_aliases())
+    deallog_companies = DeallogIndex(xiniu_api_client.load_deallog_companies())
+    
+    # Read the configured rows of all sheets in one pass over the workbook
+    sheet_ranges = SHEET_RANGES if sheet_ranges is None else sheet_ranges
+    sheets = read_input_sheets(input_file, sheet_ranges)
     
-    # Read all sheets
-    excel_file = pd.ExcelFile(input_file)
-    sheet_names = excel_file.sheet_names
+    output_file = formatted_output_path(input_file)
+    stream_base = os.path.splitext(output_file)[0]
+    sinks = SinkGroup([ExcelSink(output_file)] + [make_sink(kind, stream_base) for kind in streams or []])
     
     # Create tasks for processing each sheet
     tasks = []
-    async with aiohttp.ClientSession() as session:
-        for sheet_name in sheet_names:
-            # Read the sheet
-            df = pd.read_excel(input_file, sheet_name=sheet_name)
-            tasks.append(process_sheet_async(sheet_name, df, peer_funds, deallog_companies, session))
+    with RunJournal(journal_file, resume=resume) as journal, sinks:
+        async with aiohttp.ClientSession() as session:
+            for sheet_name, df in sheets.items():
+                resumed_rows = completed_rows(previous_journal, sheet_name) if previous_journal else None
+                tasks.append(process_sheet_async(sheet_name, df, peer_funds, deallog_companies, session,
+                                                 max_concurrency=row_concurrency, journal=journal,
+                                                 resumed_rows=resumed_rows, metaso_mode=metaso_mode,
+                                                 sink=sinks, sheet_ranges=sheet_ranges))
+            
+            # Process all sheets in parallel
+            results = await asyncio.gather(*tasks)
         
-        # Process all sheets in parallel
-        results = await asyncio.gather(*tasks)
+        for sheet_name, df in results:
+            sinks.finish_sheet(sheet_name, df)
     
-    # Create output file path in the output directory
+    persist_company_store(input_file, results, read_journal(journal_file))
+    end_time = time.time()
+    duration = end_time - start_time
+    logger.info("Processed file saved as: %s", output_file)
+    logger.info("Total processing time: %.1f minutes", duration / 60)
+    
+    lookup_stats = company_lookups.stats()
+    logger.info("Company lookups: %d requested, %d fetched, %d shared in flight, %d reused",
+                lookup_stats['requests'], lookup_stats['executed'], lookup_stats['shared_in_flight'],
+                lookup_stats['reused'])
+    logger.info("Duplicate lookups saved: %d (about %d API calls)", lookup_stats['saved'],
+                lookup_stats['saved'] * CALLS_PER_LOOKUP)
+    
+    logger.info("API metrics:\n%s", get_metrics().summary_table())
+    if exporter is not None:
+        exporter.stop()
+        logger.info("Metrics written to: %s", metrics_file)
+
+def formatted_output_path(input_file):
+    """
+    Return data/output/<input>_formatted.xlsx for an input workbook, creating the output directory
+    """
     output_dir = os.path.join(os.path.dirname(os.path.dirname(input_file)), 'output')
     os.makedirs(output_dir, exist_ok=True)
-    output_file = os.path.join(output_dir, os.path.basename(input_file).replace('.xlsx', '_formatted.xlsx'))
+    return os.path.join(output_dir, os.path.basename(input_file).replace('.xlsx', '_formatted.xlsx'))
+
+def persist_company_store(input_file, results, journal):
+    """
+    Write the journaled rows of the finished sheets to the Parquet store (data/output/parquet)
     
-    # Create Excel writer for output
-    writer = pd.ExcelWriter(output_file, engine='openpyxl')
+    pyarrow is a requirement; without it the store is not written and an error is logged.
+    """
+    if not parquet_available():
+        logger.error("pyarrow is not installed (pip install -r requirements.txt); the Parquet store was not written")
+        return
+    start_time = time.time()
+    store_dir = store_path_for(input_file)
+    try:
+        written = write_company_store(store_dir, input_file, results, journal)
+        logger.info("Stored %d companies in %s in %.1f seconds", written, store_dir, time.time() - start_time)
+    except Exception as e:
+        logger.error("Error writing the Parquet store: %s", e)
+
+def save_formatted_workbook(input_file, results):
+    """
+    Write the processed sheets to data/output/<input>_formatted.xlsx with wrapped,
+    bordered cells and fitted column widths
     
-    # Save all processed sheets
-    for sheet_name, df in results:
-        df.to_excel(writer, sheet_name=sheet_name, index=False)
-        
-        # Get the worksheet
-        worksheet = writer.sheets[sheet_name]
+    Args:
+        input_file (str): Path of the input Excel file
+        results (list): (sheet_name, df) pairs in sheet order
+    Returns:
+        str: Path of the written file
+    """
+    return write_formatted_workbook(formatted_output_path(input_file), results)
+
+def rederive_from_journal(input_file):
+    """
+    Rebuild the formatted workbook from the raw API payloads stored in the run journal
+    
+    Peer Fund, the funding flags, 已在Deal List and all formatted columns are
+    recomputed with the current PF Tracked List and deallog list; no API calls are made.
+    Rows without a stored payload keep the values recorded in the journal.
+    """
+    start_time = time.time()
+    journal_file = journal_path_for(input_file)
+    if not os.path.exists(journal_file):
+        logger.error("No run journal found at %s; run the pipeline first", journal_file)
+        return None
+    logger.info("Re-deriving columns from journal: %s", journal_file)
+    journal = read_journal(journal_file)
+    
+    peer_funds = PeerFundMatcher(xiniu_api_client.load_peer_funds(), load_peer_fund_aliases())
+    deallog_companies = DeallogIndex(xiniu_api_client.load_deallog_companies())
+    
+    # Read the rows of the journaled sheet ranges, as the run that wrote the journal did
+    sheet_ranges = {sheet_name: (info['start_row'], info['end_row']) for sheet_name, info in journal['sheets'].items()}
+    results = []
+    for sheet_name, df in read_input_sheets(input_file, sheet_ranges).items():
+        for col in NEW_COLUMNS:
+            if col not in df.columns:
+                df[col] = ''
         
-        # Format the cells
-        for row in worksheet.iter_rows():
-            for cell in row:
-                cell.alignment = Alignment(wrap_text=True, vertical='top')
-                cell.border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
+        rows = journal['rows'].get(sheet_name, {})
+        payloads = {}
+        for idx, record in rows.items():
+            for col, value in record['values'].items():
+                df.at[idx, col] = value
+            try:
+                df.at[idx, '已在Deal List'] = xiniu_api_client.check_in_deallog(record['company_name'], deallog_companies)
+                payload = record.get('payload')
+                if payload and isinstance(payload.get('company_info'), dict):
+                    write_company_columns(df, idx, payload['company_info'],
+                                          payload.get('parent_info'), payload.get('stock_info'))
+                    payloads[idx] = payload
+            except Exception as e:
+                logger.error("Error re-deriving row %d of %s: %s", idx + 1, sheet_name, e)
         
-        # Adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column = list(column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            worksheet.column_dimensions[column[0].column_letter].width = min(adjusted_width, 50)
-    
-    # Save the Excel file
-    writer.close()
-    end_time = time.time()
-    duration = end_time - start_time
-    print(f"\nProcessed file saved as: {output_file}")
-    print(f"Total processing time: {duration/60:.1f} minutes")
+        apply_funding_flags(df, payloads, peer_funds)
+        results.append((sheet_name, reorder_output_columns(df)))
+        logger.info("Re-derived %d of %d journaled rows in %s", len(payloads), len(rows), sheet_name)
+    
+    output_file = save_formatted_workbook(input_file, results)
+    persist_company_store(input_file, results, journal)
+    logger.info("Processed file saved as: %s", output_file)
+    logger.info("Re-derive time: %.1f seconds", time.time() - start_time)
+    return output_file
 
 def validate_parent_company_response(response):
     """
@@ -481,7 +834,7 @@ def validate_parent_company_response(response):
     Returns:
         dict: Validated response with correct format
     """
-    valid_status = ["是", "不是", "NULL"]
+    valid_status = ["是", "不是", "NULL", RETRY_MARKER]
     default_response = {
         "母公司名称": "NULL",
         "母公司是否上市": "NULL"
@@ -490,7 +843,7 @@ def validate_parent_company_response(response):
     try:
         # Check if all required fields exist
         if not all(key in response for key in default_response.keys()):
-            print("Missing required fields in parent company response")
+            logger.warning("Missing required fields in parent company response")
             return default_response
             
         # Validate parent company name
@@ -502,12 +855,12 @@ def validate_parent_company_response(response):
             response["母公司是否上市"] = "NULL"
         # Otherwise validate listing status
         elif response["母公司是否上市"] not in valid_status:
-            print(f"Invalid listing status: {response['母公司是否上市']}")
+            logger.warning("Invalid listing status: %s", response['母公司是否上市'])
             response["母公司是否上市"] = "NULL"
             
         return response
     except Exception as e:
-        print(f"Error validating parent company response: {e}")
+        logger.warning("Error validating parent company response: %s", e)
         return default_response
 
 def validate_stock_reform_response(response):
@@ -519,7 +872,7 @@ def validate_stock_reform_response(response):
     Returns:
         dict: Validated response with correct format
     """
-    valid_status = ["是", "不是", "NULL"]
+    valid_status = ["是", "不是", "NULL", RETRY_MARKER]
     default_response = {
         "是否是股份公司": "NULL",
         "股改时间": "NULL"
@@ -528,26 +881,26 @@ def validate_stock_reform_response(response):
     try:
         # Check if all required fields exist
         if not all(key in response for key in default_response.keys()):
-            print("Missing required fields in stock reform response")
+            logger.warning("Missing required fields in stock reform response")
             return default_response
             
         # Validate company status
         if response["是否是股份公司"] not in valid_status:
-            print(f"Invalid company status: {response['是否是股份公司']}")
+            logger.warning("Invalid company status: %s", response['是否是股份公司'])
             response["是否是股份公司"] = "NULL"
             
         # Validate reform date format if present
-        if response["股改时间"] != "NULL":
+        if response["股改时间"] not in ("NULL", RETRY_MARKER):
             try:
                 # Try to parse the date
                 datetime.strptime(response["股改时间"], "%Y-%m-%d")
             except ValueError:
-                print(f"Invalid date format: {response['股改时间']}")
+                logger.warning("Invalid date format: %s", response['股改时间'])
                 response["股改时间"] = "NULL"
                 
         return response
     except Exception as e:
-        print(f"Error validating stock reform response: {e}")
+        logger.warning("Error validating stock reform response: %s", e)
         return default_response
 
 def format_funding_history(funding_history):
@@ -662,16 +1015,93 @@ def format_founder_info(founder_info):
     
     return str(founder_info)
 
+def start_cassette(cassette_file, mode, timing=DEFAULT_REPLAY_TIMING):
+    """
+    Route the Xiniu and Metaso requests through a cassette server that records
+    them (mode='record') or answers them from the cassette (mode='replay')
+    
+    The response cache is turned off so every request reaches the cassette.
+    
+    Returns:
+        CassetteServer: The running server; stop() it when the run is done
+    """
+    os.environ['API_CACHE_DISABLED'] = '1'
+    upstreams = {'xiniu': xiniu_api_client.XINIU_BASE_URL, 'metaso': xiniu_api_client.METASO_SEARCH_URL}
+    server = CassetteServer(CassetteStore(cassette_file), mode, upstreams, timing).start()
+    urls = server.base_urls()
+    xiniu_api_client.XINIU_BASE_URL = urls['XINIU_BASE_URL']
+    xiniu_api_client.METASO_SEARCH_URL = urls['METASO_SEARCH_URL']
+    logger.info("%s cassette: %s", 'Recording API traffic to' if mode == 'record' else 'Replaying API traffic from',
+                cassette_file)
+    return server
+
 def main():
     """
-    Process the top 20 rows of each sheet in the 小巨人list copy.xlsx file without using Metaso API
+    Process the configured rows of each sheet in the 小巨人list copy.xlsx file
     with formatted funding history
     """
-    input_file = "data/input/小巨人list copy.xlsx"
+    parser = argparse.ArgumentParser(description="Enrich the configured rows of each sheet with company information")
+    parser.add_argument('input_file', nargs='?', default="data/input/小巨人list copy.xlsx",
+                        help="Input Excel file")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--resume', action='store_true',
+                      help="Skip rows already recorded in the run journal and rebuild them from it")
+    mode.add_argument('--rederive', action='store_true',
+                      help="Recompute the derived columns from the journaled API payloads without any API calls")
+    parser.add_argument('--metaso-mode', choices=METASO_MODES, default=DEFAULT_METASO_MODE,
+                        help="Ask Metaso for the parent-company and stock-reform facts in two searches "
+                             "(split, the default) or in one (combined)")
+    parser.add_argument('--stream', action='append', choices=STREAMING_SINKS, default=[],
+                        help="Also stream finished rows, in sheet order, to <input>_formatted CSV/JSONL/Parquet "
+                             "files while the run is going (repeatable)")
+    parser.add_argument('--metrics-file',
+                        help="Write API latency/status/cache metrics to this file during the run "
+                             "(Prometheus textfile for *.prom, JSON otherwise)")
+    parser.add_argument('--metrics-interval', type=float, default=DEFAULT_EXPORT_INTERVAL,
+                        help="Seconds between metrics file updates")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument('--record', metavar='CASSETTE',
+                          help="Record every Xiniu/Metaso request and response to this cassette file")
+    cassette.add_argument('--replay', metavar='CASSETTE',
+                          help="Answer every Xiniu/Metaso request from this cassette file instead of the APIs")
+    parser.add_argument('--replay-timing', choices=REPLAY_TIMINGS, default=DEFAULT_REPLAY_TIMING,
+                        help="Replay with the recorded response times (original) or as fast as possible (fast)")
+    parser.add_argument('--trace', metavar='TRACE_FILE',
+                        help="Trace every company's API calls and write them to this Chrome trace JSON file "
+                             "(open it in ui.perfetto.dev or chrome://tracing)")
+    parser.add_argument('--log-level', help="Logging level (DEBUG, INFO, WARNING, ...), defaults to LOG_LEVEL or INFO")
+    parser.add_argument('--log-format', choices=LOG_FORMATS,
+                        help="Log plain text lines or one JSON object per line, defaults to LOG_FORMAT or text")
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_format)
+    input_file = args.input_file
+    
+    if args.rederive:
+        rederive_from_journal(input_file)
+        return
     
-    print(f"Processing top 20 rows of file: {input_file}")
-    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    asyncio.run(process_without_metaso(input_file))
+    if args.trace:
+        start_tracing(args.trace)
+    
+    cassette_server = None
+    if args.record:
+        cassette_server = start_cassette(args.record, 'record')
+    elif args.replay:
+        cassette_server = start_cassette(args.replay, 'replay', args.replay_timing)
+    
+    logger.info("Processing file: %s", input_file)
+    logger.info("Started at: %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    try:
+        asyncio.run(process_without_metaso(input_file, resume=args.resume, metaso_mode=args.metaso_mode,
+                                           streams=args.stream, metrics_file=args.metrics_file,
+                                           metrics_interval=args.metrics_interval))
+    finally:
+        if cassette_server is not None:
+            logger.info("%s", cassette_server.summary())
+            cassette_server.stop()
+        tracer = stop_tracing()
+        if tracer is not None:
+            logger.info("Trace with %d spans written to: %s", tracer.event_count(), tracer.path)
 
 if __name__ == "__main__":
     main()
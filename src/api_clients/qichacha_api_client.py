@@ -1,20 +1,53 @@
 import hashlib
+import logging
 import time
 import requests
 import json
 import os
+import sys
 from dotenv import load_dotenv
 
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.response_cache import get_cache
+from src.utils.company_identity import get_identity_index, is_credit_code, qichacha_search_key
+from src.utils.rate_limiter import get_rate_limiter, MAX_THROTTLE_RETRIES
+from src.utils.metrics import get_metrics
+from src.utils.resilience import RetryableError, call_with_retry
+from src.utils.structured_logging import configure_logging
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeout in seconds for each request
+QICHACHA_TIMEOUT = (10, 30)
+
+# API root; the environment override points the client at a local mock server
+QICHACHA_BASE_URL = os.getenv('QICHACHA_BASE_URL', 'https://api.qichacha.com')
+
 class QichachaClient:
-    def __init__(self, app_key, secret_key):
+    def __init__(self, app_key, secret_key, use_cache=True):
         self.app_key = app_key
         self.secret_key = secret_key
-        self.base_url = "https://api.qichacha.com"
+        self.base_url = QICHACHA_BASE_URL
+        self.cache = get_cache() if use_cache else None
+        self.identities = get_identity_index() if use_cache else None
+        self.rate_limiter = get_rate_limiter()
         
     def _generate_token(self, timespan):
         """Generate authentication token"""
         str_to_sign = self.app_key + timespan + self.secret_key
         return hashlib.md5(str_to_sign.encode('utf-8')).hexdigest().upper()
+
+    def _auth_headers(self):
+        """Build the Token/Timespan headers for a request"""
+        # Generate timespan (Unix timestamp)
+        timespan = str(int(time.time()))
+        
+        return {
+            "Token": self._generate_token(timespan),
+            "Timespan": timespan
+        }
         
     def get_company_changes(self, search_key, page_index="1", page_size="10"):
         """
@@ -28,18 +61,18 @@ class QichachaClient:
         Returns:
             dict: API response
         """
-        # Generate timespan (Unix timestamp)
-        timespan = str(int(time.time()))
-        
-        # Generate token
-        token = self._generate_token(timespan)
-        
-        # Prepare headers
-        headers = {
-            "Token": token,
-            "Timespan": timespan
+        cache_payload = {
+            "searchKey": search_key,
+            "pageIndex": page_index,
+            "pageSize": page_size
         }
-        
+        metrics = get_metrics()
+        if self.cache is not None:
+            cached = self.cache.get('qichacha/ECIChange/GetList', cache_payload)
+            metrics.record_cache('qichacha', 'ECIChange/GetList', cached is not None)
+            if cached is not None:
+                return cached
+
         # Prepare parameters
         params = {
             "key": self.app_key,
@@ -48,36 +81,66 @@ class QichachaClient:
             "pageSize": page_size
         }
         
+        def send():
+            for attempt in range(MAX_THROTTLE_RETRIES + 1):
+                self.rate_limiter.acquire('qichacha', 'ECIChange/GetList')
+                with metrics.request('qichacha', 'ECIChange/GetList') as call:
+                    response = requests.get(
+                        f"{self.base_url}/ECIChange/GetList",
+                        headers=self._auth_headers(),
+                        params=params,
+                        timeout=QICHACHA_TIMEOUT
+                    )
+                    call.status = response.status_code
+                    call.bytes = len(response.content)
+                if response.status_code == 429:
+                    self.rate_limiter.throttled('qichacha', 'ECIChange/GetList', response.headers.get('Retry-After'))
+                    if attempt < MAX_THROTTLE_RETRIES:
+                        continue
+                response.raise_for_status()
+                return response.json()
+        
         # Make the request
         try:
-            response = requests.get(
-                f"{self.base_url}/ECIChange/GetList",
-                headers=headers,
-                params=params
-            )
-            response.raise_for_status()
-            return response.json()
+            result = call_with_retry(send, 'qichacha', 'ECIChange/GetList')
+            if self.cache is not None and result.get('Status') == "200":
+                self.cache.set('qichacha/ECIChange/GetList', cache_payload, result)
+            return result
+        except RetryableError as e:
+            logger.warning("Retryable error making request for %s: %s", search_key, e)
+            return None
         except requests.exceptions.RequestException as e:
-            print(f"Error making request: {e}")
+            logger.warning("Error making request for %s: %s", search_key, e)
             return None
         except json.JSONDecodeError as e:
-            print(f"Error decoding response: {e}")
+            logger.warning("Error decoding response for %s: %s", search_key, e)
             return None
 
     def get_all_company_changes(self, search_key):
         """
         Get all pages of company changes information
         
+        A company name known to the identity index is searched by its credit
+        code (or the key Qichacha answered to before) instead.
+        
         Args:
             search_key (str): Company name, unified social credit code, or registration number
             
         Returns:
             dict: Combined API response with all pages
         """
+        known_key = None
+        if self.identities is not None:
+            known_key = qichacha_search_key(self.identities.lookup(search_key))
+        search_key = known_key or search_key
+        
         # Get first page to get total records
         first_page = self.get_company_changes(search_key, "1", "10")
         if not first_page or first_page.get('Status') != "200":
             return first_page
+        # Remember that Qichacha knows the company under this name
+        if self.identities is not None and known_key is None and not is_credit_code(search_key):
+            self.identities.record(search_key, qichacha_key=search_key)
 
         total_records = first_page['Paging']['TotalRecords']
         total_pages = (total_records + 9) // 10  # Round up division
@@ -93,7 +156,7 @@ class QichachaClient:
             if page_data and page_data.get('Status') == "200":
                 all_results.extend(page_data['Result'])
             else:
-                print(f"Error getting page {page}")
+                logger.warning("Error getting page %d for %s", page, search_key)
                 break
 
         # Update the first page response with all results
@@ -121,9 +184,9 @@ class QichachaClient:
                 f.write(f"{'='*50}\n\n")
                 json.dump(data, f, ensure_ascii=False, indent=2)
                 f.write("\n")
-            print(f"\nResults saved to: {filename}")
+            logger.info("Results saved to: %s", filename)
         except Exception as e:
-            print(f"Error saving to file: {e}")
+            logger.error("Error saving to file: %s", e)
 
 def find_stock_reform_date(data):
     """
@@ -163,30 +226,31 @@ def test_api():
     secret_key = os.getenv('QICHACHA_SECRET_KEY')
     
     if not app_key or not secret_key:
-        print("Error: QICHACHA_APP_KEY and QICHACHA_SECRET_KEY environment variables must be set")
+        logger.error("QICHACHA_APP_KEY and QICHACHA_SECRET_KEY environment variables must be set")
         return
         
     client = QichachaClient(app_key=app_key, secret_key=secret_key)
     
     # Test with a company name
     test_company = "荣耀终端股份有限公司"
-    print(f"\nTesting API with company: {test_company}")
+    logger.info("Testing API with company: %s", test_company)
     
     # Get all pages of results
     result = client.get_all_company_changes(test_company)
     
     if result:
-        print(f"\nTotal changes found: {len(result['Result'])}")
+        logger.info("Total changes found: %d", len(result['Result']))
         # Find stock reform date
         reform_date = find_stock_reform_date(result)
         if reform_date:
-            print(f"\n股改时间: {reform_date}")
+            logger.info("股改时间: %s", reform_date)
         else:
-            print("\n未找到股改记录")
+            logger.info("未找到股改记录")
         # Save results to file
         client.save_to_file(result, test_company)
     else:
-        print("Failed to get response from API")
+        logger.error("Failed to get response from API")
 
 if __name__ == "__main__":
+    configure_logging()
     test_api()
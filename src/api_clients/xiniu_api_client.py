@@ -2,14 +2,37 @@
 
 import hashlib
 import time
+import asyncio
+import aiohttp
 import requests
 import json
+import logging
 import pandas as pd
 import os
 import dotenv
 from dotenv import load_dotenv
 import json
 
+from src.utils.response_cache import get_cache
+from src.utils.company_identity import get_identity_index
+from src.utils.rate_limiter import get_rate_limiter, MAX_THROTTLE_RETRIES
+from src.utils.metrics import get_metrics
+from src.utils.sse_json import read_sse_json
+from src.utils.deallog_index import DeallogIndex, is_likely_english, split_chinese_english
+from src.utils.peer_fund_matcher import PeerFundMatcher, load_peer_fund_aliases, split_investors
+from src.utils.workbook_reader import read_workbook
+from src.utils.structured_logging import configure_logging
+from src.utils.tracing import span
+from src.utils.resilience import (
+    RETRY_MARKER,
+    RETRYABLE_STATUS,
+    RetryableError,
+    call_with_retry,
+    call_with_retry_async
+)
+
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 load_dotenv()
 
@@ -54,20 +77,30 @@ def convert_to_utf8(json_data):
 
 
    except Exception as e:
-       print(f"Failed to convert JSON to UTF-8: {e}")
+       logger.warning("Failed to convert JSON to UTF-8: %s", e)
        return None
 
 
-def get_funding_history(company_id):
-    """
-    Get company funding history using the /company/funding/list_all_2 endpoint
-    """
-    baseurl = 'https://api.xiniudata.com/openapi/v2/company/funding/list_all_2'
+# Endpoints; the environment overrides point the clients at local mock servers
+XINIU_BASE_URL = os.getenv('XINIU_BASE_URL', 'https://api.xiniudata.com/openapi/v2')
+METASO_SEARCH_URL = os.getenv('METASO_SEARCH_URL', 'https://metaso.cn/api/open/search')
 
-    payload = {
-        "companyId": int(company_id)
-    }
+# How get_company_info fetches funding, tags and members once the company ID is known:
+# - sequential:  company/get_2, then each sub-request one after another
+# - parallel:    company/get_2, then the four sub-requests concurrently
+# - speculative: all five requests concurrently (sub-requests are wasted if get_2 finds nothing)
+ENRICHMENT_MODES = ('sequential', 'parallel', 'speculative')
+DEFAULT_ENRICHMENT_MODE = 'parallel'
+
+# Per-request timeouts, so a hung connection turns into a retryable failure
+XINIU_TIMEOUT = aiohttp.ClientTimeout(total=30)
+METASO_TIMEOUT = (10, 60)  # (connect, read) seconds for the streaming search
 
+
+def build_request_data(payload):
+    """
+    Build the signed request body for a Xiniu API call
+    """
     reqData = {
         'version': 'v1',
         'accesskeyid': accesskeyid,
@@ -78,290 +111,525 @@ def get_funding_history(company_id):
     }
 
     reqData.update({'signature': signature_handler(reqData)})
-
-    try:
-        response = requests.post(baseurl, json=reqData)
-        response.raise_for_status()
-        json_response = response.json()
-        
-        if json_response['code'] == 0:
-            # Get only active funding records and sort by date
-            funding_list = [f for f in json_response.get('list', []) if f.get('active') == 'Y']
-            funding_list.sort(key=lambda x: x.get('fundingDate', ''), reverse=True)
-            
-            # Format each funding record
-            formatted_list = []
-            for funding in funding_list:
-                amount = funding.get('investment', 0)
-                currency = funding.get('currency', 'USD')
-                amount_str = f"{amount:,} {currency}" if amount else "金额未披露"
-                
-                formatted_list.append({
-                    '融资时间': funding.get('fundingDate', ''),
-                    '融资轮次': funding.get('round', ''),
-                    '融资金额': amount_str,
-                    '投资方': funding.get('investors', '未披露'),
-                    '新闻标题': funding.get('newsTitle', '')
-                })
-            
-            return formatted_list
-        else:
-            print(f"Error getting funding history: {json_response.get('codeMessage', 'Unknown error')}")
-            return None
-            
-    except requests.exceptions.HTTPError as http_err:
-        print(f'HTTP error occurred: {http_err}')
-    except requests.exceptions.RequestException as err:
-        print(f'Other error occurred: {err}')
-    except json.JSONDecodeError as json_err:
-        print(f'JSON decode error: {json_err}')
-    return None
+    return reqData
 
 
-def get_industry_attributes(company_id):
+def format_funding_list(json_response):
     """
-    Get detailed industry attributes using both primary and ordered tags
+    Turn a /company/funding/list_all_2 response into the funding history records
     """
-    # Get primary industry tags
-    primary_url = 'https://api.xiniudata.com/openapi/v2/company/tag/list_primary_tag'
-    ordered_url = 'https://api.xiniudata.com/openapi/v2/company/tag/list_ordered'
+    # Get only active funding records and sort by date
+    funding_list = [f for f in json_response.get('list', []) if f.get('active') == 'Y']
+    funding_list.sort(key=lambda x: x.get('fundingDate', ''), reverse=True)
 
-    payload = {
-        "companyId": int(company_id)
-    }
+    # Format each funding record
+    formatted_list = []
+    for funding in funding_list:
+        amount = funding.get('investment', 0)
+        currency = funding.get('currency', 'USD')
+        amount_str = f"{amount:,} {currency}" if amount else "金额未披露"
 
-    reqData = {
-        'version': 'v1',
-        'accesskeyid': accesskeyid,
-        'clientUserId': '',
-        'signatureversion': 'v1',
-        'payload': payload,
-        'timestamp': str(round(time.time()))
-    }
+        formatted_list.append({
+            '融资时间': funding.get('fundingDate', ''),
+            '融资轮次': funding.get('round', ''),
+            '融资金额': amount_str,
+            '投资方': funding.get('investors', '未披露'),
+            '新闻标题': funding.get('newsTitle', '')
+        })
 
-    reqData.update({'signature': signature_handler(reqData)})
+    return formatted_list
 
-    try:
-        # Get primary tags
-        primary_response = requests.post(primary_url, json=reqData)
-        primary_response.raise_for_status()
-        primary_json = primary_response.json()
-
-        # Get ordered tags
-        ordered_response = requests.post(ordered_url, json=reqData)
-        ordered_response.raise_for_status()
-        ordered_json = ordered_response.json()
-
-        result = {
-            '主要行业': {},
-            '所有行业标签': []
+
+def build_industry_attributes(primary_json, ordered_json):
+    """
+    Combine the primary tag and ordered tag responses into the industry attributes dict
+    """
+    result = {
+        '主要行业': {},
+        '所有行业标签': []
+    }
+
+    # Process primary tags
+    if primary_json and primary_json['code'] == 0:
+        data = primary_json.get('data', {})
+        result['主要行业'] = {
+            '一级行业': data.get('primary_tag1', ''),
+            '二级行业': data.get('primary_tag2', ''),
+            '其他标签': data.get('other_tags', [])
         }
 
-        # Process primary tags
-        if primary_json['code'] == 0:
-            data = primary_json.get('data', {})
-            result['主要行业'] = {
-                '一级行业': data.get('primary_tag1', ''),
-                '二级行业': data.get('primary_tag2', ''),
-                '其他标签': data.get('other_tags', [])
+    # Process ordered tags
+    if ordered_json and ordered_json['code'] == 0:
+        ordered_tags = ordered_json.get('list', [])
+        result['所有行业标签'] = [
+            {
+                '标签名': tag.get('name', ''),
+                '标签ID': tag.get('id', '')
             }
+            for tag in ordered_tags
+        ]
 
-        # Process ordered tags
-        if ordered_json['code'] == 0:
-            ordered_tags = ordered_json.get('list', [])
-            result['所有行业标签'] = [
-                {
-                    '标签名': tag.get('name', ''),
-                    '标签ID': tag.get('id', '')
-                }
-                for tag in ordered_tags
-            ]
+    return result
 
-        return result
 
-    except requests.exceptions.HTTPError as http_err:
-        print(f'HTTP error occurred: {http_err}')
-    except requests.exceptions.RequestException as err:
-        print(f'Other error occurred: {err}')
-    except json.JSONDecodeError as json_err:
-        print(f'JSON decode error: {json_err}')
-    return None
+def extract_founders(json_response):
+    """
+    Pick the CEO / founder / president entries out of a /company/list_member response
+    """
+    founders = []
+    for member in json_response.get('list', []):
+        position = member.get('position', '')
+        if position and any(title in position.lower() for title in ['ceo', '创始人', '总裁']):
+            founder = {
+                '姓名': member.get('name', ''),
+                '职位': position,
+                '简介': member.get('description', '')
+            }
+            founders.append(founder)
 
+    return founders if founders else None
 
-def get_founder_info(company_id):
+
+def build_company_info(data, funding_history, industry_info, founder_info):
     """
-    Get founder information using the /company/list_member endpoint
+    Assemble the company information dict from the company/get_2 data and the sub-requests
     """
-    baseurl = 'https://api.xiniudata.com/openapi/v2/company/list_member'
-
-    payload = {
-        "companyId": int(company_id)
+    funding_info = funding_history if funding_history else data.get('round')
+
+    result = {
+        '成立时间': data.get('establishDate'),
+        '是否上市': data.get('round'),
+        '母公司': None,  # Not available in current response
+        '母公司是否上市': None,  # Not available in current response
+        '融资历史': funding_info,
+        '行业属性': {
+            '简介': data.get('brief'),
+            '详细行业信息': industry_info
+        },
+        '产品/公司介绍': data.get('description'),
+        '创始人信息': founder_info
     }
+    return dict(sorted(result.items()))
 
-    reqData = {
-        'version': 'v1',
-        'accesskeyid': accesskeyid,
-        'clientUserId': '',
-        'signatureversion': 'v1',
-        'payload': payload,
-        'timestamp': str(round(time.time()))
-    }
 
-    reqData.update({'signature': signature_handler(reqData)})
+class XiniuAsyncClient:
+    """
+    Asynchronous Xiniu API client covering every endpoint used by the pipeline.
 
-    try:
-        response = requests.post(baseurl, json=reqData)
-        response.raise_for_status()
-        json_response = response.json()
-        
-        if json_response['code'] == 0:
-            # Get founder information
-            founders = []
-            for member in json_response.get('list', []):
-                position = member.get('position', '')
-                if position and any(title in position.lower() for title in ['ceo', '创始人', '总裁']):
-                    founder = {
-                        '姓名': member.get('name', ''),
-                        '职位': position,
-                        '简介': member.get('description', '')
-                    }
-                    founders.append(founder)
-            
-            return founders if founders else None
-            
-    except requests.exceptions.HTTPError as http_err:
-        print(f'HTTP error occurred: {http_err}')
-    except requests.exceptions.RequestException as err:
-        print(f'Other error occurred: {err}')
-    except json.JSONDecodeError as json_err:
-        print(f'JSON decode error: {json_err}')
-    return None
+    All calls share one aiohttp session. Pass an existing session to reuse it
+    (it is left open on exit), or use the client as an async context manager to
+    let it open and close its own. Successful responses are served from and
+    stored in the shared response cache, and names are resolved through the
+    company identity index, unless use_cache is False.
+    """
 
+    def __init__(self, session=None, enrichment_mode=DEFAULT_ENRICHMENT_MODE, use_cache=True):
+        if enrichment_mode not in ENRICHMENT_MODES:
+            raise ValueError(f"Unknown enrichment mode: {enrichment_mode}")
+        self.session = session
+        self.enrichment_mode = enrichment_mode
+        self.cache = get_cache() if use_cache else None
+        self.identities = get_identity_index() if use_cache else None
+        self.rate_limiter = get_rate_limiter()
+        self._owns_session = session is None
+
+    async def __aenter__(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _post(self, endpoint, payload):
+        """
+        Send a signed POST to a Xiniu endpoint and return the decoded JSON response
+
+        Args:
+            endpoint (str): Endpoint path relative to XINIU_BASE_URL, e.g. 'company/get_2'
+            payload (dict): Request payload
+        Returns:
+            dict: Decoded JSON response
+        Raises:
+            RetryableError: The endpoint kept failing transiently or its circuit breaker is open
+        """
+        metrics = get_metrics()
+        if self.cache is not None:
+            # SQLite reads and commits run in a worker thread so they do not stall the event loop
+            cached = await asyncio.to_thread(self.cache.get, endpoint, payload)
+            metrics.record_cache('xiniu', endpoint, cached is not None)
+            if cached is not None:
+                return cached
+
+        url = f"{XINIU_BASE_URL}/{endpoint}"
+
+        async def send():
+            for attempt in range(MAX_THROTTLE_RETRIES + 1):
+                await self.rate_limiter.acquire_async('xiniu', endpoint)
+                # Sign each attempt separately so the timestamp stays fresh
+                reqData = build_request_data(payload)
+                with metrics.request('xiniu', endpoint) as call:
+                    async with self.session.post(url, json=reqData, timeout=XINIU_TIMEOUT) as response:
+                        call.status = response.status
+                        if response.status == 429:
+                            # Pause the buckets on the last 429 too, so the backoff retry waits for them
+                            self.rate_limiter.throttled('xiniu', endpoint, response.headers.get('Retry-After'))
+                            if attempt < MAX_THROTTLE_RETRIES:
+                                continue
+                        response.raise_for_status()
+                        body = await response.read()
+                        call.bytes = len(body)
+                        return json.loads(body)
+
+        # All Xiniu endpoints are read-only, so transient failures are safe to retry
+        with span(f"xiniu {endpoint}", cat='xiniu', payload=payload):
+            json_response = await call_with_retry_async(send, 'xiniu', endpoint)
+
+        # Only successful responses are cached so errors are retried on the next run. Name lookups
+        # without a match are not either: the name map (src/utils/name_resolution.py) keeps those
+        # for a shorter time
+        if self.cache is not None and json_response.get('code') == 0 and json_response.get('idList') != []:
+            await asyncio.to_thread(self.cache.set, endpoint, payload, json_response)
+        return json_response
+
+    async def get_funding_history(self, company_id):
+        """
+        Get company funding history using the /company/funding/list_all_2 endpoint
+        """
+        try:
+            json_response = await self._post('company/funding/list_all_2', {"companyId": int(company_id)})
+
+            if json_response['code'] == 0:
+                return format_funding_list(json_response)
+            else:
+                logger.warning("Error getting funding history for company %s: %s", company_id,
+                               json_response.get('codeMessage', 'Unknown error'))
+                return None
+
+        except aiohttp.ClientResponseError as http_err:
+            logger.warning("HTTP error for company %s: %s", company_id, http_err)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            logger.warning("Request error for company %s: %s", company_id, err)
+        except json.JSONDecodeError as json_err:
+            logger.warning("JSON decode error for company %s: %s", company_id, json_err)
+        return None
+
+    async def get_primary_tags(self, company_id):
+        """
+        Get the raw /company/tag/list_primary_tag response
+        """
+        return await self._post('company/tag/list_primary_tag', {"companyId": int(company_id)})
+
+    async def get_ordered_tags(self, company_id):
+        """
+        Get the raw /company/tag/list_ordered response
+        """
+        return await self._post('company/tag/list_ordered', {"companyId": int(company_id)})
+
+    async def get_industry_attributes(self, company_id):
+        """
+        Get detailed industry attributes using both primary and ordered tags
+        """
+        try:
+            primary_json = await self.get_primary_tags(company_id)
+            ordered_json = await self.get_ordered_tags(company_id)
+            return build_industry_attributes(primary_json, ordered_json)
+
+        except aiohttp.ClientResponseError as http_err:
+            logger.warning("HTTP error for company %s: %s", company_id, http_err)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            logger.warning("Request error for company %s: %s", company_id, err)
+        except json.JSONDecodeError as json_err:
+            logger.warning("JSON decode error for company %s: %s", company_id, json_err)
+        return None
+
+    async def get_founder_info(self, company_id):
+        """
+        Get founder information using the /company/list_member endpoint
+        """
+        try:
+            json_response = await self._post('company/list_member', {"companyId": int(company_id)})
+
+            if json_response['code'] == 0:
+                return extract_founders(json_response)
+
+        except aiohttp.ClientResponseError as http_err:
+            logger.warning("HTTP error for company %s: %s", company_id, http_err)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            logger.warning("Request error for company %s: %s", company_id, err)
+        except json.JSONDecodeError as json_err:
+            logger.warning("JSON decode error for company %s: %s", company_id, json_err)
+        return None
+
+    async def find_company_ids(self, company_name):
+        """
+        Look up the Xiniu IDs of an exact full company name
+
+        Returns:
+            list: Matching company IDs as strings, empty if Xiniu has no company of that name
+        Raises:
+            RetryableError: The lookup kept failing transiently or its circuit breaker is open
+            ValueError: Xiniu answered with an error code
+            aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError: The request failed
+        """
+        payload = {"fullName": company_name}
+        json_response = await self._post('company/id/list_by_fullname', payload)
+        # Only build the dump when it will be written
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("company/id/list_by_fullname %s -> %s", json.dumps(payload, ensure_ascii=False),
+                         json.dumps(json_response, ensure_ascii=False))
+
+        if json_response['code'] != 0:
+            raise ValueError(f"code {json_response.get('code')}, {json_response.get('codeMessage', 'No message')}")
+        return [str(company_id) for company_id in json_response.get('idList') or []]
+
+    async def get_company_id(self, company_name):
+        """
+        Get company ID from company name using the Xiniu API
+        """
+        if self.identities is not None:
+            identity = await asyncio.to_thread(self.identities.lookup, company_name)
+            if identity and identity.xiniu_id:
+                return identity.xiniu_id
+
+        try:
+            company_ids = await self.find_company_ids(company_name)
+            if company_ids:
+                if self.identities is not None:
+                    await asyncio.to_thread(self.identities.record, company_name, xiniu_id=company_ids[0])
+                return company_ids[0]
+            logger.debug("No Xiniu ID for %s", company_name)
+
+        except aiohttp.ClientResponseError as e:
+            logger.warning("HTTP error looking up %s: %s", company_name, e)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning("Request error looking up %s: %s", company_name, e)
+        except json.JSONDecodeError as e:
+            logger.warning("JSON decode error looking up %s: %s", company_name, e)
+        except ValueError as e:
+            logger.debug("No Xiniu ID for %s: %s", company_name, e)
+        except RetryableError:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error looking up %s: %s", company_name, e)
+
+        return None
+
+    async def _gather_enrichment(self, company_id, sequential=False):
+        """
+        Fetch the funding, primary-tag, ordered-tag and member data, firing the
+        four requests together unless sequential is set. A failed sub-request
+        only affects its own part of the record: it becomes None, or
+        RETRY_MARKER when it failed transiently.
+
+        Returns:
+            tuple: (funding_history, industry_info, founder_info)
+        """
+        calls = [
+            self.get_funding_history,
+            self.get_primary_tags,
+            self.get_ordered_tags,
+            self.get_founder_info
+        ]
+        if sequential:
+            results = []
+            for call in calls:
+                try:
+                    results.append(await call(company_id))
+                except Exception as e:
+                    results.append(e)
+        else:
+            results = await asyncio.gather(*[call(company_id) for call in calls], return_exceptions=True)
+
+        for name, result in zip(['funding', 'primary tags', 'ordered tags', 'members'], results):
+            if isinstance(result, BaseException):
+                logger.warning("Error getting %s for company %s: %s", name, company_id, result)
+        funding_history, primary_json, ordered_json, founder_info = [
+            RETRY_MARKER if isinstance(result, RetryableError)
+            else None if isinstance(result, BaseException)
+            else result
+            for result in results
+        ]
+
+        tag_responses = [None if tag_json == RETRY_MARKER else tag_json for tag_json in (primary_json, ordered_json)]
+        if any(tag_json is not None for tag_json in tag_responses):
+            industry_info = build_industry_attributes(*tag_responses)
+        elif RETRY_MARKER in (primary_json, ordered_json):
+            industry_info = RETRY_MARKER
+        else:
+            industry_info = None
+
+        return funding_history, industry_info, founder_info
+
+    async def get_company_info(self, company_id, enrichment_mode=None):
+        """
+        Get specific company information:
+        1. 成立时间 (Establishment Date)
+        2. 是否上市 (Listed Status)
+        3. 母公司 (Parent Company)
+        4. 母公司是否上市 (Parent Company Listed Status)
+        5. 融资历史 (Funding History)
+        6. 行业属性 (Industry)
+        7. 产品/公司介绍 (Product/Company Description)
+        8. 创始人信息 (Founder Information)
+
+        Args:
+            company_id (str): Xiniu company ID
+            enrichment_mode (str): One of ENRICHMENT_MODES, defaults to the client's mode
+        Raises:
+            RetryableError: company/get_2 itself failed transiently
+        """
+        mode = enrichment_mode or self.enrichment_mode
+        if mode not in ENRICHMENT_MODES:
+            raise ValueError(f"Unknown enrichment mode: {mode}")
+
+        enrichment = None
+        if mode == 'speculative':
+            enrichment = asyncio.ensure_future(self._gather_enrichment(company_id))
+
+        try:
+            json_response = await self._post('company/get_2', {"companyId": int(company_id)})
+
+            # Full response for debugging, only built when it will be written
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("company/get_2 %s -> %s", company_id, json.dumps(json_response, ensure_ascii=False))
+
+            # Extract only the requested information
+            if json_response['code'] == 0 and 'companyVO' in json_response:
+                data = json_response['companyVO']
+                if self.identities is not None and (data.get('fullName') or data.get('creditCode')):
+                    await asyncio.to_thread(self.identities.record, xiniu_id=company_id,
+                                            canonical_name=data.get('fullName'), credit_code=data.get('creditCode'))
+
+                if mode == 'sequential':
+                    funding_history, industry_info, founder_info = await self._gather_enrichment(
+                        company_id, sequential=True)
+                elif enrichment is not None:
+                    funding_history, industry_info, founder_info = await enrichment
+                else:
+                    funding_history, industry_info, founder_info = await self._gather_enrichment(company_id)
 
-def get_company_id(company_name):
+                return build_company_info(data, funding_history, industry_info, founder_info)
+            else:
+                logger.debug("No valid data found in company/get_2 response for %s", company_id)
+                return None
+
+        except aiohttp.ClientResponseError as http_err:
+            logger.warning("HTTP error for company %s: %s", company_id, http_err)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            logger.warning("Request error for company %s: %s", company_id, err)
+        except json.JSONDecodeError as json_err:
+            logger.warning("JSON decode error for company %s: %s", company_id, json_err)
+        finally:
+            # Drop speculative sub-requests that are no longer needed
+            if enrichment is not None and not enrichment.done():
+                enrichment.cancel()
+        return None
+
+    async def get_company_industry(self, company_id):
+        """
+        Get company industry information using the /company/industry/list endpoint
+        """
+        try:
+            json_response = await self._post('company/industry/list', {"companyId": int(company_id)})
+
+            if json_response['code'] == 0:
+                logger.info("赛道名称: %s", "，".join(industry['name'] for industry in json_response['list']))
+                return json_response
+
+        except RetryableError:
+            raise
+        except Exception as e:
+            logger.warning("Error getting industry for company %s: %s", company_id, e)
+
+        return None
+
+
+def _run_sync(method_name, *args):
     """
-    Get company ID from company name using the Xiniu API
+    Run one XiniuAsyncClient call to completion from synchronous code.
+    Must not be called from inside a running event loop; async code should
+    use XiniuAsyncClient directly.
+
+    Calls that still fail transiently after retries return None here, as the
+    sync helpers always have; the async pipeline marks them as RETRY instead.
     """
-    baseurl = 'https://api.xiniudata.com/openapi/v2/company/id/list_by_fullname'
-    payload = {"fullName": company_name}
-    
-    reqData = {
-        'version': 'v1',
-        'accesskeyid': accesskeyid,
-        'clientUserId': '',
-        'signatureversion': 'v1',
-        'payload': payload,
-        'timestamp': str(round(time.time()))
-    }
-    
-    reqData.update({'signature': signature_handler(reqData)})
-    
+    async def runner():
+        async with XiniuAsyncClient() as client:
+            return await getattr(client, method_name)(*args)
+
     try:
-        print(f"\nMaking API request for company: {company_name}")
-        print(f"Request data: {json.dumps(reqData, ensure_ascii=False, indent=2)}")
-        
-        response = requests.post(baseurl, json=reqData)
-        print(f"Response status code: {response.status_code}")
-        
-        response.raise_for_status()
-        json_response = response.json()
-        print(f"Response data: {json.dumps(json_response, ensure_ascii=False, indent=2)}")
-        
-        if json_response['code'] == 0 and json_response['idList']:
-            return str(json_response['idList'][0])
-        else:
-            print(f"API returned code {json_response.get('code')} with message: {json_response.get('codeMessage', 'No message')}")
-        
-    except requests.exceptions.HTTPError as e:
-        print(f"HTTP Error: {str(e)}")
-    except requests.exceptions.RequestException as e:
-        print(f"Request Error: {str(e)}")
-    except json.JSONDecodeError as e:
-        print(f"JSON Decode Error: {str(e)}")
-        print(f"Raw response: {response.text}")
-    except Exception as e:
-        print(f"Unexpected Error: {str(e)}")
-    
-    return None
+        return asyncio.run(runner())
+    except RetryableError as e:
+        logger.warning("Retryable error in %s: %s", method_name, e)
+        return None
 
 
-def get_company_info(company_id):
+def get_funding_history(company_id):
     """
-    Get specific company information:
-    1. 成立时间 (Establishment Date)
-    2. 是否上市 (Listed Status)
-    3. 母公司 (Parent Company)
-    4. 母公司是否上市 (Parent Company Listed Status)
-    5. 融资历史 (Funding History)
-    6. 行业属性 (Industry)
-    7. 产品/公司介绍 (Product/Company Description)
-    8. 创始人信息 (Founder Information)
+    Get company funding history using the /company/funding/list_all_2 endpoint
     """
-    baseurl = 'https://api.xiniudata.com/openapi/v2/company/get_2'
+    return _run_sync('get_funding_history', company_id)
 
-    payload = {
-        "companyId": int(company_id)
-    }
 
-    reqData = {
-        'version': 'v1',
-        'accesskeyid': accesskeyid,
-        'clientUserId': '',
-        'signatureversion': 'v1',
-        'payload': payload,
-        'timestamp': str(round(time.time()))
-    }
+def get_industry_attributes(company_id):
+    """
+    Get detailed industry attributes using both primary and ordered tags
+    """
+    return _run_sync('get_industry_attributes', company_id)
 
-    reqData.update({'signature': signature_handler(reqData)})
 
-    try:
-        response = requests.post(baseurl, json=reqData)
-        response.raise_for_status()
-        json_response = response.json()
-        
-        # Print full response for debugging
-        print("Full company details response:")
-        print(json.dumps(json_response, ensure_ascii=False, indent=4))
-        
-        # Extract only the requested information
-        if json_response['code'] == 0 and 'companyVO' in json_response:
-            data = json_response['companyVO']
-            
-            # Get funding history
-            funding_history = get_funding_history(company_id)
-            funding_info = funding_history if funding_history else data.get('round')
+def get_founder_info(company_id):
+    """
+    Get founder information using the /company/list_member endpoint
+    """
+    return _run_sync('get_founder_info', company_id)
 
-            # Get detailed industry attributes
-            industry_info = get_industry_attributes(company_id)
 
-            # Get founder information
-            founder_info = get_founder_info(company_id)
-            
-            result = {
-                '成立时间': data.get('establishDate'),
-                '是否上市': data.get('round'),
-                '母公司': None,  # Not available in current response
-                '母公司是否上市': None,  # Not available in current response
-                '融资历史': funding_info,
-                '行业属性': {
-                    '简介': data.get('brief'),
-                    '详细行业信息': industry_info
-                },
-                '产品/公司介绍': data.get('description'),
-                '创始人信息': founder_info
-            }
-            return dict(sorted(result.items()))
-        else:
-            print("No valid data found in response")
-            return None
-            
-    except requests.exceptions.HTTPError as http_err:
-        print(f'HTTP error occurred: {http_err}')
-    except requests.exceptions.RequestException as err:
-        print(f'Other error occurred: {err}')
-    except json.JSONDecodeError as json_err:
-        print(f'JSON decode error: {json_err}')
-    return None
+def get_company_id(company_name):
+    """
+    Get company ID from company name using the Xiniu API
+    """
+    return _run_sync('get_company_id', company_name)
+
+
+def get_company_info(company_id, enrichment_mode=None):
+    """
+    Get specific company information (see XiniuAsyncClient.get_company_info)
+    """
+    return _run_sync('get_company_info', company_id, enrichment_mode)
+
+
+def _post_metaso(url, headers, data):
+    """
+    POST a Metaso search request, waiting for the shared rate limiter, retrying
+    after 429s and retrying transient failures with backoff
+
+    Raises:
+        RetryableError: The search kept failing transiently or its circuit breaker is open
+    """
+    rate_limiter = get_rate_limiter()
+
+    def send():
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            rate_limiter.acquire('metaso', 'search')
+            # The answer is streamed by the caller, so this times the response headers only
+            with get_metrics().request('metaso', 'search') as call:
+                response = requests.post(url, headers=headers, data=json.dumps(data), stream=True,
+                                         timeout=METASO_TIMEOUT)
+                call.status = response.status_code
+            if response.status_code == 429:
+                rate_limiter.throttled('metaso', 'search', response.headers.get('Retry-After'))
+                if attempt < MAX_THROTTLE_RETRIES:
+                    response.close()
+                    continue
+            if response.status_code in RETRYABLE_STATUS:
+                response.raise_for_status()
+            return response
+
+    return call_with_retry(send, 'metaso', 'search')
 
 
 def query_metaso(company_name):
@@ -373,7 +641,7 @@ def query_metaso(company_name):
     Returns:
         dict: Dictionary containing parent company name and listing status
     """
-    url = "https://metaso.cn/api/open/search"
+    url = METASO_SEARCH_URL
     headers = {
         "Content-Type": "application/json",
         "Accept": "text/event-stream",
@@ -389,41 +657,21 @@ def query_metaso(company_name):
     }
     
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(data), stream=True)
+        response = _post_metaso(url, headers, data)
         
         if response.status_code == 200:
-            full_response = ""
-            for line in response.iter_lines():
-                if line:
-                    decoded_line = line.decode('utf-8')
-                    if decoded_line.startswith("data:") and not decoded_line.startswith("data:[DONE]"):
-                        try:
-                            json_str = decoded_line[5:]  # Remove "data:" prefix
-                            data = json.loads(json_str)
-                            if data.get("type") == "append-text":
-                                full_response += data.get("text", "")
-                        except json.JSONDecodeError:
-                            continue
-            
             try:
-                # Clean up the response string to ensure it's valid JSON
-                full_response = full_response.strip()
-                if full_response.startswith('```json'):
-                    full_response = full_response[7:]  # Remove ```json
-                if full_response.endswith('```'):
-                    full_response = full_response[:-3]  # Remove ```
-                full_response = full_response.strip()
-                
-                # Parse the JSON response
-                result = json.loads(full_response)
-                return result
+                # Stop reading once the answer's JSON object is complete
+                return read_sse_json(response.iter_lines())
             except json.JSONDecodeError as e:
-                print(f"Error parsing JSON response: {e}")
-                print(f"Raw response: {full_response}")
+                logger.warning("Error parsing Metaso answer for %s: %s", company_name, e)
+                logger.debug("Raw Metaso answer: %s", e.doc)
                 return {
                     "母公司名称": "NULL",
                     "母公司是否上市": "NULL"
                 }
+            finally:
+                response.close()
             
         else:
             return {
@@ -431,8 +679,14 @@ def query_metaso(company_name):
                 "母公司是否上市": "NULL"
             }
             
+    except RetryableError as e:
+        logger.warning("Retryable error querying Metaso API for %s: %s", company_name, e)
+        return {
+            "母公司名称": RETRY_MARKER,
+            "母公司是否上市": RETRY_MARKER
+        }
     except Exception as e:
-        print(f"Error querying Metaso API: {e}")
+        logger.warning("Error querying Metaso API for %s: %s", company_name, e)
         return {
             "母公司名称": "NULL",
             "母公司是否上市": "NULL"
@@ -448,7 +702,7 @@ def query_stock_reform(company_name):
     Returns:
         dict: Dictionary containing whether it's a joint-stock company and its stock reform time
     """
-    url = "https://metaso.cn/api/open/search"
+    url = METASO_SEARCH_URL
     headers = {
         "Content-Type": "application/json",
         "Accept": "text/event-stream",
@@ -464,41 +718,21 @@ def query_stock_reform(company_name):
     }
     
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(data), stream=True)
+        response = _post_metaso(url, headers, data)
         
         if response.status_code == 200:
-            full_response = ""
-            for line in response.iter_lines():
-                if line:
-                    decoded_line = line.decode('utf-8')
-                    if decoded_line.startswith("data:") and not decoded_line.startswith("data:[DONE]"):
-                        try:
-                            json_str = decoded_line[5:]  # Remove "data:" prefix
-                            data = json.loads(json_str)
-                            if data.get("type") == "append-text":
-                                full_response += data.get("text", "")
-                        except json.JSONDecodeError:
-                            continue
-            
             try:
-                # Clean up the response string to ensure it's valid JSON
-                full_response = full_response.strip()
-                if full_response.startswith('```json'):
-                    full_response = full_response[7:]  # Remove ```json
-                if full_response.endswith('```'):
-                    full_response = full_response[:-3]  # Remove ```
-                full_response = full_response.strip()
-                
-                # Parse the JSON response
-                result = json.loads(full_response)
-                return result
+                # Stop reading once the answer's JSON object is complete
+                return read_sse_json(response.iter_lines())
             except json.JSONDecodeError as e:
-                print(f"Error parsing JSON response: {e}")
-                print(f"Raw response: {full_response}")
+                logger.warning("Error parsing Metaso answer for %s: %s", company_name, e)
+                logger.debug("Raw Metaso answer: %s", e.doc)
                 return {
                     "是否是股份公司": "NULL",
                     "股改时间": "NULL"
                 }
+            finally:
+                response.close()
             
         else:
             return {
@@ -506,8 +740,14 @@ def query_stock_reform(company_name):
                 "股改时间": "NULL"
             }
             
+    except RetryableError as e:
+        logger.warning("Retryable error querying Metaso API for %s: %s", company_name, e)
+        return {
+            "是否是股份公司": RETRY_MARKER,
+            "股改时间": RETRY_MARKER
+        }
     except Exception as e:
-        print(f"Error querying Metaso API: {e}")
+        logger.warning("Error querying Metaso API for %s: %s", company_name, e)
         return {
             "是否是股份公司": "NULL",
             "股改时间": "NULL"
@@ -521,10 +761,10 @@ def load_peer_funds(file_path="data/input/pf_companies.json"):
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             peer_funds = set(json.load(f))
-        print(f"Loaded {len(peer_funds)} peer funds")
+        logger.info("Loaded %d peer funds", len(peer_funds))
         return peer_funds
     except Exception as e:
-        print(f"Error loading peer funds list: {str(e)}")
+        logger.error("Error loading peer funds list: %s", e)
         return set()
 
 def load_deallog_companies(file_path="data/input/deallog_companies.json"):
@@ -535,97 +775,98 @@ def load_deallog_companies(file_path="data/input/deallog_companies.json"):
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             company_names = set(json.load(f))
-        print(f"Loaded {len(company_names)} companies from deallog list")
+        logger.info("Loaded %d companies from deallog list", len(company_names))
         return company_names
     except Exception as e:
-        print(f"Error loading deallog list: {str(e)}")
+        logger.error("Error loading deallog list: %s", e)
         return set()
 
 
-def is_likely_english(text):
-    """Check if text contains English characters"""
-    return any(ord(c) < 128 for c in text)
+# Indexes built by as_deallog_index for plain collections: {id(names): (names, len(names), index)}.
+# The collection is kept alive with its entry so its id cannot be reused by another object.
+_deallog_indexes = {}
+
 
-def split_chinese_english(name):
+def as_deallog_index(deallog_names):
     """
-    Split a company name that might contain both Chinese and English parts
-    Example: "京东方 (BOE)" -> ["京东方", "BOE"]
-    But don't split location names like "展讯通信（上海）有限公司"
+    Return deallog_names as a DeallogIndex; a plain collection of names is indexed
+    once and the index reused for later calls with the same collection
     """
-    name = name.strip()
-    
-    # Split by parentheses
-    for separator in ['(', '（', '[', '【']:
-        if separator in name:
-            # Split and clean each part
-            chinese_part = name.split(separator)[0].strip()
-            eng_part = name.split(separator)[1].split(')')[0].split('）')[0].split(']')[0].split('】')[0].strip()
-            
-            # Only split if the part in parentheses looks like English
-            if is_likely_english(eng_part):
-                parts = []
-                if chinese_part:
-                    parts.append(chinese_part)
-                if eng_part:
-                    parts.append(eng_part)
-                return parts
-    
-    # If no English part found, return the original name
-    return [name]
+    if isinstance(deallog_names, DeallogIndex):
+        return deallog_names
+    cached = _deallog_indexes.get(id(deallog_names))
+    if cached is not None and cached[0] is deallog_names and cached[1] == len(deallog_names):
+        return cached[2]
+    logger.warning("check_in_deallog got %d names instead of a DeallogIndex; build one DeallogIndex "
+                   "up front to avoid indexing them here", len(deallog_names))
+    index = DeallogIndex(deallog_names)
+    _deallog_indexes[id(deallog_names)] = (deallog_names, len(deallog_names), index)
+    return index
+
 
 def check_in_deallog(company_name, deallog_names):
     """
-    Check if any part (Chinese or English) from the deallog list is included in the company name
+    Check if any part (Chinese or English) from the deallog list is included in the company name,
+    or a company name part is included in a deallog name
+    
+    Args:
+        company_name (str): Company name from the input sheet
+        deallog_names (DeallogIndex): Index built once from load_deallog_companies(); a plain
+            collection of names is indexed on first use (see as_deallog_index)
+    Returns:
+        str: "是" or "不是"
     """
-    if not company_name:
+    match = as_deallog_index(deallog_names).find_match(company_name)
+    if match is None:
         return "不是"
     
-    # Clean the company name
-    company_name = company_name.strip()
-    
-    # Get all parts of the company name
-    company_parts = split_chinese_english(company_name)
-    print(f"\nChecking company: {company_name}")
-    print(f"Company parts: {company_parts}")
-    
-    # Check if any deallog name part is included in any of the company name parts
-    for deallog_name in deallog_names:
-        deallog_parts = split_chinese_english(deallog_name)
-        for deallog_part in deallog_parts:
-            # Skip very short parts (like city names)
-            if len(deallog_part) <= 2:
-                continue
-                
-            for company_part in company_parts:
-                if deallog_part in company_part:
-                    print(f"Match found! Deallog part '{deallog_part}' is in company part '{company_part}'")
-                    return "是"
-                # Also check if company part is in deallog name (reverse check)
-                if len(company_part) > 2 and company_part in deallog_part:
-                    print(f"Match found! Company part '{company_part}' is in deallog part '{deallog_part}'")
-                    return "是"
+    company_part, deallog_part, direction = match
+    if direction == 'forward':
+        logger.debug("Deallog match: deallog part '%s' is in company part '%s'", deallog_part, company_part)
+    else:
+        logger.debug("Deallog match: company part '%s' is in deallog part '%s'", company_part, deallog_part)
+    return "是"
+
+
+def as_peer_fund_matcher(peer_funds):
+    """
+    Return peer_funds as a PeerFundMatcher, indexing a plain set of fund names on the fly
+    """
+    if isinstance(peer_funds, PeerFundMatcher):
+        return peer_funds
+    return PeerFundMatcher(peer_funds)
+
+
+def summarize_peer_funds(funding_history, peer_funds):
+    """
+    Match the investors of every funding record against the peer funds once
     
-    return "不是"
+    Args:
+        funding_history (list): Funding records from get_funding_history
+        peer_funds (PeerFundMatcher): Matcher built from load_peer_funds() and the alias table
+    Returns:
+        dict: See PeerFundMatcher.summarize, or None if there is no funding history
+    """
+    if not funding_history or not isinstance(funding_history, list):
+        return None
+    summary = as_peer_fund_matcher(peer_funds).summarize(funding_history)
+    for match in summary['matches']:
+        if match.alias != match.fund or match.investor != match.fund:
+            logger.debug("Peer fund match: '%s' -> '%s' (via '%s')", match.investor, match.fund, match.alias)
+    return summary
 
 
-def find_peer_fund_intersection(funding_history, peer_funds):
+def find_peer_fund_intersection(funding_history, peer_funds, summary=None):
     """
     Find intersection between company's investors and peer funds
+    
+    Args:
+        summary (dict): Result of summarize_peer_funds, if already computed for this history
     """
-    if not funding_history or not isinstance(funding_history, list):
+    summary = summary or summarize_peer_funds(funding_history, peer_funds)
+    if not summary or not summary['funds']:
         return "NULL"
-    
-    matched_funds = set()
-    
-    for funding in funding_history:
-        investors = funding.get('投资方', '')
-        if investors:
-            # Split investors string into individual investors
-            investor_list = [inv.strip() for inv in investors.split('，')]
-            # Find intersection with peer funds
-            matched_funds.update(set(investor_list) & peer_funds)
-    
-    return "，".join(sorted(matched_funds)) if matched_funds else "NULL"
+    return "，".join(summary['funds'])
 
 
 def check_multiple_fundings_in_year(funding_history):
@@ -658,45 +899,34 @@ def check_multiple_investors_in_round(funding_history):
         return "不是"
     
     for funding in funding_history:
-        investors = funding.get('投资方', '')
-        if investors:
-            # Split investors string into individual investors
-            investor_list = [inv.strip() for inv in investors.split('，')]
-            if len(investor_list) > 3:
-                return "是"
+        if len(split_investors(funding.get('投资方', ''))) > 3:
+            return "是"
     return "不是"
 
 
-def check_multiple_peer_funds(funding_history, peer_funds):
+def check_multiple_peer_funds(funding_history, peer_funds, summary=None):
     """
     Check if more than 2 peer funds have invested
+    
+    Args:
+        summary (dict): Result of summarize_peer_funds, if already computed for this history
     """
-    if not funding_history or not isinstance(funding_history, list):
+    summary = summary or summarize_peer_funds(funding_history, peer_funds)
+    if not summary:
         return "不是"
-    
-    all_investors = set()
-    for funding in funding_history:
-        investors = funding.get('投资方', '')
-        if investors:
-            # Split investors string into individual investors
-            investor_list = [inv.strip() for inv in investors.split('，')]
-            all_investors.update(investor_list)
-    
-    # Find intersection with peer funds
-    matched_funds = all_investors & peer_funds
-    return "是" if len(matched_funds) >= 2 else "不是"
+    return "是" if len(summary['funds']) >= 2 else "不是"
 
 
 def process_excel_file(input_file):
     """
     Process Excel file and add company information columns, maintaining batch order
     """
-    print(f"Reading Excel file: {input_file}")
+    logger.info("Reading Excel file: %s", input_file)
     
     try:
         # Ensure input file exists
         if not os.path.exists(input_file):
-            print(f"Error: Input file {input_file} not found")
+            logger.error("Input file %s not found", input_file)
             return
             
         # Create output file path
@@ -710,29 +940,21 @@ def process_excel_file(input_file):
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
         
         # Load peer funds
-        print("Loading peer funds list...")
-        peer_funds = load_peer_funds()
-        print(f"Loaded {len(peer_funds)} peer funds")
+        peer_funds = PeerFundMatcher(load_peer_funds(), load_peer_fund_aliases())
         
         # Load deallog companies
-        print("\nLoading deallog companies list...")
-        deallog_companies = load_deallog_companies()
+        deallog_companies = DeallogIndex(load_deallog_companies())
         
         # Create Excel writer for output
         writer = pd.ExcelWriter(output_file, engine='openpyxl')
         
-        # Read all sheets
-        excel_file = pd.ExcelFile(input_file)
-        sheet_names = excel_file.sheet_names
+        # Read all sheets in one pass over the workbook
+        sheets = read_workbook(input_file)
         
         # Process each sheet in order
-        for sheet_name in sheet_names:
-            print(f"\nProcessing sheet: {sheet_name}")
-            
-            # Read the sheet
-            df = pd.read_excel(input_file, sheet_name=sheet_name)
+        for sheet_name, df in sheets.items():
             company_count = len(df)
-            print(f"Found {company_count} companies to process in {sheet_name}")
+            logger.info("Processing sheet %s: %d companies", sheet_name, company_count)
             
             # Initialize new columns for company information
             df['成立时间'] = ''
@@ -752,10 +974,15 @@ def process_excel_file(input_file):
             df['是否是股份公司'] = ''
             df['股改时间'] = ''
             
+            # These hold lists/dicts; an all-empty column would otherwise get a string dtype
+            object_columns = ['融资历史', '行业属性', '创始人信息']
+            df[object_columns] = df[object_columns].astype(object)
+            
             # Process each company in the sheet
             for idx, row in df.iterrows():
                 company_name = row['示范企业名称']
-                print(f"\nProcessing company {idx+1}/{company_count} in {sheet_name}: {company_name}")
+                company_start = time.time()
+                status = 'not_found'
                 
                 # Check if company is in deallog list
                 df.at[idx, '已在Deal List'] = check_in_deallog(company_name, deallog_companies)
@@ -764,10 +991,11 @@ def process_excel_file(input_file):
                 company_id = get_company_id(company_name)
                 
                 if company_id:
-                    print(f"Found Company ID: {company_id}")
+                    logger.debug("Found Company ID for %s: %s", company_name, company_id)
                     
                     # Get company information
                     company_info = get_company_info(company_id)
+                    status = 'failed'
                     
                     if company_info:
                         # Update DataFrame with company information
@@ -804,22 +1032,21 @@ def process_excel_file(input_file):
                         df.at[idx, '创始人信息'] = company_info.get('创始人信息', '')
                         
                         # Query Metaso API for parent company information
-                        print("Querying Metaso API for parent company information...")
                         metaso_info = query_metaso(company_name)
                         df.at[idx, '母公司'] = metaso_info.get('母公司名称', 'NULL')
                         df.at[idx, '母公司是否上市'] = metaso_info.get('母公司是否上市', 'NULL')
                         
                         # Query Metaso API for stock reform information
-                        print("Querying Metaso API for stock reform information...")
                         stock_info = query_stock_reform(company_name)
                         df.at[idx, '是否是股份公司'] = stock_info.get('是否是股份公司', 'NULL')
                         df.at[idx, '股改时间'] = stock_info.get('股改时间', 'NULL')
-                        
-                        print("Successfully retrieved company information")
-                    else:
-                        print("Failed to retrieve company information")
-                else:
-                    print(f"No company ID found for {company_name}")
+                        status = 'ok'
+                
+                # One line per company
+                seconds = time.time() - company_start
+                logger.info("%s %d/%d %s: %s (%.2fs)", sheet_name, idx + 1, company_count, status, company_name,
+                            seconds, extra={'sheet': sheet_name, 'row': idx + 1, 'company': company_name,
+                                            'status': status, 'seconds': round(seconds, 3)})
             
             # Reorder columns to put 赛道名称 after 行业属性
             cols = df.columns.tolist()
@@ -834,10 +1061,10 @@ def process_excel_file(input_file):
         
         # Save and close the Excel writer
         writer.close()
-        print(f"\nProcessed Excel file saved as: {output_file}")
+        logger.info("Processed Excel file saved as: %s", output_file)
         
     except Exception as e:
-        print(f"Error processing Excel file: {str(e)}")
+        logger.error("Error processing Excel file: %s", e)
         raise
 
 
@@ -847,10 +1074,8 @@ def test_first_10_rows():
     """
     try:
         # Load peer funds and deallog companies
-        peer_funds = load_peer_funds()
-        deallog_companies = load_deallog_companies()
-        
-        print("\nProcessing first 10 rows...")
+        peer_funds = PeerFundMatcher(load_peer_funds(), load_peer_fund_aliases())
+        deallog_companies = DeallogIndex(load_deallog_companies())
         
         # Read the first sheet
         input_file = "data/input/1-6批制造业单项冠军 copy.xlsx"
@@ -867,7 +1092,7 @@ def test_first_10_rows():
         # Take first 10 rows
         df = df.head(10)
         company_count = len(df)
-        print(f"\nProcessing first {company_count} companies from 第一批")
+        logger.info("Processing first %d companies from 第一批", company_count)
         
         # Initialize new columns for company information
         df['成立时间'] = ''
@@ -890,7 +1115,7 @@ def test_first_10_rows():
         # Process each company
         for idx, row in df.iterrows():
             company_name = row['示范企业名称']
-            print(f"\nProcessing company {idx+1}/{company_count}: {company_name}")
+            logger.info("Processing company %d/%d: %s", idx + 1, company_count, company_name)
             
             # Check if company is in deallog list
             df.at[idx, '已在Deal List'] = check_in_deallog(company_name, deallog_companies)
@@ -899,7 +1124,7 @@ def test_first_10_rows():
             company_id = get_company_id(company_name)
             
             if company_id:
-                print(f"Found Company ID: {company_id}")
+                logger.debug("Found Company ID: %s", company_id)
                 
                 # Get company information
                 company_info = get_company_info(company_id)
@@ -941,41 +1166,35 @@ def test_first_10_rows():
                                     df.at[idx, '赛道名称'] = first_tag['标签名']
                     
                     # Query Metaso API for parent company information
-                    print("Querying Metaso API for parent company information...")
                     metaso_info = query_metaso(company_name)
                     df.at[idx, '母公司'] = metaso_info.get('母公司名称', 'NULL')
                     df.at[idx, '母公司是否上市'] = metaso_info.get('母公司是否上市', 'NULL')
                     
                     # Query Metaso API for stock reform information
-                    print("Querying Metaso API for stock reform information...")
                     stock_info = query_stock_reform(company_name)
                     df.at[idx, '是否是股份公司'] = stock_info.get('是否是股份公司', 'NULL')
                     df.at[idx, '股改时间'] = stock_info.get('股改时间', 'NULL')
                     
-                    print("Successfully retrieved company information")
+                    logger.debug("Successfully retrieved company information")
                 else:
-                    print("Failed to retrieve company information")
+                    logger.warning("Failed to retrieve company information for %s", company_name)
             else:
-                print(f"No company ID found for {company_name}")
+                logger.warning("No company ID found for %s", company_name)
         
         # Save to Excel with the sheet name
         df.to_excel(writer, sheet_name='第一批', index=False)
         writer.close()
         
-        print("\nTest completed successfully!")
+        logger.info("Test completed successfully!")
         
-        # Print summary of the results
-        print("\nResults Summary:")
-        print(f"Companies processed: {company_count}")
-        print("\nFunding Analysis:")
-        print(f"某一年融资超2次: {dict(df['某一年融资超2次'].value_counts())}")
-        print(f"单轮3家以上fund: {dict(df['单轮3家以上fund'].value_counts())}")
-        print(f"2家以上Peer Fund: {dict(df['2家以上Peer Fund'].value_counts())}")
+        # Log a summary of the results
+        logger.info("Companies processed: %d", company_count)
+        logger.info("某一年融资超2次: %s", dict(df['某一年融资超2次'].value_counts()))
+        logger.info("单轮3家以上fund: %s", dict(df['单轮3家以上fund'].value_counts()))
+        logger.info("2家以上Peer Fund: %s", dict(df['2家以上Peer Fund'].value_counts()))
         
     except Exception as e:
-        print(f"Error in test: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception("Error in test: %s", e)
 
 
 def test_api():
@@ -985,12 +1204,8 @@ def test_api():
 
 def test_specific_companies():
     """Test specific companies against the deallog list"""
-    print("Loading peer funds list...")
-    peer_funds = load_peer_funds()
-    print(f"Loaded {len(peer_funds)} peer funds")
-    
-    print("\nLoading deallog companies list...")
-    deallog_companies = load_deallog_companies()
+    peer_funds = PeerFundMatcher(load_peer_funds(), load_peer_fund_aliases())
+    deallog_companies = DeallogIndex(load_deallog_companies())
     
     # Test cases
     test_companies = [
@@ -1002,45 +1217,13 @@ def test_specific_companies():
     
     for company_name in test_companies:
         result = check_in_deallog(company_name, deallog_companies)
-        print(f"\nFinal result for {company_name}: {result}")
-        print("-" * 50)
+        logger.info("Final result for %s: %s", company_name, result)
 
 def get_company_industry(company_id):
     """
     Get company industry information using the /company/industry/list endpoint
     """
-    baseurl = 'https://api.xiniudata.com/openapi/v2/company/industry/list'
-
-    payload = {
-        "companyId": int(company_id)
-    }
-
-    reqData = {
-        'version': 'v1',
-        'accesskeyid': accesskeyid,
-        'clientUserId': '',
-        'signatureversion': 'v1',
-        'payload': payload,
-        'timestamp': str(round(time.time()))
-    }
-
-    reqData.update({'signature': signature_handler(reqData)})
-
-    try:
-        response = requests.post(baseurl, json=reqData)
-        response.raise_for_status()
-        json_response = response.json()
-        
-        if json_response['code'] == 0:
-            print("\n赛道名称:")
-            for industry in json_response['list']:
-                print(f"- {industry['name']}")
-            return json_response
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
-    
-    return None
+    return _run_sync('get_company_industry', company_id)
 
 def test_industry_api():
     """Test the industry list API with a known company ID"""
@@ -1049,4 +1232,5 @@ def test_industry_api():
     get_company_industry(company_id)
 
 if __name__ == '__main__':
+    configure_logging()
     test_first_10_rows()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark DeallogIndex against the original deallog scan
+
+Generates a synthetic deallog list (100k names by default) and a set of company
+names, checks that both implementations agree, and reports the time per check.
+
+Usage:
+    python src/tests/benchmark_deallog_index.py [--names 100000] [--companies 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.deallog_index import DeallogIndex, reference_check_in_deallog
+
+# Common characters of Chinese company names
+CHARS = "华中国新科技电子智能精密机械材料能源半导体光电信息通信医药生物环保汽车装备制造工业自动化数控航空航天海洋化工钢铁有色金属稀土微纳传感器芯片软件网络数据云计算安防检测仪器仪表"
+INDUSTRY_WORDS = ["科技", "电子", "智能", "精密", "新材料", "机械", "半导体", "光电", "医疗"]
+SUFFIXES = ["", "有限公司", "股份有限公司", "集团"]
+CITIES = ["上海", "北京", "深圳", "苏州"]
+
+
+def random_name(rng):
+    name = "".join(rng.choice(CHARS) for _ in range(rng.randint(2, 4)))
+    name += rng.choice(INDUSTRY_WORDS)
+    if rng.random() < 0.1:
+        name += f"（{rng.choice(CITIES)}）"
+    name += rng.choice(SUFFIXES)
+    if rng.random() < 0.2:
+        letters = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(rng.randint(3, 6)))
+        name += f" ({letters})"
+    return name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DeallogIndex against the original scan")
+    parser.add_argument('--names', type=int, default=100000, help="Number of deallog names")
+    parser.add_argument('--companies', type=int, default=2000, help="Number of company names checked")
+    parser.add_argument('--reference-companies', type=int, default=50,
+                        help="Number of companies checked with the (slow) original scan")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    deallog_names = list({random_name(rng) for _ in range(args.names)})
+    companies = [random_name(rng) for _ in range(args.companies)]
+    # Make some companies real deal-list hits in both directions
+    for i in range(0, len(companies), 10):
+        deallog_name = rng.choice(deallog_names)
+        companies[i] = deallog_name + "技术" if i % 20 else deallog_name.split(' (')[0][:-1]
+
+    start = time.perf_counter()
+    index = DeallogIndex(deallog_names)
+    build_time = time.perf_counter() - start
+    print(f"Deallog names: {len(deallog_names)}, indexed parts: {len(index.parts)}")
+    print(f"Index build: {build_time:.2f} seconds")
+
+    start = time.perf_counter()
+    indexed_results = [index.check(company) for company in companies]
+    indexed_time = time.perf_counter() - start
+    print(f"DeallogIndex: {len(companies)} checks in {indexed_time:.3f} seconds "
+          f"({indexed_time / len(companies) * 1e6:.1f} µs per check, {indexed_results.count('是')} matches)")
+
+    sample = companies[:args.reference_companies]
+    start = time.perf_counter()
+    reference_results = [reference_check_in_deallog(company, deallog_names) for company in sample]
+    reference_time = time.perf_counter() - start
+    per_check = reference_time / len(sample)
+    print(f"Original scan: {len(sample)} checks in {reference_time:.3f} seconds ({per_check * 1e3:.1f} ms per check)")
+
+    if reference_results != indexed_results[:len(sample)]:
+        print("MISMATCH between DeallogIndex and the original scan")
+        sys.exit(1)
+
+    print(f"Results identical on {len(sample)} companies")
+    print(f"Speedup per check: {per_check / (indexed_time / len(companies)):.0f}x")
+    print(f"Break-even after {build_time / per_check:.0f} companies (including the index build)")
+
+
+if __name__ == "__main__":
+    main()
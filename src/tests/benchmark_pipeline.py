@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Offline end-to-end benchmark against the mock Xiniu/Metaso/Qichacha servers
+
+Generates synthetic workbooks (1000 and 5000 rows by default), runs them through
+process_without_metaso (the async pipeline) and process_excel_file (the original
+sequential path) with every API pointed at src/tests/mock_servers.py, and
+reports per run:
+    - companies per second
+    - p50/p95 per-company latency
+    - peak RSS of the process running the case
+
+With --cassette, the requests are answered from a recorded cassette (see
+src/utils/cassettes.py) instead, and the workbooks hold the companies looked
+up in the recording.
+
+Each case runs in its own subprocess so the peak RSS is its own; the mock or
+cassette server runs in this process. No network access or API keys are needed.
+
+Usage:
+    python src/tests/benchmark_pipeline.py [--rows 1000 5000] [--targets pipeline excel]
+        [--latency 0.01] [--jitter 0.005] [--error-rate 0.0] [--rate-limit 0]
+    python src/tests/benchmark_pipeline.py --cassette data/cassettes/run.sqlite3 [--replay-timing fast]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add the src directory to the Python path
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(REPO_ROOT)
+
+from src.tests.mock_servers import INVESTORS, MockConfig, MockServers
+from src.utils.cassettes import DEFAULT_REPLAY_TIMING, REPLAY_TIMINGS, CassetteServer, CassetteStore
+from src.utils.structured_logging import configure_logging
+
+TARGETS = ('pipeline', 'excel')
+SHEET_NAME = '第一批'
+CHARS = "华中国新科技电子智能精密机械材料能源半导体光电信息通信医药生物环保汽车装备制造工业自动化数控"
+
+
+def make_workbook(workdir, rows, names=None, seed=1):
+    """
+    Create data/input/benchmark_<rows>.xlsx plus the peer fund and deallog lists under workdir
+
+    Args:
+        names (list): Company names to use (repeated up to rows), random names by default
+    Returns:
+        str: Path of the workbook
+    """
+    import pandas as pd
+
+    rng = random.Random(seed)
+    input_dir = os.path.join(workdir, 'data', 'input')
+    os.makedirs(input_dir, exist_ok=True)
+    if names:
+        names = [names[i % len(names)] for i in range(rows)]
+    else:
+        names = [f"{''.join(rng.choice(CHARS) for _ in range(4))}科技有限公司{i}" for i in range(rows)]
+    with open(os.path.join(input_dir, 'pf_companies.json'), 'w', encoding='utf-8') as f:
+        json.dump(INVESTORS[:4], f, ensure_ascii=False)
+    with open(os.path.join(input_dir, 'deallog_companies.json'), 'w', encoding='utf-8') as f:
+        json.dump(rng.sample(names, max(1, rows // 20)), f, ensure_ascii=False)
+
+    path = os.path.join(input_dir, f"benchmark_{rows}.xlsx")
+    pd.DataFrame({'序号': range(1, rows + 1), '示范企业名称': names}).to_excel(path, sheet_name=SHEET_NAME, index=False)
+    return path
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_pipeline(input_file, rows):
+    """Run process_without_metaso; returns per-company latencies in seconds"""
+    import importlib.util
+    spec = importlib.util.spec_from_file_location('run_xiaojuren_formatted',
+                                                  os.path.join(REPO_ROOT, 'run_xiaojuren_formatted.py'))
+    rx = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(rx)
+
+    latencies = []
+    process_single_company = rx.process_single_company
+
+    async def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await process_single_company(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    rx.process_single_company = timed
+    asyncio.run(rx.process_without_metaso(input_file, sheet_ranges={SHEET_NAME: (0, rows)}))
+    return latencies
+
+
+def run_excel(input_file, rows):
+    """Run process_excel_file; returns per-company latencies in seconds"""
+    from src.api_clients import xiniu_api_client
+
+    # Companies are processed one after another, each starting with its deallog check
+    starts = []
+    check_in_deallog = xiniu_api_client.check_in_deallog
+
+    def timed(company_name, deallog_names):
+        starts.append(time.perf_counter())
+        return check_in_deallog(company_name, deallog_names)
+
+    xiniu_api_client.check_in_deallog = timed
+    xiniu_api_client.process_excel_file(input_file)
+    starts.append(time.perf_counter())
+    return [end - start for start, end in zip(starts, starts[1:])]
+
+
+def run_case(target, rows, workdir):
+    """
+    Run one benchmark case in this process (called in the case subprocess)
+
+    Returns:
+        dict: Case result
+    """
+    input_file = os.path.join(workdir, 'data', 'input', f"benchmark_{rows}.xlsx")
+    # The pipeline resolves src/ and data/input/ relative to the working directory:
+    # link src/ in so the synthetic peer fund and deallog lists are the ones loaded
+    os.symlink(os.path.join(REPO_ROOT, 'src'), os.path.join(workdir, 'src'))
+    os.chdir(workdir)
+    # The pipeline logs a line per company; only errors go to stderr, which is shown if the case fails
+    configure_logging('ERROR', stream=sys.stderr)
+    started = time.perf_counter()
+    if target == 'pipeline':
+        latencies = run_pipeline(input_file, rows)
+    else:
+        latencies = run_excel(input_file, rows)
+    elapsed = time.perf_counter() - started
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == 'darwin' else peak_rss / 1024
+    return {
+        'target': target,
+        'rows': rows,
+        'companies': len(latencies),
+        'seconds': elapsed,
+        'companies_per_second': len(latencies) / elapsed if elapsed else None,
+        'p50_latency': percentile(latencies, 0.5),
+        'p95_latency': percentile(latencies, 0.95),
+        'peak_rss_mb': peak_rss_mb,
+    }
+
+
+def case_environment(base_urls, args):
+    env = dict(os.environ)
+    env.update(base_urls)
+    env.update({
+        'API_CACHE_DISABLED': '1',
+        'XINIU_ACCESS_KEY_ID': 'benchmark',
+        'XINIU_ACCESS_KEY_SECRET': 'benchmark',
+        'METASO_SECRET_KEY': 'benchmark',
+        'QICHACHA_APP_KEY': 'benchmark',
+        'QICHACHA_SECRET_KEY': 'benchmark',
+        # Measure the pipeline, not the client-side rate limits
+        'XINIU_RPS': str(args.client_rps),
+        'METASO_RPS': str(args.client_rps),
+        'QICHACHA_RPS': str(args.client_rps),
+    })
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against local mock API servers")
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 5000], help="Workbook sizes to run")
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS))
+    parser.add_argument('--latency', type=float, default=0.01, help="Mock response delay in seconds")
+    parser.add_argument('--jitter', type=float, default=0.005, help="Extra random mock delay of up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of mock requests answered with 503")
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help="Mock requests per second per provider before answering 429 (0 = unlimited)")
+    parser.add_argument('--sse-chunk-delay', type=float, default=0.001, help="Delay between mock Metaso SSE events")
+    parser.add_argument('--client-rps', type=float, default=1000.0,
+                        help="Client-side rate limit per provider during the benchmark")
+    parser.add_argument('--cassette', help="Replay this cassette instead of using the mock servers")
+    parser.add_argument('--replay-timing', choices=REPLAY_TIMINGS, default=DEFAULT_REPLAY_TIMING,
+                        help="Replay the recorded response times (original) or answer at once (fast)")
+    parser.add_argument('--case', choices=TARGETS, help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        # Subprocess mode: run a single case and print its result as JSON
+        result = run_case(args.case, args.rows[0], args.workdir)
+        print(json.dumps(result))
+        return
+
+    names = None
+    if args.cassette:
+        if not os.path.exists(args.cassette):
+            parser.error(f"Cassette not found: {args.cassette}")
+        servers = CassetteServer(CassetteStore(args.cassette), 'replay', timing=args.replay_timing)
+        names = servers.store.company_names()
+        print(f"Replaying {args.cassette} ({len(names)} companies, {args.replay_timing} timing)")
+    else:
+        servers = MockServers(MockConfig(args.latency, args.jitter, args.error_rate, args.rate_limit,
+                                         args.sse_chunk_delay))
+    results = []
+    with servers:
+        env = case_environment(servers.base_urls(), args)
+        if not args.cassette:
+            print(f"Mock servers on port {servers.port} (latency {args.latency}s, jitter {args.jitter}s, "
+                  f"error rate {args.error_rate}, rate limit {args.rate_limit or 'none'})")
+        for rows in args.rows:
+            for target in args.targets:
+                print(f"Running {target} with {rows} rows...")
+                with tempfile.TemporaryDirectory() as workdir:
+                    make_workbook(workdir, rows, names)
+                    completed = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), '--case', target, '--rows', str(rows),
+                         '--workdir', workdir],
+                        env=env, capture_output=True, text=True)
+                if completed.returncode != 0:
+                    print(f"  {target} failed:\n{completed.stderr[-2000:]}")
+                    continue
+                results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+        if args.cassette:
+            print(servers.summary())
+        else:
+            print(f"Mock requests served: {servers.requests}")
+
+    print(f"\n{'Target':<10} {'Rows':>6} {'Seconds':>8} {'Companies/s':>12} {'p50 ms':>8} {'p95 ms':>8} {'Peak RSS MB':>12}")
+    for result in results:
+        p50 = f"{result['p50_latency'] * 1000:.0f}" if result['p50_latency'] is not None else "-"
+        p95 = f"{result['p95_latency'] * 1000:.0f}" if result['p95_latency'] is not None else "-"
+        print(f"{result['target']:<10} {result['rows']:>6} {result['seconds']:>8.1f} "
+              f"{result['companies_per_second']:>12.1f} {p50:>8} {p95:>8} {result['peak_rss_mb']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
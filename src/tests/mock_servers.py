@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Local stand-ins for the Xiniu, Metaso and Qichacha APIs
+
+One aiohttp server answers for all three providers:
+    /xiniu/<endpoint>               signed POSTs (company/id/list_by_fullname, company/get_2,
+                                    company/funding/list_all_2, company/tag/list_primary_tag,
+                                    company/tag/list_ordered, company/list_member)
+    /metaso/api/open/search         the answer JSON streamed as "append-text" SSE events,
+                                    followed by a tail of prose
+    /qichacha/ECIChange/GetList     paged change records (Status/Paging/Result)
+
+Responses are generated deterministically from the request (company name or
+ID), so repeated runs see the same data. Latency, jitter, the share of 503
+errors and a per-provider rate limit (answered with 429 + Retry-After) are
+configurable. Point the clients at it with:
+    XINIU_BASE_URL=http://127.0.0.1:<port>/xiniu
+    METASO_SEARCH_URL=http://127.0.0.1:<port>/metaso/api/open/search
+    QICHACHA_BASE_URL=http://127.0.0.1:<port>/qichacha
+
+Run standalone: python src/tests/mock_servers.py --port 8765 --latency 0.05 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+from aiohttp import web
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.local_server import LocalServer
+
+INVESTORS = ["红杉资本", "高瓴资本", "IDG资本", "深创投", "经纬创投", "启明创投", "某某创投", "元禾原点"]
+ROUNDS = ["天使轮", "A轮", "A+轮", "B轮", "C轮", "战略投资"]
+TAGS = ["智能制造", "工业机器人", "半导体", "新材料", "汽车零部件", "医疗器械", "储能", "传感器"]
+
+# Fields the Xiniu signature handler adds to every request body
+SIGNED_FIELDS = ('accesskeyid', 'payload', 'signature', 'timestamp')
+
+
+class MockConfig:
+    """
+    Behaviour of the mock servers
+
+    Args:
+        latency (float): Base response delay in seconds
+        jitter (float): Extra random delay of up to this many seconds
+        error_rate (float): Share of requests answered with 503
+        rate_limit (float): Requests per second allowed per provider (0 = unlimited);
+            requests over the limit get 429 with Retry-After: 1
+        sse_chunk_delay (float): Delay between Metaso SSE events
+        seed (int): Seed for the jitter and error draws
+    """
+
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, rate_limit=0.0,
+                 sse_chunk_delay=0.01, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.sse_chunk_delay = sse_chunk_delay
+        self.seed = seed
+
+
+def _rng(*parts):
+    """Random generator seeded from the request, so answers are stable across runs"""
+    digest = hashlib.md5("|".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+
+def company_id_for(name):
+    """The ID the mock Xiniu returns for a company name"""
+    return _rng('id', name).randint(10 ** 6, 10 ** 8)
+
+
+def xiniu_response(endpoint, payload):
+    """Build the Xiniu JSON response for an endpoint"""
+    if endpoint == 'company/id/list_by_fullname':
+        return {'code': 0, 'idList': [company_id_for(payload.get('fullName', ''))]}
+
+    company_id = payload.get('companyId')
+    rng = _rng(endpoint, company_id)
+    if endpoint == 'company/get_2':
+        return {'code': 0, 'companyVO': {
+            'establishDate': f"{rng.randint(1995, 2020)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'round': rng.choice(ROUNDS + ["IPO上市", "未融资"]),
+            'brief': f"公司{company_id}简介",
+            'description': "专注于" + rng.choice(TAGS) + "领域的研发、生产和销售。" * rng.randint(3, 12),
+        }}
+    if endpoint == 'company/funding/list_all_2':
+        return {'code': 0, 'list': [
+            {
+                'active': 'Y',
+                'fundingDate': f"{rng.randint(2015, 2024)}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}",
+                'round': rng.choice(ROUNDS),
+                'investment': rng.choice([0, rng.randint(1, 500) * 1000000]),
+                'currency': 'CNY',
+                'investors': rng.choice(['，', '、']).join(rng.sample(INVESTORS, rng.randint(1, 5))),
+                'newsTitle': f"公司{company_id}完成新一轮融资",
+            }
+            for _ in range(rng.randint(0, 6))
+        ]}
+    if endpoint == 'company/tag/list_primary_tag':
+        tags = rng.sample(TAGS, 4)
+        return {'code': 0, 'data': {'primary_tag1': tags[0], 'primary_tag2': tags[1], 'other_tags': tags[2:]}}
+    if endpoint == 'company/tag/list_ordered':
+        return {'code': 0, 'list': [{'name': tag, 'id': TAGS.index(tag)} for tag in rng.sample(TAGS, rng.randint(1, 4))]}
+    if endpoint == 'company/list_member':
+        return {'code': 0, 'list': [
+            {'name': f"成员{i}", 'position': rng.choice(["CEO", "创始人", "CTO", "董事"]), 'description': "简介"}
+            for i in range(rng.randint(1, 4))
+        ]}
+    return {'code': 0, 'list': []}
+
+
+def metaso_answer(question):
+    """The JSON object the mock Metaso answers a question with"""
+    rng = _rng('metaso', question)
+    answer = {}
+    if '母公司' in question:
+        has_parent = rng.random() < 0.3
+        answer["母公司名称"] = f"母公司{rng.randint(1, 999)}集团" if has_parent else "NULL"
+        answer["母公司是否上市"] = rng.choice(["是", "不是"]) if has_parent else "NULL"
+    if '股份' in question or '股改' in question:
+        is_stock = rng.random() < 0.6
+        answer["是否是股份公司"] = "是" if is_stock else "不是"
+        answer["股改时间"] = f"{rng.randint(2005, 2023)}-{rng.randint(1, 12):02d}-01" if is_stock else "NULL"
+    return answer
+
+
+def qichacha_changes(search_key):
+    """All change records of a company; one of them may be the stock reform"""
+    rng = _rng('qichacha', search_key)
+    changes = [
+        {
+            'ProjectName': rng.choice(["经营范围变更", "注册资本变更", "法定代表人变更"]),
+            'ChangeDate': f"{rng.randint(2005, 2024)}-{rng.randint(1, 12):02d}-01",
+            'BeforeList': ["变更前"],
+            'AfterList': ["变更后"],
+        }
+        for _ in range(rng.randint(0, 25))
+    ]
+    if rng.random() < 0.5:
+        changes.insert(rng.randint(0, len(changes)), {
+            'ProjectName': "市场主体类型变更",
+            'ChangeDate': f"{rng.randint(2005, 2023)}-06-01",
+            'BeforeList': ["有限责任公司"],
+            'AfterList': ["股份有限公司"],
+        })
+    return changes
+
+
+class MockServers:
+    """
+    The mock application plus the shared behaviour (delays, errors, rate limits)
+    """
+
+    def __init__(self, config=None):
+        self.config = config or MockConfig()
+        self._random = random.Random(self.config.seed)
+        self._windows = {}
+        self.requests = {'xiniu': 0, 'metaso': 0, 'qichacha': 0}
+        self._server = None
+
+    def app(self):
+        """Build the aiohttp application"""
+        app = web.Application()
+        app.router.add_post('/xiniu/{endpoint:.+}', self.handle_xiniu)
+        app.router.add_post('/metaso/api/open/search', self.handle_metaso)
+        app.router.add_get('/qichacha/ECIChange/GetList', self.handle_qichacha)
+        return app
+
+    async def _gate(self, provider):
+        """
+        Apply latency, rate limit and error injection
+
+        Returns:
+            web.Response: A 429/503 response to send instead, or None
+        """
+        self.requests[provider] += 1
+        config = self.config
+        await asyncio.sleep(config.latency + self._random.random() * config.jitter)
+
+        if config.rate_limit:
+            # Fixed one-second windows per provider
+            window = int(time.monotonic())
+            start, count = self._windows.get(provider, (window, 0))
+            if start != window:
+                start, count = window, 0
+            self._windows[provider] = (start, count + 1)
+            if count >= config.rate_limit:
+                return web.Response(status=429, headers={'Retry-After': '1'})
+
+        if config.error_rate and self._random.random() < config.error_rate:
+            return web.Response(status=503, text="Service Unavailable")
+        return None
+
+    async def handle_xiniu(self, request):
+        refused = await self._gate('xiniu')
+        if refused is not None:
+            return refused
+        body = await request.json()
+        if not all(field in body for field in SIGNED_FIELDS):
+            return web.json_response({'code': 1001, 'codeMessage': 'missing signature fields'})
+        return web.json_response(xiniu_response(request.match_info['endpoint'], body['payload']))
+
+    async def handle_metaso(self, request):
+        refused = await self._gate('metaso')
+        if refused is not None:
+            return refused
+        if not request.headers.get('secret-key'):
+            return web.Response(status=401, text="missing secret-key")
+        body = await request.json()
+        answer = json.dumps(metaso_answer(body.get('question', '')), ensure_ascii=False)
+        text = "```json\n" + answer + "\n```\n" + "以上信息来自公开资料整理。" * 10
+        fragments = [text[i:i + 24] for i in range(0, len(text), 24)]
+
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+        try:
+            for fragment in fragments:
+                event = json.dumps({'type': 'append-text', 'text': fragment}, ensure_ascii=False)
+                await response.write(f"data:{event}\n\n".encode('utf-8'))
+                await asyncio.sleep(self.config.sse_chunk_delay)
+            await response.write(b"data:[DONE]\n\n")
+        except (ConnectionResetError, RuntimeError):
+            # The client stops reading once the JSON object is complete
+            pass
+        return response
+
+    async def handle_qichacha(self, request):
+        refused = await self._gate('qichacha')
+        if refused is not None:
+            return refused
+        if not request.headers.get('Token') or not request.headers.get('Timespan'):
+            return web.json_response({'Status': "101", 'Message': "missing token"})
+        search_key = request.query.get('searchKey', '')
+        page_index = int(request.query.get('pageIndex', 1))
+        page_size = min(int(request.query.get('pageSize', 10)), 10)
+        changes = qichacha_changes(search_key)
+        page = changes[(page_index - 1) * page_size:page_index * page_size]
+        return web.json_response({
+            'Status': "200",
+            'Message': "【有效请求】查询成功",
+            'Paging': {'PageSize': page_size, 'PageIndex': page_index, 'TotalRecords': len(changes)},
+            'Result': page,
+        })
+
+    def base_urls(self):
+        """
+        Returns:
+            dict: Environment variables pointing the clients at this server
+        """
+        return {
+            'XINIU_BASE_URL': self._server.url('/xiniu'),
+            'METASO_SEARCH_URL': self._server.url('/metaso/api/open/search'),
+            'QICHACHA_BASE_URL': self._server.url('/qichacha'),
+        }
+
+    @property
+    def port(self):
+        return self._server.port
+
+    def start(self, port=0):
+        """
+        Serve in a background thread (port 0 picks a free port)
+
+        Returns:
+            MockServers: self
+        """
+        self._server = LocalServer(self.app(), port, name='mock-servers').start()
+        return self
+
+    def stop(self):
+        """Stop a server started with start()"""
+        self._server.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock Xiniu, Metaso and Qichacha APIs")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help="Base delay per response in seconds")
+    parser.add_argument('--jitter', type=float, default=0.02, help="Extra random delay of up to this many seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help="Requests per second per provider before answering 429 (0 = unlimited)")
+    parser.add_argument('--sse-chunk-delay', type=float, default=0.01, help="Delay between Metaso SSE events")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    servers = MockServers(MockConfig(args.latency, args.jitter, args.error_rate, args.rate_limit,
+                                     args.sse_chunk_delay, args.seed))
+    servers.start(args.port)
+    for name, url in servers.base_urls().items():
+        print(f"{name}={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servers.stop()
+
+
+if __name__ == "__main__":
+    main()
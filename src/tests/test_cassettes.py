@@ -0,0 +1,63 @@
+import sys
+import os
+import asyncio
+import json
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+os.environ.setdefault('XINIU_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('XINIU_ACCESS_KEY_SECRET', 'test')
+
+import requests
+
+from src.api_clients import xiniu_api_client
+from src.tests.mock_servers import MockConfig, MockServers
+from src.utils.cassettes import CassetteServer, CassetteStore, normalize_request
+
+
+def fetch_company(name):
+    async def fetch():
+        async with xiniu_api_client.XiniuAsyncClient(use_cache=False) as client:
+            company_id = await client.get_company_id(name)
+            return company_id, await client.get_company_info(company_id)
+    return asyncio.run(fetch())
+
+
+def point_clients_at(server, monkeypatch):
+    urls = server.base_urls()
+    monkeypatch.setattr(xiniu_api_client, 'XINIU_BASE_URL', urls['XINIU_BASE_URL'])
+    monkeypatch.setattr(xiniu_api_client, 'METASO_SEARCH_URL', urls['METASO_SEARCH_URL'])
+
+
+def test_normalize_request_drops_signature_fields():
+    body = b'{"accesskeyid": "id", "payload": {"companyId": 1}, "signature": "s", "timestamp": "1", "version": "v1"}'
+    assert normalize_request({}, body) == {'body': {'payload': {'companyId': 1}, 'version': 'v1'}}
+    assert normalize_request({'pageIndex': '2', 'searchKey': 'a'}, b'') == {
+        'query': {'pageIndex': '2', 'searchKey': 'a'}}
+
+
+def test_record_then_replay_without_upstream(tmp_path, monkeypatch):
+    cassette = str(tmp_path / 'run.sqlite3')
+    with MockServers(MockConfig(latency=0.0, jitter=0.0, sse_chunk_delay=0.0)) as mock:
+        mock_urls = mock.base_urls()
+        upstreams = {'xiniu': mock_urls['XINIU_BASE_URL'], 'metaso': mock_urls['METASO_SEARCH_URL']}
+        with CassetteServer(CassetteStore(cassette), 'record', upstreams) as recorder:
+            point_clients_at(recorder, monkeypatch)
+            recorded = fetch_company("测试科技有限公司")
+            recorded_parent = xiniu_api_client.query_metaso("测试科技有限公司")
+        assert recorder.counts['recorded'] == 7
+
+    store = CassetteStore(cassette)
+    assert store.company_names() == ["测试科技有限公司"]
+    bodies = [json.loads(request)['body'] for (request,) in store._conn.execute("SELECT request FROM interactions")]
+    assert not any({'signature', 'timestamp', 'accesskeyid'} & set(body) for body in bodies)
+
+    # The mock servers are gone: everything now comes from the cassette
+    with CassetteServer(store, 'replay', timing='fast') as player:
+        point_clients_at(player, monkeypatch)
+        assert fetch_company("测试科技有限公司") == recorded
+        assert xiniu_api_client.query_metaso("测试科技有限公司") == recorded_parent
+        missing = requests.post(player.base_urls()['XINIU_BASE_URL'] + '/company/get_2', json={'payload': {}})
+        assert missing.status_code == 404
+    assert (player.counts['replayed'], player.counts['missing']) == (7, 1)
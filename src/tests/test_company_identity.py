@@ -0,0 +1,48 @@
+import sys
+import os
+import asyncio
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.company_identity import CompanyIdentityIndex, is_credit_code, qichacha_search_key
+from src.utils.name_resolution import NameResolver
+
+
+class FakeXiniuClient:
+    def __init__(self, ids):
+        self.ids = ids
+        self.calls = []
+
+    async def find_company_ids(self, company_name):
+        self.calls.append(company_name)
+        return [self.ids[company_name]] if company_name in self.ids else []
+
+
+def test_sources_merge_into_one_identity(tmp_path):
+    index = CompanyIdentityIndex(str(tmp_path / 'identities.sqlite3'))
+    index.record("京东方（北京）科技有限公司", xiniu_id=42, aliases=["京东方 (北京) 科技有限公司"])
+    # company/get_2 adds the registered name and credit code, Qichacha the key it answered to
+    index.record(xiniu_id='42', canonical_name="京东方科技集团股份有限公司", credit_code="91110000600007336F")
+    index.record("京东方科技集团股份有限公司", qichacha_key="京东方科技集团股份有限公司")
+
+    identity = index.lookup("京东方(北京)科技有限公司")
+    assert identity == index.by_xiniu_id(42)
+    assert (identity.canonical_name, identity.xiniu_id) == ("京东方科技集团股份有限公司", '42')
+    assert qichacha_search_key(identity) == "91110000600007336F"
+    assert index.stats() == {'identities': 1, 'aliases': 2, 'xiniu_ids': 1, 'credit_codes': 1,
+                             'qichacha_keys': 1}
+    assert is_credit_code("91110000600007336F") and not is_credit_code("京东方科技集团股份有限公司")
+
+
+def test_resolver_answers_known_names_from_the_index(tmp_path):
+    index = CompanyIdentityIndex(str(tmp_path / 'identities.sqlite3'))
+    client = FakeXiniuClient({"京东方(北京)科技有限公司": '42'})
+    resolver = NameResolver(client, identities=index)
+
+    assert asyncio.run(resolver.resolve("京东方（北京）科技有限公司")) == '42'
+    assert index.lookup("京东方(北京)科技有限公司").xiniu_id == '42'
+
+    client.calls.clear()
+    assert asyncio.run(resolver.resolve("京东方（北京）科技有限公司")) == '42'
+    assert client.calls == []
@@ -0,0 +1,154 @@
+import sys
+import os
+import asyncio
+import random
+
+import pandas as pd
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+os.environ.setdefault('XINIU_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('XINIU_ACCESS_KEY_SECRET', 'test')
+
+import run_xiaojuren_formatted as pipeline
+from src.api_clients import xiniu_api_client
+from src.tests.mock_servers import MockConfig, MockServers, company_id_for
+from src.utils.output_sinks import OutputSink
+from src.utils.peer_fund_matcher import PeerFundMatcher
+from src.utils import resilience
+from src.utils.resilience import RETRY_MARKER, CircuitBreaker, RetryableError
+from src.utils.run_journal import RunJournal, read_journal
+
+COMPANY_ID = str(company_id_for("测试科技有限公司"))
+
+
+@pytest.fixture(scope='module')
+def servers():
+    with MockServers(MockConfig(latency=0.0, jitter=0.0, sse_chunk_delay=0.0)) as servers:
+        yield servers
+
+
+@pytest.fixture
+def xiniu(servers, monkeypatch):
+    monkeypatch.setattr(xiniu_api_client, 'XINIU_BASE_URL', servers.base_urls()['XINIU_BASE_URL'])
+
+
+def company_info(mode, failing=None):
+    async def fetch():
+        async with xiniu_api_client.XiniuAsyncClient(enrichment_mode=mode, use_cache=False) as client:
+            if failing is not None:
+                async def fail(company_id):
+                    raise RetryableError("xiniu company/list_member failed after 3 attempts")
+                setattr(client, failing, fail)
+            return await client.get_company_info(COMPANY_ID)
+    return asyncio.run(fetch())
+
+
+def test_enrichment_modes_return_the_same_record(xiniu):
+    sequential = company_info('sequential')
+    assert sequential['融资历史'] and sequential['行业属性']
+    assert company_info('parallel') == sequential
+    assert company_info('speculative') == sequential
+
+
+def test_failed_sub_request_only_marks_its_field(xiniu):
+    complete = company_info('parallel')
+    partial = company_info('parallel', failing='get_founder_info')
+    assert partial['创始人信息'] == RETRY_MARKER
+    assert {key: value for key, value in partial.items() if key != '创始人信息'} == \
+        {key: value for key, value in complete.items() if key != '创始人信息'}
+
+
+class GetTwoFailsSession:
+    """company/get_2 answers with an error code at once, the sub-requests never answer"""
+
+    def post(self, url, json, timeout):
+        return FakeResponse(url.endswith('company/get_2'))
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+    def __init__(self, answers):
+        self.answers = answers
+
+    async def __aenter__(self):
+        if not self.answers:
+            await asyncio.sleep(10)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def read(self):
+        return b'{"code": 1001, "codeMessage": "no such company"}'
+
+
+def test_cancelled_speculative_enrichment_frees_half_open_breakers(monkeypatch):
+    monkeypatch.setattr(resilience, '_breakers', {})
+    endpoints = ['company/funding/list_all_2', 'company/tag/list_primary_tag', 'company/tag/list_ordered',
+                 'company/list_member']
+    breakers = [resilience.get_circuit_breaker('xiniu', endpoint) for endpoint in endpoints]
+    for breaker in breakers:
+        breaker.failure_threshold = 1
+        breaker.reset_timeout = 0
+        breaker.record_failure()
+
+    async def fetch():
+        client = xiniu_api_client.XiniuAsyncClient(GetTwoFailsSession(), enrichment_mode='speculative',
+                                                   use_cache=False)
+        return await client.get_company_info(COMPANY_ID)
+
+    # get_2 finds nothing, so the sub-requests holding the half-open trials are cancelled
+    assert asyncio.run(fetch()) is None
+    assert all(breaker.state == CircuitBreaker.HALF_OPEN for breaker in breakers)
+    assert all(breaker.allow() for breaker in breakers)
+
+
+class RecordingSink(OutputSink):
+    def __init__(self):
+        self.rows = []
+
+    def write_rows(self, sheet_name, rows):
+        self.rows.extend(rows)
+
+
+def test_rows_are_written_in_input_order(tmp_path, monkeypatch):
+    names = [f"公司{i}" for i in range(12)]
+    delays = dict(zip(names, random.Random(5).sample(range(12), 12)))
+    finished = []
+
+    async def process_single_company(idx, company_name, session, df, peer_funds, deallog_companies,
+                                     metaso_mode):
+        await asyncio.sleep(delays[company_name] * 0.005)
+        df.at[idx, '成立时间'] = f"{company_name} done"
+        finished.append(idx)
+        return {'company_info': {'融资历史': None}}
+
+    monkeypatch.setattr(pipeline, 'process_single_company', process_single_company)
+    monkeypatch.setattr(pipeline, 'OUTPUT_BATCH_ROWS', 3)
+    sink = RecordingSink()
+    df = pd.DataFrame({'企业名称': names})
+    journal_file = str(tmp_path / 'journal.jsonl')
+
+    with RunJournal(journal_file) as journal:
+        _, result = asyncio.run(pipeline.process_sheet_async(
+            'Sheet1', df, PeerFundMatcher([]), None, None, max_concurrency=4, journal=journal, sink=sink,
+            sheet_ranges={'Sheet1': (2, 10)}))
+
+    # Workers finished out of order, the sink still got the rows in sheet order
+    assert finished != sorted(finished)
+    assert [idx for idx, _ in sink.rows] == list(range(2, 10))
+    assert all(values['成立时间'] == f"公司{idx} done" for idx, values in sink.rows)
+    assert result.loc[2:9, '成立时间'].tolist() == [f"公司{i} done" for i in range(2, 10)]
+    assert result.loc[[0, 1, 10, 11], '成立时间'].tolist() == [''] * 4
+    # The journal has the flags derived when the rows were released
+    rows = read_journal(journal_file)['rows']['Sheet1']
+    assert sorted(rows) == list(range(2, 10))
+    assert all(record['values']['Peer Fund'] == "NULL" for record in rows.values())
@@ -0,0 +1,102 @@
+import sys
+import os
+import random
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+os.environ.setdefault('XINIU_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('XINIU_ACCESS_KEY_SECRET', 'test')
+
+from src.api_clients import xiniu_api_client
+from src.utils.deallog_index import (
+    AhoCorasick,
+    DeallogIndex,
+    reference_check_in_deallog,
+    split_chinese_english
+)
+
+DEALLOG_NAMES = [
+    "京东方 (BOE)",
+    "展讯通信（上海）有限公司",
+    "宁德时代",
+    "大疆创新【DJI】",
+    "小米",
+    "华为技术有限公司",
+]
+
+
+def test_split_chinese_english():
+    assert split_chinese_english("京东方 (BOE)") == ["京东方", "BOE"]
+    assert split_chinese_english("展讯通信（上海）有限公司") == ["展讯通信（上海）有限公司"]
+
+
+def test_known_cases_match_reference():
+    index = DeallogIndex(DEALLOG_NAMES)
+    cases = {
+        "京东方科技集团股份有限公司": "是",      # deallog part in company part
+        "BOE Technology": "是",
+        "宁德时代新能源科技股份有限公司": "是",
+        "华为技术": "是",                        # company part in deallog part
+        "小米科技有限责任公司": "不是",          # 小米 is too short to count
+        "上海": "不是",
+        "深圳市大疆": "不是",
+        "": "不是",
+    }
+    for company_name, expected in cases.items():
+        assert reference_check_in_deallog(company_name, DEALLOG_NAMES) == expected, company_name
+        assert index.check(company_name) == expected, company_name
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = AhoCorasick(["abcd", "bcx", "cdz", "abc"])
+    assert automaton.find("zzbcxzz") == "bcx"
+    assert automaton.find("xabcz") == "abc"
+    assert automaton.find("abcdz") == "abc"
+    assert automaton.find("xbcdzq") == "cdz"
+    assert automaton.find("ab") is None
+
+
+def test_random_names_match_reference():
+    rng = random.Random(7)
+    # A tiny alphabet makes containment in both directions common
+    chars = "甲乙丙丁"
+    letters = "AB"
+
+    def random_name():
+        name = "".join(rng.choice(chars) for _ in range(rng.randint(1, 7)))
+        if rng.random() < 0.3:
+            name += f" ({''.join(rng.choice(letters) for _ in range(rng.randint(1, 4)))})"
+        elif rng.random() < 0.1:
+            name += "（上海）有限公司"
+        return name
+
+    deallog_names = [random_name() for _ in range(40)]
+    index = DeallogIndex(deallog_names)
+    for _ in range(500):
+        company_name = random_name()
+        assert index.check(company_name) == reference_check_in_deallog(company_name, deallog_names), company_name
+
+
+def test_plain_collection_is_indexed_once(monkeypatch, caplog):
+    monkeypatch.setattr(xiniu_api_client, '_deallog_indexes', {})
+    built = []
+
+    class CountingIndex(DeallogIndex):
+        def __init__(self, names):
+            built.append(names)
+            super().__init__(names)
+
+    monkeypatch.setattr(xiniu_api_client, 'DeallogIndex', CountingIndex)
+    names = set(DEALLOG_NAMES)
+
+    with caplog.at_level('WARNING', logger=xiniu_api_client.logger.name):
+        assert xiniu_api_client.check_in_deallog("京东方科技集团股份有限公司", names) == "是"
+        assert xiniu_api_client.check_in_deallog("腾讯科技", names) == "不是"
+    assert len(built) == 1
+    assert len([r for r in caplog.records if 'DeallogIndex' in r.getMessage()]) == 1
+
+    # A changed collection is indexed again
+    names.add("腾讯科技")
+    assert xiniu_api_client.check_in_deallog("腾讯科技", names) == "是"
+    assert len(built) == 2
@@ -0,0 +1,36 @@
+import sys
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.excel_writer import MAX_COLUMN_WIDTH, write_formatted_workbook
+
+
+def test_formatted_workbook(tmp_path):
+    df = pd.DataFrame({
+        '企业名称': ["甲有限公司", "乙"],
+        '融资历史': ["x" * 80, None],
+        '数量': [1, 2],
+    })
+    output_file = write_formatted_workbook(str(tmp_path / "out.xlsx"), [("第一批", df), ("空表", df.head(0))])
+
+    workbook = load_workbook(output_file)
+    assert workbook.sheetnames == ["第一批", "空表"]
+    worksheet = workbook["第一批"]
+    assert [[cell.value for cell in row] for row in worksheet.iter_rows()] == [
+        ['企业名称', '融资历史', '数量'],
+        ['甲有限公司', "x" * 80, 1],
+        ['乙', None, 2],
+    ]
+    for row in worksheet.iter_rows():
+        for cell in row:
+            assert cell.alignment.wrap_text and cell.alignment.vertical == 'top'
+            assert cell.border.left.style == cell.border.bottom.style == 'thin'
+            # Only the header row is bold, as with df.to_excel
+            assert bool(cell.font.bold) == (cell.row == 1)
+    widths = {letter: worksheet.column_dimensions[letter].width for letter in 'ABC'}
+    assert widths == {'A': 7, 'B': MAX_COLUMN_WIDTH, 'C': 4}
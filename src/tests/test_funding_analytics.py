@@ -0,0 +1,91 @@
+import sys
+import os
+import random
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.funding_analytics import build_funding_table, derive_funding_flags
+from src.utils.peer_fund_matcher import PeerFundMatcher, split_investors
+
+PEER_FUNDS = PeerFundMatcher(["红杉资本", "高瓴资本", "IDG资本"])
+
+
+def per_company_flags(funding_history):
+    """The per-company logic of xiniu_api_client, used as the reference"""
+    if not funding_history:
+        return ["NULL", "不是", "不是", "不是"]
+    summary = PEER_FUNDS.summarize(funding_history)
+    years = {}
+    for funding in funding_history:
+        if funding.get('融资时间'):
+            year = funding['融资时间'].split('/')[0]
+            years[year] = years.get(year, 0) + 1
+    return [
+        "，".join(summary['funds']) if summary['funds'] else "NULL",
+        "是" if any(count > 2 for count in years.values()) else "不是",
+        "是" if any(len(split_investors(f.get('投资方', ''))) > 3 for f in funding_history) else "不是",
+        "是" if len(summary['funds']) >= 2 else "不是",
+    ]
+
+
+def test_funding_table_columns():
+    table = build_funding_table({
+        7: [{'融资时间': '2021/03/01', '融资轮次': 'A轮', '融资金额': '10,000,000 CNY', '投资方': '红杉资本，高瓴'}],
+        8: None,
+        9: "RETRY",
+    })
+    assert table['company'].tolist() == [7, 7]
+    assert table['investor'].tolist() == ['红杉资本', '高瓴']
+    assert table['year'].tolist() == ['2021', '2021']
+    assert table['amount'].tolist() == [10000000, 10000000]
+    assert table['currency'].tolist() == ['CNY', 'CNY']
+
+
+def test_flags_match_per_company_logic():
+    rng = random.Random(3)
+    investors = ["红杉资本", "红杉投资", "高瓴", "IDG Capital", "某某创投", "甲", "乙", "未披露"]
+    histories = {}
+    for company in range(300):
+        if rng.random() < 0.1:
+            histories[company] = None
+            continue
+        histories[company] = [
+            {
+                '融资时间': rng.choice(['', f"{rng.choice([2019, 2020, 2021])}/0{rng.randint(1, 9)}/01"]),
+                '融资轮次': 'A轮',
+                '融资金额': '金额未披露',
+                '投资方': rng.choice(['，', '、', ',']).join(rng.sample(investors, rng.randint(1, 5))),
+            }
+            for _ in range(rng.randint(0, 5))
+        ]
+    histories[300] = "RETRY"
+
+    flags, _ = derive_funding_flags(histories, PEER_FUNDS)
+    assert 300 not in flags.index
+    for company, history in histories.items():
+        if company == 300:
+            continue
+        assert flags.loc[company].tolist() == per_company_flags(history), company
+
+
+def test_flags_without_any_peer_fund():
+    flags, _ = derive_funding_flags({1: [{'投资方': '甲，乙'}], 2: None}, PEER_FUNDS)
+    assert flags['Peer Fund'].tolist() == ["NULL", "NULL"]
+
+
+def test_scalar_round_counts_as_no_funding():
+    # build_company_info keeps the raw round (1010, 'A轮') when there are no records
+    flags, _ = derive_funding_flags({1: 1010, 2: None, 3: 'A轮', 4: [], 5: "RETRY"}, {'红杉'})
+    assert flags.index.tolist() == [1, 2, 3, 4]
+    for company in (1, 2, 3, 4):
+        assert flags.loc[company].tolist() == ["NULL", "不是", "不是", "不是"]
+
+
+def test_alias_matches_are_reported():
+    matcher = PeerFundMatcher(["红杉资本"], {"红杉资本": ["HongShan"]})
+    histories = {1: [{'投资方': '红杉资本，HongShan'}], 2: [{'投资方': 'hongshan、红杉投资'}]}
+    flags, alias_matches = derive_funding_flags(histories, matcher)
+    assert flags['Peer Fund'].tolist() == ["红杉资本", "红杉资本"]
+    assert sorted((match.investor, match.alias) for match in alias_matches) == [
+        ("HongShan", "HongShan"), ("hongshan", "HongShan"), ("红杉投资", "红杉资本")]
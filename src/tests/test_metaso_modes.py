@@ -0,0 +1,46 @@
+import sys
+import os
+import asyncio
+
+import aiohttp
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+os.environ.setdefault('XINIU_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('XINIU_ACCESS_KEY_SECRET', 'test')
+
+import run_xiaojuren_formatted as pipeline
+from src.tests.mock_servers import MockConfig, MockServers, metaso_answer
+
+
+@pytest.fixture
+def metaso(monkeypatch):
+    with MockServers(MockConfig(latency=0.0, jitter=0.0, sse_chunk_delay=0.0)) as servers:
+        monkeypatch.setattr(pipeline.xiniu_api_client, 'METASO_SEARCH_URL', servers.base_urls()['METASO_SEARCH_URL'])
+        monkeypatch.setenv('METASO_SECRET_KEY', 'test')
+        monkeypatch.setenv('API_CACHE_DISABLED', '1')
+        yield servers
+
+
+def test_split_searches_are_the_default():
+    assert pipeline.DEFAULT_METASO_MODE == 'split'
+
+
+def test_combined_search_answers_both_prompts(metaso):
+    company_name = "测试科技有限公司"
+    question = pipeline.template_env.get_template('company_facts_prompt.j2').render(company_name=company_name)
+    expected = metaso_answer(question)
+    assert set(expected) == set(pipeline.PARENT_COMPANY_FIELDS + pipeline.STOCK_REFORM_FIELDS)
+
+    async def query():
+        async with aiohttp.ClientSession() as session:
+            return await pipeline.query_company_facts_async(company_name, session)
+
+    # One search, split into the shapes the two separate prompts return
+    parent_info, stock_info = asyncio.run(query())
+    assert metaso.requests['metaso'] == 1
+    assert parent_info == {field: expected[field] for field in pipeline.PARENT_COMPANY_FIELDS}
+    assert stock_info == {field: expected[field] for field in pipeline.STOCK_REFORM_FIELDS}
+    assert pipeline.validate_stock_reform_response(dict(stock_info)) == stock_info
@@ -0,0 +1,59 @@
+import sys
+import os
+import json
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.metrics import Histogram, MetricsRegistry
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.1, 0.2, 0.5, 1.0))
+    for value in [0.05] * 50 + [0.15] * 45 + [0.8] * 5:
+        histogram.observe(value)
+    assert histogram.count == 100
+    assert 0.0 < histogram.quantile(0.5) <= 0.1
+    assert 0.1 < histogram.quantile(0.95) <= 0.2
+    assert 0.5 < histogram.quantile(0.99) <= 0.8
+    assert Histogram().quantile(0.5) is None
+
+
+def test_request_timer_records_status_bytes_and_exceptions():
+    registry = MetricsRegistry()
+    with registry.request('xiniu', 'company/get_2') as call:
+        call.status = 200
+        call.bytes = 2048
+    with pytest.raises(TimeoutError):
+        with registry.request('xiniu', 'company/get_2'):
+            raise TimeoutError()
+    registry.record_retry('xiniu', 'company/get_2')
+    registry.record_cache('xiniu', 'company/get_2', hit=True)
+    registry.record_cache('xiniu', 'company/get_2', hit=False)
+
+    metrics = registry.snapshot()['endpoints']['xiniu company/get_2']
+    assert metrics['requests'] == 2
+    assert metrics['statuses'] == {'200': 1, 'TimeoutError': 1}
+    assert metrics['bytes'] == 2048
+    assert (metrics['retries'], metrics['cache_hits'], metrics['cache_misses']) == (1, 1, 1)
+    assert "xiniu company/get_2" in registry.summary_table()
+
+
+def test_snapshot_files(tmp_path):
+    registry = MetricsRegistry()
+    registry.record_request('metaso', 'search', 0.3, 200, 100)
+    registry.record_request('metaso', 'search', 3.0, 503)
+
+    registry.write_snapshot(str(tmp_path / "metrics.json"))
+    with open(tmp_path / "metrics.json", encoding='utf-8') as f:
+        assert json.load(f)['endpoints']['metaso search']['statuses'] == {'200': 1, '503': 1}
+
+    registry.write_snapshot(str(tmp_path / "metrics.prom"))
+    with open(tmp_path / "metrics.prom", encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert 'api_request_duration_seconds_bucket{service="metaso",endpoint="search",le="0.5"} 1' in lines
+    assert 'api_request_duration_seconds_bucket{service="metaso",endpoint="search",le="+Inf"} 2' in lines
+    assert 'api_request_duration_seconds_count{service="metaso",endpoint="search"} 2' in lines
+    assert 'api_requests_total{service="metaso",endpoint="search",status="503"} 1' in lines
@@ -0,0 +1,49 @@
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+os.environ.setdefault('XINIU_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('XINIU_ACCESS_KEY_SECRET', 'test')
+
+from src.api_clients import qichacha_api_client, xiniu_api_client
+from src.tests.mock_servers import MockConfig, MockServers, company_id_for
+
+
+@pytest.fixture(scope='module')
+def servers():
+    with MockServers(MockConfig(latency=0.0, jitter=0.0, sse_chunk_delay=0.0)) as servers:
+        yield servers
+
+
+def test_xiniu_client_against_mock(servers, monkeypatch):
+    monkeypatch.setattr(xiniu_api_client, 'XINIU_BASE_URL', servers.base_urls()['XINIU_BASE_URL'])
+
+    async def fetch():
+        async with xiniu_api_client.XiniuAsyncClient(use_cache=False) as client:
+            company_id = await client.get_company_id("测试科技有限公司")
+            return company_id, await client.get_company_info(company_id)
+
+    company_id, company_info = asyncio.run(fetch())
+    assert company_id == str(company_id_for("测试科技有限公司"))
+    assert company_info['成立时间']
+    assert company_info['行业属性']['详细行业信息']['所有行业标签']
+    # Deterministic: the same company gets the same data on every run
+    assert asyncio.run(fetch()) == (company_id, company_info)
+
+
+def test_metaso_and_qichacha_against_mock(servers, monkeypatch):
+    urls = servers.base_urls()
+    monkeypatch.setattr(xiniu_api_client, 'METASO_SEARCH_URL', urls['METASO_SEARCH_URL'])
+    parent_info = xiniu_api_client.query_metaso("测试科技有限公司")
+    assert set(parent_info) == {"母公司名称", "母公司是否上市"}
+
+    monkeypatch.setattr(qichacha_api_client, 'QICHACHA_BASE_URL', urls['QICHACHA_BASE_URL'])
+    client = qichacha_api_client.QichachaClient("key", "secret", use_cache=False)
+    changes = client.get_all_company_changes("测试科技有限公司")
+    assert changes['Status'] == "200"
+    assert len(changes['Result']) == changes['Paging']['PageSize']
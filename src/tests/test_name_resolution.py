@@ -0,0 +1,70 @@
+import sys
+import os
+import asyncio
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.name_resolution import NameIdMap, NameResolver, name_variants
+
+
+class FakeXiniuClient:
+    """Answers name lookups from a dict; every name takes the same time"""
+
+    def __init__(self, ids, errors=()):
+        self.ids = ids
+        self.errors = set(errors)
+        self.calls = []
+
+    async def find_company_ids(self, company_name):
+        self.calls.append(company_name)
+        await asyncio.sleep(0.01)
+        if company_name in self.errors:
+            raise ValueError("code 1001, missing signature fields")
+        return [self.ids[company_name]] if company_name in self.ids else []
+
+
+def test_name_variants_cover_both_parenthesis_widths():
+    assert name_variants("华为技术有限公司") == ["华为技术有限公司"]
+    assert name_variants("京东方（北京）科技有限公司") == [
+        "京东方（北京）科技有限公司",
+        "京东方(北京)科技有限公司",
+        "京东方 (北京) 科技有限公司",
+        "京东方 科技有限公司",
+    ]
+
+
+def test_variants_are_looked_up_at_once_and_remembered(tmp_path):
+    name_map = NameIdMap(str(tmp_path / 'name_ids.sqlite3'))
+    client = FakeXiniuClient({"京东方 (北京) 科技有限公司": '42', "京东方 科技有限公司": '7'})
+    resolver = NameResolver(client, name_map)
+
+    def resolve(name):
+        return asyncio.run(resolver.resolve(name))
+
+    # The exact name misses, then the higher-priority hit wins although the other
+    # spellings were answered at the same time
+    assert resolve("京东方（北京）科技有限公司") == '42'
+    assert client.calls[0] == "京东方（北京）科技有限公司" and len(client.calls) == 4
+    # A name found as given costs a single lookup
+    client.calls.clear()
+    assert resolve("京东方 科技有限公司") == '7'
+    assert client.calls == ["京东方 科技有限公司"]
+    assert resolve("不存在的公司") is None
+
+    # The results come from the map now
+    client.calls.clear()
+    assert resolve("京东方(北京)科技有限公司") == '42'
+    assert resolve("不存在的公司") is None
+    assert client.calls == []
+
+    # A lookup error is not remembered as a miss
+    client.errors.add("出错的公司")
+    assert resolve("出错的公司") is None
+    assert name_map.get("出错的公司") == (False, None)
+
+    assert name_map.stats() == {'found': 2, 'not_found': 1, 'expired': 0}
+    expired = NameIdMap(str(tmp_path / 'name_ids.sqlite3'), negative_ttl=-1)
+    expired.set("不存在的公司", None)
+    assert expired.get("不存在的公司") == (False, None)
+    assert expired.get("京东方（北京）科技有限公司") == (True, '42')
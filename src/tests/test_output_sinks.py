@@ -0,0 +1,54 @@
+import sys
+import os
+import json
+import random
+
+import numpy as np
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.output_sinks import CsvSink, JsonlSink, ReorderBuffer, SinkGroup, make_sink
+
+
+def test_reorder_buffer_releases_rows_in_order():
+    rows = list(range(5, 25))
+    finished = rows[:]
+    random.Random(7).shuffle(finished)
+    buffer = ReorderBuffer(rows)
+    released = []
+    for row in finished:
+        released.extend(buffer.push(row, f"value{row}"))
+        # Released rows always form a prefix of the sheet order
+        assert [row for row, _ in released] == rows[:len(released)]
+    assert [row for row, _ in released] == rows
+    assert released[0] == (5, "value5")
+    assert len(buffer) == 0
+
+
+def test_streaming_sinks_write_rows_as_they_arrive(tmp_path):
+    base_path = str(tmp_path / "out_formatted")
+    with SinkGroup([CsvSink(base_path), JsonlSink(base_path + ".jsonl")]) as sinks:
+        sinks.start_sheet("第一批", ['企业名称', '数量', 'Peer Fund'])
+        sinks.write_rows("第一批", [(3, {'企业名称': "甲", '数量': np.int64(1), 'Peer Fund': float('nan')})])
+        # Written rows are readable before the sink is closed
+        with open(base_path + ".jsonl", encoding='utf-8') as f:
+            assert json.loads(f.readline()) == {
+                'sheet': "第一批", 'row': 3, 'values': {'企业名称': "甲", '数量': 1, 'Peer Fund': None}}
+        sinks.write_rows("第一批", [(4, {'企业名称': "乙", '数量': 2, 'Peer Fund': "红杉资本"})])
+
+    with open(base_path + "_第一批.csv", encoding='utf-8-sig') as f:
+        assert f.read().splitlines() == ["企业名称,数量,Peer Fund", "甲,1,", "乙,2,红杉资本"]
+
+
+def test_parquet_sink_writes_one_row_group_per_batch(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    sink = make_sink('parquet', str(tmp_path / "out_formatted"))
+    sink.start_sheet("第一批", ['企业名称', '数量'])
+    sink.write_rows("第一批", [(0, {'企业名称': "甲", '数量': 1})])
+    sink.write_rows("第一批", [(1, {'企业名称': "乙", '数量': None})])
+    sink.close()
+    parquet_file = pq.ParquetFile(str(tmp_path / "out_formatted_第一批.parquet"))
+    assert parquet_file.num_row_groups == 2
+    assert parquet_file.read().to_pydict() == {'企业名称': ["甲", "乙"], '数量': ["1", None]}
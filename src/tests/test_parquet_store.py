@@ -0,0 +1,59 @@
+import sys
+import os
+import datetime
+
+import pandas as pd
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.parquet_store import load_company_store, parse_date, write_company_store
+
+pytest.importorskip("pyarrow")
+
+
+def test_parse_date():
+    assert parse_date("2001-02-03") == datetime.date(2001, 2, 3)
+    assert parse_date("2020/01/05 00:00:00") == datetime.date(2020, 1, 5)
+    assert parse_date("2020/01") == datetime.date(2020, 1, 1)
+    assert parse_date("") is None
+    assert parse_date(None) is None
+    assert parse_date("未知") is None
+
+
+def test_store_round_trip(tmp_path):
+    df = pd.DataFrame({'企业名称': ["甲公司", "乙公司", "丙公司"]})
+    df['2家以上Peer Fund'] = ["是", "", "不是"]
+    df['赛道名称'] = ["芯片", "", None]
+    journal = {'rows': {"第一批": {
+        0: {'company_name': "甲公司", 'payload': {'company_info': {
+            '成立时间': "2001-02-03",
+            '融资历史': [{'融资时间': "2020/01/01", '融资轮次': "A轮", '融资金额': "10,000,000 CNY",
+                      '投资方': "红杉资本，高瓴"},
+                     {'融资时间': "", '融资轮次': "天使轮", '融资金额': "金额未披露", '投资方': "未披露"}],
+            '行业属性': {'简介': "b", '详细行业信息': {'所有行业标签': [{'标签名': "芯片", '标签ID': 1}]}}}}},
+        2: {'company_name': "丙公司", 'payload': None},
+    }}}
+    store_dir = str(tmp_path / "parquet")
+
+    assert write_company_store(store_dir, "data/input/小巨人list.xlsx", [("第一批", df)], journal) == 2
+    # Writing again replaces the partition instead of appending to it
+    write_company_store(store_dir, "data/input/小巨人list.xlsx", [("第一批", df)], journal)
+
+    store = load_company_store(store_dir)
+    assert store['row'].tolist() == [0, 2]
+    assert store['input_file'].astype(str).tolist() == ["小巨人list"] * 2
+    assert store['sheet'].astype(str).tolist() == ["第一批"] * 2
+    assert isinstance(store['2家以上Peer Fund'].dtype, pd.CategoricalDtype)
+    assert store['2家以上Peer Fund'].tolist() == ["是", "不是"]
+    assert store['establish_date'].tolist()[0] == datetime.date(2001, 2, 3)
+    rounds = store['funding_rounds'][0]
+    assert rounds[0]['amount'] == 10000000.0 and rounds[0]['currency'] == "CNY"
+    assert list(rounds[0]['investors']) == ["红杉资本", "高瓴"]
+    assert rounds[1]['date'] is None and rounds[1]['amount'] is None
+    assert list(store['industry_tags'][0]) == ["芯片"]
+    assert store['funding_rounds'][1] is None
+
+    selected = load_company_store(store_dir, columns=['company_name'], filters=[('2家以上Peer Fund', '=', "是")])
+    assert selected['company_name'].tolist() == ["甲公司"]
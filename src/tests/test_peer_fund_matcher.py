@@ -0,0 +1,53 @@
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.peer_fund_matcher import (
+    PeerFundMatcher,
+    normalize_investor_name,
+    split_investors
+)
+
+
+def test_normalize_investor_name():
+    assert normalize_investor_name("红杉资本中国 (有限合伙)") == "红杉资本中国"
+    assert normalize_investor_name("红杉资本（有限合伙）") == normalize_investor_name("红杉投资")
+    assert normalize_investor_name(" IDG  Capital ") == "idg"
+    assert normalize_investor_name("ＩＤＧ资本") == "idg"
+    # Suffix stripping never leaves less than two characters
+    assert normalize_investor_name("中投资本") == "中投"
+    assert normalize_investor_name("资本") == "资本"
+
+
+def test_split_investors_handles_all_separators():
+    assert split_investors("红杉资本，高瓴、IDG Capital, 深创投，") == ["红杉资本", "高瓴", "IDG Capital", "深创投"]
+    # "/" and ";" are not separators, so these count as one investor each
+    assert split_investors("A/B Fund；甲，乙") == ["A/B Fund；甲", "乙"]
+    assert split_investors("") == []
+    assert split_investors(None) == []
+
+
+def test_matcher_reports_fund_and_alias():
+    matcher = PeerFundMatcher(
+        ["红杉资本中国基金", "高瓴资本", "IDG资本"],
+        aliases={"红杉资本中国基金": ["红杉中国", "HongShan"]}
+    )
+    assert matcher.match("高瓴").fund == "高瓴资本"
+    assert matcher.match("IDG Capital").alias == "IDG资本"
+    match = matcher.match("HongShan Capital")
+    assert (match.fund, match.alias) == ("红杉资本中国基金", "HongShan")
+    assert matcher.match("某某创投") is None
+
+
+def test_summarize_funding_history():
+    matcher = PeerFundMatcher(["高瓴资本", "IDG资本"], aliases={})
+    summary = matcher.summarize([
+        {'投资方': '高瓴、某某资本，甲，乙'},
+        {'投资方': 'IDG Capital'},
+        {'投资方': '未披露'},
+    ])
+    assert summary['funds'] == ["IDG资本", "高瓴资本"]
+    assert summary['max_round_investors'] == 4
+    assert [match.investor for match in summary['matches']] == ['高瓴', 'IDG Capital']
@@ -0,0 +1,49 @@
+import sys
+import os
+import asyncio
+import time
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.rate_limiter import RateLimiter, TokenBucket, parse_retry_after
+
+
+def test_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=10, burst=3)
+    waits = [bucket.reserve() for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 0.05 < waits[3] <= 0.1
+    assert 0.15 < waits[4] <= 0.2
+
+
+def test_endpoint_limit_applies_on_top_of_provider_limit():
+    limiter = RateLimiter(
+        provider_limits={'xiniu': {'rate': 1000, 'burst': 1000}},
+        endpoint_limits={('xiniu', 'company/get_2'): {'rate': 10, 'burst': 1}}
+    )
+    assert limiter._reserve('xiniu', 'company/get_2') == 0.0
+    assert limiter._reserve('xiniu', 'company/get_2') > 0.05
+    assert limiter._reserve('xiniu', 'company/list_member') == 0.0
+    assert limiter._reserve('metaso', 'search') == 0.0
+
+
+def test_throttled_pauses_sync_and_async_callers():
+    limiter = RateLimiter(provider_limits={'metaso': {'rate': 1000, 'burst': 1000}}, endpoint_limits={})
+    limiter.throttled('metaso', 'search', '0.2')
+
+    start = time.monotonic()
+    limiter.acquire('metaso', 'search')
+    assert time.monotonic() - start >= 0.15
+
+    limiter.throttled('metaso', 'search', '0.2')
+    start = time.monotonic()
+    asyncio.run(limiter.acquire_async('metaso', 'search'))
+    assert time.monotonic() - start >= 0.15
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after(None, default=7) == 7
+    assert parse_retry_after('not a date', default=2) == 2
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
@@ -0,0 +1,56 @@
+import sys
+import os
+
+import pandas as pd
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+os.environ.setdefault('XINIU_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('XINIU_ACCESS_KEY_SECRET', 'test')
+
+import run_xiaojuren_formatted as pipeline
+from src.utils.run_journal import RunJournal, journal_path_for
+
+FUNDING = [
+    {'融资时间': '2021/03/01', '融资轮次': 'A轮', '融资金额': '10,000,000 CNY', '投资方': '红杉资本，高瓴资本'},
+    {'融资时间': '2022/05/01', '融资轮次': 'B轮', '融资金额': '金额未披露', '投资方': 'IDG资本'},
+]
+
+
+def no_api_calls(*args, **kwargs):
+    raise AssertionError("--rederive must not call the APIs")
+
+
+def test_rederive_applies_a_changed_peer_fund_list(tmp_path, monkeypatch):
+    input_file = str(tmp_path / 'input' / 'companies.xlsx')
+    os.makedirs(os.path.dirname(input_file))
+    pd.DataFrame({'企业名称': ["甲科技有限公司", "乙科技有限公司"]}).to_excel(input_file, index=False)
+
+    payload = {'company_info': {'成立时间': '2015-01-01', '是否上市': 'B轮', '融资历史': FUNDING},
+               'parent_info': {'母公司名称': 'NULL', '母公司是否上市': 'NULL'},
+               'stock_info': {'是否是股份公司': '不是', '股改时间': 'NULL'}}
+    with RunJournal(journal_path_for(input_file)) as journal:
+        journal.start_sheet('Sheet1', 0, 2, '企业名称')
+        journal.record_row('Sheet1', 0, "甲科技有限公司", 'ok', {'Peer Fund': "红杉资本"}, payload)
+        journal.record_row('Sheet1', 1, "乙科技有限公司", 'failed', {'Peer Fund': "NULL"})
+
+    monkeypatch.setattr(pipeline.aiohttp, 'ClientSession', no_api_calls)
+    monkeypatch.setattr(pipeline, 'fetch_company_async', no_api_calls)
+    monkeypatch.setattr(pipeline, 'load_peer_fund_aliases', lambda: {})
+    monkeypatch.setattr(pipeline.xiniu_api_client, 'load_deallog_companies', lambda: set())
+
+    def rederive(peer_funds):
+        monkeypatch.setattr(pipeline.xiniu_api_client, 'load_peer_funds', lambda: set(peer_funds))
+        output_file = pipeline.rederive_from_journal(input_file)
+        return pd.read_excel(output_file, keep_default_na=False).set_index('企业名称')
+
+    before = rederive(["红杉资本"])
+    assert before.loc["甲科技有限公司", 'Peer Fund'] == "红杉资本"
+    assert before.loc["甲科技有限公司", '2家以上Peer Fund'] == "不是"
+
+    after = rederive(["红杉资本", "高瓴资本", "IDG资本"])
+    assert after.loc["甲科技有限公司", 'Peer Fund'] == "IDG资本，红杉资本，高瓴资本"
+    assert after.loc["甲科技有限公司", '2家以上Peer Fund'] == "是"
+    # A row without a payload keeps its journaled values
+    assert after.loc["乙科技有限公司", 'Peer Fund'] == "NULL"
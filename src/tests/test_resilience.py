@@ -0,0 +1,156 @@
+import sys
+import os
+import asyncio
+
+import aiohttp
+import pytest
+import yarl
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils import resilience
+from src.utils.resilience import (
+    RETRY_MARKER,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryableError,
+    RetryPolicy,
+    call_with_retry,
+    call_with_retry_async,
+    has_retry_marker
+)
+
+NO_WAIT = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+
+
+def http_error(status):
+    url = yarl.URL('http://api.test/endpoint')
+    request_info = aiohttp.RequestInfo(url, 'POST', {}, url)
+    return aiohttp.ClientResponseError(request_info, (), status=status)
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    resilience._breakers.clear()
+    yield
+    resilience._breakers.clear()
+
+
+def test_transient_error_is_retried_until_success():
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise aiohttp.ClientConnectionError("connection reset")
+        return "ok"
+
+    assert asyncio.run(call_with_retry_async(flaky, 'xiniu', 'test', NO_WAIT)) == "ok"
+    assert len(calls) == 3
+
+
+def test_exhausted_retries_raise_retryable_error():
+    def always_down():
+        raise TimeoutError("timed out")
+
+    # Builtin TimeoutError is asyncio.TimeoutError on Python 3.11+
+    with pytest.raises(RetryableError):
+        call_with_retry(always_down, 'metaso', 'test', RetryPolicy(max_attempts=2, base_delay=0, max_delay=0))
+
+
+def test_non_transient_error_is_not_retried():
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("bad payload")
+
+    with pytest.raises(ValueError):
+        call_with_retry(broken, 'qichacha', 'test', NO_WAIT)
+    assert len(calls) == 1
+
+
+def test_exhausted_throttling_is_retryable():
+    calls = []
+
+    async def throttled():
+        calls.append(1)
+        raise http_error(429)
+
+    with pytest.raises(RetryableError):
+        asyncio.run(call_with_retry_async(throttled, 'xiniu', 'throttled', NO_WAIT))
+    assert len(calls) == 3
+
+
+def test_non_transient_error_does_not_reset_the_breaker():
+    breaker = resilience.get_circuit_breaker('xiniu', 'flaky')
+    breaker.record_failure()
+
+    async def bad_request():
+        raise http_error(400)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(call_with_retry_async(bad_request, 'xiniu', 'flaky', NO_WAIT))
+    assert breaker.failures == 1
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # After the reset timeout exactly one trial call goes through
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_half_open_trial_frees_the_slot():
+    breaker = resilience.get_circuit_breaker('xiniu', 'cancelled')
+    breaker.failure_threshold = 1
+    breaker.reset_timeout = 0
+    breaker.record_failure()
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    async def ok():
+        return "ok"
+
+    async def run():
+        trial = asyncio.ensure_future(call_with_retry_async(slow, 'xiniu', 'cancelled', NO_WAIT))
+        await asyncio.sleep(0.01)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        # The next call becomes the trial instead of failing fast
+        return await call_with_retry_async(ok, 'xiniu', 'cancelled', NO_WAIT)
+
+    assert asyncio.run(run()) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_fails_fast():
+    breaker = resilience.get_circuit_breaker('xiniu', 'down')
+    breaker.failure_threshold = 1
+    breaker.record_failure()
+
+    calls = []
+
+    async def never_called():
+        calls.append(1)
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call_with_retry_async(never_called, 'xiniu', 'down', NO_WAIT))
+    assert calls == []
+
+
+def test_has_retry_marker():
+    assert has_retry_marker(({'融资历史': RETRY_MARKER}, None, None))
+    assert has_retry_marker({'a': [1, {'b': RETRY_MARKER}]})
+    assert not has_retry_marker(({'融资历史': []}, {'母公司名称': 'NULL'}, None))
@@ -0,0 +1,27 @@
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.response_cache import ResponseCache, make_cache_key
+
+
+def test_cache_key_ignores_payload_key_order():
+    assert make_cache_key('company/get_2', {"a": 1, "b": 2}) == make_cache_key('company/get_2', {"b": 2, "a": 1})
+    assert make_cache_key('company/get_2', {"a": 1}) != make_cache_key('company/list_member', {"a": 1})
+
+
+def test_cache_round_trip_and_expiry(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    cache.set('company/get_2', {"companyId": 1}, {"code": 0, "companyVO": {"name": "京东方"}})
+    cache.set('company/funding/list_all_2', {"companyId": 1}, {"code": 0}, ttl=-1)
+
+    assert cache.get('company/get_2', {"companyId": 1})["companyVO"]["name"] == "京东方"
+    assert cache.get('company/funding/list_all_2', {"companyId": 1}) is None
+    assert cache.get('company/get_2', {"companyId": 2}) is None
+
+    assert cache.purge(expired_only=True) == 1
+    assert cache.purge(endpoint='company/get_2') == 1
+    assert cache.stats() == []
+    cache.close()
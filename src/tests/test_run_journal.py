@@ -0,0 +1,57 @@
+import sys
+import os
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.run_journal import RunJournal, read_journal, completed_rows, journal_path_for
+
+
+def test_journal_path_is_next_to_output():
+    path = journal_path_for("data/input/小巨人list copy.xlsx")
+    assert path == os.path.join("data", "output", "小巨人list copy_journal.jsonl")
+
+
+def test_resume_reads_latest_record_per_row(tmp_path):
+    path = str(tmp_path / "run_journal.jsonl")
+    with RunJournal(path) as journal:
+        journal.start_sheet('第一批', 0, 3, '企业名称')
+        journal.record_row('第一批', 0, '公司A', 'ok', {'成立时间': '2001-01-01'})
+        journal.record_row('第一批', 1, '公司B', 'failed', {'成立时间': ''})
+
+    # A resumed run appends; the retried row now succeeds
+    with RunJournal(path, resume=True) as journal:
+        journal.record_row('第一批', 1, '公司B', 'ok', {'成立时间': '2002-02-02'})
+
+    # Simulate a crash in the middle of writing a line
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "row", "sheet": "第一')
+
+    journal = read_journal(path)
+    assert journal['sheets']['第一批']['end_row'] == 3
+    done = completed_rows(journal, '第一批')
+    assert sorted(done) == [0, 1]
+    assert done[1]['values']['成立时间'] == '2002-02-02'
+
+
+def test_values_records_complete_journaled_rows(tmp_path):
+    path = str(tmp_path / "run_journal.jsonl")
+    with RunJournal(path) as journal:
+        journal.record_row('第一批', 0, '公司A', 'ok', {'成立时间': '2001-01-01', 'Peer Fund': ''})
+        journal.update_values('第一批', {0: {'Peer Fund': '红杉资本'}, 5: {'Peer Fund': 'NULL'}})
+
+    rows = read_journal(path)['rows']['第一批']
+    assert rows[0]['values'] == {'成立时间': '2001-01-01', 'Peer Fund': '红杉资本'}
+    # Values for a row that was never recorded are ignored
+    assert list(rows) == [0]
+
+
+def test_fresh_run_keeps_previous_journal(tmp_path):
+    path = str(tmp_path / "run_journal.jsonl")
+    with RunJournal(path) as journal:
+        journal.record_row('第一批', 0, '公司A', 'ok', {})
+    with RunJournal(path):
+        pass
+
+    assert read_journal(path)['rows'] == {}
+    assert os.path.exists(path + '.prev')
@@ -0,0 +1,89 @@
+import sys
+import os
+import asyncio
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+os.environ.setdefault('XINIU_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('XINIU_ACCESS_KEY_SECRET', 'test')
+
+import run_xiaojuren_formatted as pipeline
+from src.utils.resilience import RETRY_MARKER
+from src.utils.single_flight import SingleFlight, normalize_company_name
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'成立时间': '2001-01-01'}
+
+    async def run():
+        return await asyncio.gather(*(flight.do('key', fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert calls == [1]
+    assert all(result == {'成立时间': '2001-01-01'} for result in results)
+    # Every caller gets its own copy
+    assert len({id(result) for result in results}) == 5
+    assert flight.stats() == {'requests': 5, 'executed': 1, 'shared_in_flight': 4, 'reused': 0, 'saved': 4}
+
+
+def test_errors_reach_every_waiter_and_are_not_remembered():
+    flight = SingleFlight()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(*(flight.do('key', failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert calls == [1]
+    assert all(isinstance(result, ValueError) for result in results)
+    with pytest.raises(ValueError):
+        asyncio.run(flight.do('key', failing))
+    assert calls == [1, 1]
+
+
+def test_company_lookups_are_keyed_on_the_normalized_name(monkeypatch):
+    assert normalize_company_name("京东方 (BOE)") == normalize_company_name("京东方（ｂｏｅ）")
+    answers = {
+        "京东方（北京）科技有限公司": ({'成立时间': '1993-04-09'}, {}, {}),
+        "无结果公司": (None, None, None),
+        "限流公司": ({'成立时间': RETRY_MARKER}, {}, {}),
+    }
+    calls = []
+
+    async def fetch(company_name, session, metaso_mode):
+        calls.append(company_name)
+        await asyncio.sleep(0.01)
+        return answers[company_name.replace(' ', '').replace('(', '（').replace(')', '）')]
+
+    monkeypatch.setattr(pipeline, 'fetch_company_async', fetch)
+    monkeypatch.setattr(pipeline, 'company_lookups', SingleFlight())
+
+    async def run(*names):
+        return await asyncio.gather(*(pipeline.process_company_async(name, None) for name in names))
+
+    # Full-width, half-width and spaced spellings collapse to one call
+    results = asyncio.run(run("京东方（北京）科技有限公司", "京东方(北京)科技有限公司", " 京东方 (北京) 科技有限公司"))
+    assert len(calls) == 1
+    assert all(result[0] == {'成立时间': '1993-04-09'} for result in results)
+    asyncio.run(run("京东方(北京)科技有限公司"))
+    assert len(calls) == 1
+
+    # Companies that were not found or hit RETRY_MARKER are fetched again by later rows
+    calls.clear()
+    asyncio.run(run("无结果公司", "限流公司"))
+    asyncio.run(run("无结果公司", "限流公司"))
+    assert sorted(calls) == ["无结果公司", "无结果公司", "限流公司", "限流公司"]
@@ -0,0 +1,60 @@
+import sys
+import os
+import asyncio
+import json
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.sse_json import JSONObjectExtractor, read_sse_json, read_sse_json_async
+
+
+def sse_lines(fragments):
+    lines = [b'data:{"type":"start"}']
+    for text in fragments:
+        lines.append(("data:" + json.dumps({"type": "append-text", "text": text}, ensure_ascii=False)).encode('utf-8'))
+        lines.append(b'')
+    lines.append(b'data:[DONE]')
+    return lines
+
+
+def test_object_split_across_fragments_with_fences():
+    fragments = ['```json\n{"母公司名称": "京东', '方科技集团", "母公司', '是否上市": "是"}\n```']
+    assert read_sse_json(sse_lines(fragments)) == {"母公司名称": "京东方科技集团", "母公司是否上市": "是"}
+
+
+def test_stops_reading_after_object_is_complete():
+    fragments = ['{"是否是股份公司": "是", ', '"股改时间": "2010-01-01"}', '\n以上信息来自公开资料']
+
+    def stream():
+        for line in sse_lines(fragments):
+            if '以上'.encode('utf-8') in line:
+                raise AssertionError("trailing prose should not be read")
+            yield line
+
+    assert read_sse_json(stream()) == {"是否是股份公司": "是", "股改时间": "2010-01-01"}
+
+
+def test_braces_and_escapes_inside_strings():
+    extractor = JSONObjectExtractor()
+    text = '{"母公司名称": "A}{\\"B\\\\", "母公司是否上市": "NULL"}'
+    # Feed one character at a time to exercise state carried between fragments
+    results = [extractor.feed(char) for char in text]
+    assert results[:-1] == [None] * (len(text) - 1)
+    assert results[-1] == {"母公司名称": 'A}{"B\\', "母公司是否上市": "NULL"}
+
+
+def test_non_object_answer_falls_back_and_reports_raw_text():
+    with pytest.raises(json.JSONDecodeError) as excinfo:
+        read_sse_json(sse_lines(['抱歉，', '无法回答']))
+    assert excinfo.value.doc == '抱歉，无法回答'
+
+
+def test_async_reader():
+    async def stream():
+        for line in sse_lines(['{"a": 1}', 'tail']):
+            yield line
+
+    assert asyncio.run(read_sse_json_async(stream())) == {"a": 1}
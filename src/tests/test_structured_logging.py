@@ -0,0 +1,69 @@
+import sys
+import os
+import asyncio
+import io
+import json
+import logging
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+os.environ.setdefault('XINIU_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('XINIU_ACCESS_KEY_SECRET', 'test')
+
+import pytest
+
+from src.api_clients import xiniu_api_client
+from src.tests.mock_servers import MockConfig, MockServers
+from src.utils.structured_logging import configure_logging
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_json_format_includes_extra_fields(restore_root_logger):
+    stream = io.StringIO()
+    configure_logging('INFO', 'json', stream)
+    logger = logging.getLogger('pipeline')
+    logger.debug("hidden")
+    logger.info("Row %d done", 3, extra={'sheet': '第一批', 'row': 3, 'status': 'ok', 'seconds': 0.25})
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    entry = json.loads(lines[0])
+    assert entry['level'] == 'INFO' and entry['logger'] == 'pipeline' and entry['message'] == "Row 3 done"
+    assert (entry['sheet'], entry['row'], entry['status'], entry['seconds']) == ('第一批', 3, 'ok', 0.25)
+
+
+def test_payload_dumps_are_only_built_at_debug(restore_root_logger, monkeypatch):
+    dumps_calls = []
+    dumps = json.dumps
+
+    def counting_dumps(*args, **kwargs):
+        dumps_calls.append(args[0])
+        return dumps(*args, **kwargs)
+
+    monkeypatch.setattr(xiniu_api_client.json, 'dumps', counting_dumps)
+
+    def lookup(level):
+        configure_logging(level, 'text', io.StringIO())
+        dumps_calls.clear()
+
+        async def fetch():
+            async with xiniu_api_client.XiniuAsyncClient(use_cache=False) as client:
+                await client.get_company_info(await client.get_company_id("测试科技有限公司"))
+        asyncio.run(fetch())
+        return len(dumps_calls)
+
+    with MockServers(MockConfig(latency=0.0, jitter=0.0)) as mock:
+        monkeypatch.setattr(xiniu_api_client, 'XINIU_BASE_URL', mock.base_urls()['XINIU_BASE_URL'])
+        info_dumps = lookup('INFO')
+        debug_dumps = lookup('DEBUG')
+    # The ID lookup dumps its request and response, the company record its response
+    assert debug_dumps - info_dumps == 3
@@ -0,0 +1,48 @@
+import sys
+import os
+import asyncio
+import json
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.tracing import span, start_tracing, stop_tracing
+
+
+def test_spans_are_noops_until_tracing_starts():
+    assert span('a') is span('b', cat='xiniu', company_id=1)
+    with span('a') as traced:
+        traced.set(cached=True)
+    assert stop_tracing() is None
+
+
+def test_parallel_calls_get_their_own_labelled_tracks(tmp_path):
+    path = str(tmp_path / 'trace' / 'run.json')
+
+    async def call(name):
+        with span(name, cat='xiniu'):
+            await asyncio.sleep(0.01)
+
+    async def company():
+        with span('company', label='第一批 row 1'):
+            with span('deallog match'):
+                pass
+            await asyncio.gather(call('xiniu company/get_2'), call('metaso parent company'))
+
+    start_tracing(path)
+    asyncio.run(company())
+    tracer = stop_tracing()
+    assert tracer.event_count() == 4
+
+    with open(path, encoding='utf-8') as f:
+        events = json.load(f)['traceEvents']
+    spans = {event['name']: event for event in events if event['ph'] == 'X'}
+    tracks = {event['tid']: event['args']['name'] for event in events if event['name'] == 'thread_name'}
+
+    # The parallel calls overlap on separate tracks, each named after the company
+    get_2, metaso = spans['xiniu company/get_2'], spans['metaso parent company']
+    assert len({spans['company']['tid'], get_2['tid'], metaso['tid']}) == 3
+    assert all(tracks[span_event['tid']].startswith('第一批 row 1') for span_event in spans.values())
+    assert get_2['ts'] < metaso['ts'] + metaso['dur'] and metaso['ts'] < get_2['ts'] + get_2['dur']
+    assert spans['deallog match']['tid'] == spans['company']['tid']
+    assert spans['company']['dur'] >= get_2['dur']
@@ -0,0 +1,60 @@
+import sys
+import os
+
+import pandas as pd
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.utils.workbook_reader import read_workbook, sheet_names
+
+
+def write_workbook(path, sheets):
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+
+def test_reads_all_sheets_with_projection(tmp_path):
+    path = str(tmp_path / "input.xlsx")
+    write_workbook(path, {
+        "第一批": pd.DataFrame({'企业名称': [f"公司{i}" for i in range(10)], '地区': ['北京'] * 10}),
+        "第二批": pd.DataFrame({'企业名称': ["甲", "乙"], '地区': ['上海'] * 2}),
+    })
+
+    sheets = read_workbook(path)
+    assert list(sheets) == sheet_names(path) == ["第一批", "第二批"]
+    assert sheets["第一批"].shape == (10, 2)
+
+    window = read_workbook(path, sheets=["第一批"], usecols=['企业名称'], row_window=(3, 6))
+    names = window["第一批"]['企业名称']
+    assert list(window["第一批"].columns) == ['企业名称']
+    # Rows keep their position in the sheet as index
+    assert names.index.tolist() == [3, 4, 5]
+    assert names.loc[4] == "公司4"
+
+
+def test_window_per_sheet_with_column_filter(tmp_path):
+    path = str(tmp_path / "input.xlsx")
+    write_workbook(path, {
+        "第一批": pd.DataFrame({'企业名称': [f"公司{i}" for i in range(10)], '地区': ['北京'] * 10}),
+        "第二批": pd.DataFrame({'示范企业名称': ["甲", "乙", "丙"], '地区': ['上海'] * 3}),
+    })
+
+    sheets = read_workbook(path, usecols=lambda column: '名称' in column,
+                           row_window={"第一批": (8, 10), "第二批": (1, 2)})
+    assert sheets["第一批"]['企业名称'].to_dict() == {8: "公司8", 9: "公司9"}
+    assert sheets["第二批"].columns.tolist() == ['示范企业名称']
+    assert sheets["第二批"]['示范企业名称'].to_dict() == {1: "乙"}
+
+
+def test_cache_follows_file_changes(tmp_path):
+    path = str(tmp_path / "input.xlsx")
+    write_workbook(path, {"Sheet1": pd.DataFrame({'企业名称': ["甲"]})})
+    first = read_workbook(path)["Sheet1"]
+    first.loc[0, '企业名称'] = "changed by caller"
+    assert read_workbook(path)["Sheet1"].loc[0, '企业名称'] == "甲"
+
+    write_workbook(path, {"Sheet1": pd.DataFrame({'企业名称': ["甲", "乙"]})})
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000_000))
+    assert read_workbook(path)["Sheet1"]['企业名称'].tolist() == ["甲", "乙"]
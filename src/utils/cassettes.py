@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Record/replay cassettes of the Xiniu, Metaso and Qichacha traffic
+
+A CassetteServer is a local HTTP server the clients are pointed at instead of
+the real APIs (XINIU_BASE_URL, METASO_SEARCH_URL, QICHACHA_BASE_URL):
+
+    record  forwards every request to the real API, streams the response back
+            and stores it in the cassette, chunk by chunk with its timings
+    replay  answers from the cassette without any network access, either with
+            the recorded timings ('original') or as fast as possible ('fast')
+
+Requests go through the full client stack (signing, rate limiting, retries,
+SSE parsing) in both modes, so a replayed run profiles the same code paths as
+a real one on real-shaped data without using any quota.
+
+A cassette is one SQLite file with one row per interaction: the normalized
+request, status, Content-Type/Retry-After, the zlib-compressed body, the time
+to the response headers and the (offset, length) of every body chunk.
+Requests are matched on service, method, path, query and JSON body; the
+volatile and credential fields of the signed Xiniu body (timestamp,
+signature, accesskeyid) are dropped, and auth headers (secret-key, Token,
+Timespan) are never stored. A request recorded several times is replayed in
+recorded order, the last recording repeating after that.
+
+Usage:
+    python src/utils/cassettes.py record data/cassettes/run.sqlite3 [--port 8766]
+    python src/utils/cassettes.py replay data/cassettes/run.sqlite3 [--timing fast]
+    python src/utils/cassettes.py stats data/cassettes/run.sqlite3
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+
+import aiohttp
+from aiohttp import web
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.local_server import LocalServer
+from src.utils.response_cache import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_MODES = ('record', 'replay')
+REPLAY_TIMINGS = ('original', 'fast')
+DEFAULT_REPLAY_TIMING = 'original'
+
+# Real endpoints forwarded to when recording, by the path prefix the clients are given
+DEFAULT_UPSTREAMS = {
+    'xiniu': 'https://api.xiniudata.com/openapi/v2',
+    'metaso': 'https://metaso.cn/api/open/search',
+    'qichacha': 'https://api.qichacha.com',
+}
+
+# Environment variable of each client's endpoint, by service
+CLIENT_URL_VARIABLES = {
+    'xiniu': 'XINIU_BASE_URL',
+    'metaso': 'METASO_SEARCH_URL',
+    'qichacha': 'QICHACHA_BASE_URL',
+}
+
+# Request body fields that change on every call or identify the account
+VOLATILE_FIELDS = ('timestamp', 'signature', 'accesskeyid')
+
+# Request headers not forwarded upstream (aiohttp sets its own)
+SKIPPED_REQUEST_HEADERS = {'host', 'content-length', 'connection', 'keep-alive', 'transfer-encoding',
+                           'accept-encoding'}
+
+# Response headers kept in the cassette
+RECORDED_RESPONSE_HEADERS = ('Content-Type', 'Retry-After')
+
+# Metaso answers stream for a while, so only bound the connect and idle-read time
+UPSTREAM_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=120)
+
+
+def normalize_request(query, body):
+    """
+    Build the part of a request that identifies it in the cassette
+
+    Args:
+        query (Mapping): URL query parameters
+        body (bytes): Request body
+    Returns:
+        dict: {'query': {...}} and/or {'body': decoded JSON without VOLATILE_FIELDS}
+    """
+    request = {}
+    if query:
+        request['query'] = {key: query[key] for key in sorted(query)}
+    if body:
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            payload = body.decode('utf-8', 'replace')
+        if isinstance(payload, dict):
+            payload = {key: value for key, value in payload.items() if key not in VOLATILE_FIELDS}
+        request['body'] = payload
+    return request
+
+
+def interaction_key(service, method, path, request):
+    """Key matching a request to its recordings"""
+    return make_cache_key(f"{service} {method} {path}", request)
+
+
+class CassetteStore:
+    """
+    Interactions of one cassette, stored in a single SQLite file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS interactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                service TEXT NOT NULL,
+                method TEXT NOT NULL,
+                path TEXT NOT NULL,
+                request TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                body_size INTEGER NOT NULL,
+                elapsed REAL NOT NULL,
+                chunks TEXT NOT NULL,
+                recorded_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_interactions_key ON interactions (key, id)")
+        self._conn.commit()
+
+    def record(self, service, method, path, request, status, headers, body, elapsed, chunks):
+        """
+        Store one interaction
+
+        Args:
+            request (dict): Normalized request, see normalize_request
+            headers (dict): Response headers to replay
+            body (bytes): Complete response body
+            elapsed (float): Seconds until the response headers arrived
+            chunks (list): [seconds since the request was sent, length] of every body chunk
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO interactions (key, service, method, path, request, status, headers, body, "
+                "body_size, elapsed, chunks, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    interaction_key(service, method, path, request),
+                    service,
+                    method,
+                    path,
+                    json.dumps(request, ensure_ascii=False, sort_keys=True),
+                    status,
+                    json.dumps(headers),
+                    zlib.compress(body, 6),
+                    len(body),
+                    elapsed,
+                    json.dumps(chunks),
+                    time.time(),
+                )
+            )
+            self._conn.commit()
+
+    def find(self, key, occurrence=0):
+        """
+        Return the occurrence-th recording of a request (the last one if there are fewer)
+
+        Returns:
+            dict: status, headers, body, elapsed, chunks; None if the request was never recorded
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, headers, body, elapsed, chunks FROM interactions WHERE key = ? ORDER BY id",
+                (key,)
+            ).fetchall()
+        if not rows:
+            return None
+        status, headers, body, elapsed, chunks = rows[min(occurrence, len(rows) - 1)]
+        return {
+            'status': status,
+            'headers': json.loads(headers),
+            'body': zlib.decompress(body),
+            'elapsed': elapsed,
+            'chunks': json.loads(chunks),
+        }
+
+    def stats(self):
+        """
+        Returns:
+            list: (service, path, interactions, body bytes, compressed bytes) tuples
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT service, path, COUNT(*), SUM(body_size), SUM(LENGTH(body)) FROM interactions "
+                "GROUP BY service, path ORDER BY service, path"
+            ).fetchall()
+
+    def company_names(self):
+        """
+        Returns:
+            list: Company names looked up on Xiniu, in recorded order
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT request FROM interactions WHERE service = 'xiniu' "
+                "AND path = 'company/id/list_by_fullname' ORDER BY id"
+            ).fetchall()
+        names = (json.loads(request).get('body', {}).get('payload', {}).get('fullName') for (request,) in rows)
+        return list(dict.fromkeys(name for name in names if name))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CassetteServer:
+    """
+    Local server recording the API traffic to a cassette or replaying it
+    """
+
+    def __init__(self, store, mode, upstreams=None, timing=DEFAULT_REPLAY_TIMING):
+        """
+        Args:
+            store (CassetteStore): Cassette to record to or replay from
+            mode (str): 'record' or 'replay'
+            upstreams (dict): {service: real endpoint} forwarded to when recording,
+                defaults to DEFAULT_UPSTREAMS
+            timing (str): 'original' replays the recorded delays, 'fast' answers at once
+        """
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        if timing not in REPLAY_TIMINGS:
+            raise ValueError(f"Unknown replay timing: {timing}")
+        self.store = store
+        self.mode = mode
+        self.upstreams = dict(DEFAULT_UPSTREAMS if upstreams is None else upstreams)
+        self.timing = timing
+        self.counts = Counter()
+        self._occurrences = Counter()
+        self._session = None
+        self._server = None
+
+    def app(self):
+        app = web.Application()
+        handler = self.handle_record if self.mode == 'record' else self.handle_replay
+        app.router.add_route('*', '/{service}', handler)
+        app.router.add_route('*', '/{service}/{path:.*}', handler)
+        if self.mode == 'record':
+            app.on_cleanup.append(self._close_session)
+        return app
+
+    async def _close_session(self, app):
+        if self._session is not None:
+            await self._session.close()
+
+    async def handle_record(self, request):
+        service = request.match_info['service']
+        path = request.match_info.get('path', '')
+        if service not in self.upstreams:
+            return web.Response(status=404, text=f"Unknown service: {service}")
+        url = self.upstreams[service] + (f"/{path}" if path else '')
+        body = await request.read()
+        headers = {name: value for name, value in request.headers.items()
+                   if name.lower() not in SKIPPED_REQUEST_HEADERS}
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+
+        response = None
+        started = time.perf_counter()
+        try:
+            async with self._session.request(request.method, url, params=request.query, data=body or None,
+                                             headers=headers, timeout=UPSTREAM_TIMEOUT) as upstream:
+                elapsed = time.perf_counter() - started
+                response_headers = {name: upstream.headers[name] for name in RECORDED_RESPONSE_HEADERS
+                                    if name in upstream.headers}
+                response = web.StreamResponse(status=upstream.status, headers=response_headers)
+                await response.prepare(request)
+
+                parts = []
+                chunks = []
+                client_open = True
+                async for chunk in upstream.content.iter_any():
+                    parts.append(chunk)
+                    chunks.append([round(time.perf_counter() - started, 4), len(chunk)])
+                    if client_open:
+                        try:
+                            await response.write(chunk)
+                        except (ConnectionResetError, RuntimeError):
+                            # The client stopped reading (e.g. the SSE answer was complete);
+                            # keep reading so the cassette holds the whole response
+                            client_open = False
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # Failed exchanges are not recorded
+            logger.error("Cassette proxy error for %s/%s: %s", service, path, e)
+            if response is not None and response.prepared:
+                return response
+            return web.Response(status=502, text=str(e))
+
+        self.store.record(service, request.method, path, normalize_request(request.query, body),
+                          upstream.status, response_headers, b"".join(parts), elapsed, chunks)
+        self.counts['recorded'] += 1
+        return response
+
+    async def handle_replay(self, request):
+        service = request.match_info['service']
+        path = request.match_info.get('path', '')
+        key = interaction_key(service, request.method, path, normalize_request(request.query, await request.read()))
+        occurrence = self._occurrences[key]
+        self._occurrences[key] += 1
+        interaction = self.store.find(key, occurrence)
+        if interaction is None:
+            self.counts['missing'] += 1
+            logger.warning("Not in cassette: %s %s/%s", request.method, service, path)
+            return web.Response(status=404, text="Request not in cassette")
+
+        started = time.perf_counter()
+        original = self.timing == 'original'
+        if original:
+            await asyncio.sleep(interaction['elapsed'])
+        response = web.StreamResponse(status=interaction['status'], headers=interaction['headers'])
+        await response.prepare(request)
+        body = interaction['body']
+        position = 0
+        try:
+            for offset, length in interaction['chunks']:
+                if original:
+                    await asyncio.sleep(max(0.0, offset - (time.perf_counter() - started)))
+                await response.write(body[position:position + length])
+                position += length
+        except (ConnectionResetError, RuntimeError):
+            # The client stops reading streamed answers once it has what it needs
+            pass
+        self.counts['replayed'] += 1
+        return response
+
+    def base_urls(self):
+        """
+        Returns:
+            dict: {environment variable: URL} pointing each client at this server
+        """
+        return {variable: self._server.url(f"/{service}") for service, variable in CLIENT_URL_VARIABLES.items()}
+
+    def start(self, port=0):
+        """
+        Serve in a background thread (port 0 picks a free port)
+
+        Returns:
+            CassetteServer: self
+        """
+        self._server = LocalServer(self.app(), port, name=f'cassette-{self.mode}').start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the cassette"""
+        if self._server is not None:
+            self._server.stop()
+            self._server = None
+        self.store.close()
+
+    def summary(self):
+        """Return a one-line summary of the traffic handled"""
+        if self.mode == 'record':
+            return f"Cassette {self.store.path}: {self.counts['recorded']} interactions recorded"
+        return (f"Cassette {self.store.path}: {self.counts['replayed']} interactions replayed, "
+                f"{self.counts['missing']} requests not in cassette")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay API traffic through a local cassette server")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for command in CASSETTE_MODES:
+        serve_parser = subparsers.add_parser(command, help=f"Serve the cassette in {command} mode")
+        serve_parser.add_argument('cassette', help="Cassette file")
+        serve_parser.add_argument('--port', type=int, default=8766)
+        if command == 'replay':
+            serve_parser.add_argument('--timing', choices=REPLAY_TIMINGS, default=DEFAULT_REPLAY_TIMING,
+                                      help="Replay the recorded delays or answer at once")
+    stats_parser = subparsers.add_parser('stats', help="Show the interactions per endpoint")
+    stats_parser.add_argument('cassette', help="Cassette file")
+    args = parser.parse_args()
+
+    store = CassetteStore(args.cassette)
+    if args.command == 'stats':
+        rows = store.stats()
+        print(f"Cassette file: {args.cassette}")
+        print(f"{'Endpoint':<42} {'Interactions':>12} {'KB':>8} {'Stored KB':>10}")
+        for service, path, count, size, stored in rows:
+            print(f"{service + ' ' + path:<42} {count:>12} {size / 1024:>8.0f} {stored / 1024:>10.0f}")
+        print(f"Total interactions: {sum(row[2] for row in rows)}")
+        store.close()
+        return
+
+    server = CassetteServer(store, args.command, timing=getattr(args, 'timing', DEFAULT_REPLAY_TIMING))
+    server.start(args.port)
+    print("Point the clients at the cassette server with:")
+    for variable, url in server.base_urls().items():
+        print(f"  {variable}={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(server.summary())
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,10 @@
-import pandas as pd
 import os
+import sys
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.workbook_reader import read_workbook
 
 def check_excel_file(file_path):
     """Check the structure of an Excel file"""
@@ -9,18 +14,14 @@ def check_excel_file(file_path):
             print(f"Error: File {file_path} does not exist")
             return
 
-        # Read the Excel file
-        xl = pd.ExcelFile(file_path)
-        
-        # Get sheet names
-        sheets = xl.sheet_names
+        # Read all sheets in one pass
+        sheets = read_workbook(file_path)
         
         print(f"\nFile: {os.path.basename(file_path)}")
         print(f"Number of sheets: {len(sheets)}")
         print("\nSheet details:")
         
-        for sheet in sheets:
-            df = pd.read_excel(file_path, sheet_name=sheet)
+        for sheet, df in sheets.items():
             print(f"\nSheet: {sheet}")
             print(f"Dimensions: {df.shape[0]} rows × {df.shape[1]} columns")
             print("Columns:", list(df.columns))
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cross-source company identity index
+
+Every source identifies a company by free text: Xiniu by its full name
+(company/id/list_by_fullname), Qichacha by a searchKey and Metaso by the name
+in the prompt. The identity index keeps what has been learned about a company
+once: its canonical name, every alias it was seen under, its Xiniu companyId,
+its unified social credit code and the key Qichacha answered to. Aliases are
+keyed on the normalized name, so a lookup is a single primary-key read.
+
+Records are merged: a company seen again under another name, or with a credit
+code, extends the existing identity found by Xiniu ID, credit code or alias.
+Unlike the response cache and the name map, identities do not expire.
+
+Usage:
+    python src/utils/company_identity.py stats
+    python src/utils/company_identity.py show 京东方科技集团股份有限公司
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.single_flight import normalize_company_name
+
+DEFAULT_IDENTITY_PATH = "data/cache/identities.sqlite3"
+
+Identity = namedtuple('Identity', ['identity_id', 'canonical_name', 'xiniu_id', 'credit_code', 'qichacha_key'])
+
+_IDENTITY_COLUMNS = "identity_id, canonical_name, xiniu_id, credit_code, qichacha_key"
+
+# Unified social credit code: 18 digits and capital letters (no I, O, S, V or Z)
+CREDIT_CODE = re.compile(r'^[0-9A-HJ-NPQRTUWXY]{18}$')
+
+
+def is_credit_code(value):
+    """Return True if a search key looks like a unified social credit code"""
+    return bool(CREDIT_CODE.match(str(value).strip().upper()))
+
+
+def qichacha_search_key(identity):
+    """
+    Return the most exact Qichacha searchKey known for an identity: the credit
+    code, else the key Qichacha answered to before, else None
+    """
+    if identity is None:
+        return None
+    return identity.credit_code or identity.qichacha_key
+
+
+class CompanyIdentityIndex:
+    """
+    Identities and their aliases stored in a single SQLite file
+    """
+
+    def __init__(self, path=DEFAULT_IDENTITY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode this only syncs at checkpoints; a lost record is just learned again
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS identities (
+                identity_id INTEGER PRIMARY KEY,
+                canonical_name TEXT,
+                xiniu_id TEXT UNIQUE,
+                credit_code TEXT UNIQUE,
+                qichacha_key TEXT,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS aliases (
+                alias_key TEXT PRIMARY KEY,
+                alias TEXT NOT NULL,
+                identity_id INTEGER NOT NULL REFERENCES identities (identity_id)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def _fetch(self, where, value):
+        row = self._conn.execute(f"SELECT {_IDENTITY_COLUMNS} FROM identities WHERE {where} = ?", (value,)).fetchone()
+        return Identity(*row) if row else None
+
+    def lookup(self, name):
+        """
+        Return the identity a company name is known under, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join('i.' + column for column in Identity._fields)} "
+                "FROM aliases a JOIN identities i ON i.identity_id = a.identity_id WHERE a.alias_key = ?",
+                (normalize_company_name(name),)
+            ).fetchone()
+        return Identity(*row) if row else None
+
+    def by_xiniu_id(self, xiniu_id):
+        """Return the identity with a Xiniu companyId, or None"""
+        with self._lock:
+            return self._fetch('xiniu_id', str(xiniu_id))
+
+    def record(self, name=None, xiniu_id=None, canonical_name=None, credit_code=None, qichacha_key=None,
+               aliases=()):
+        """
+        Add what a source told us about a company, merging it into the identity
+        already known by Xiniu ID, credit code or one of the names
+
+        Args:
+            name (str): Name the company was looked up by
+            xiniu_id (str): Xiniu companyId
+            canonical_name (str): Full registered name
+            credit_code (str): Unified social credit code
+            qichacha_key (str): searchKey Qichacha answered to
+            aliases (iterable): Other names the company was found under
+        Returns:
+            Identity: The updated identity
+        """
+        xiniu_id = str(xiniu_id) if xiniu_id is not None else None
+        names = [alias for alias in (name, canonical_name, *aliases) if alias]
+        with self._lock:
+            identity = None
+            if xiniu_id is not None:
+                identity = self._fetch('xiniu_id', xiniu_id)
+            if identity is None and credit_code:
+                identity = self._fetch('credit_code', credit_code)
+            for alias in names:
+                if identity is not None:
+                    break
+                row = self._conn.execute("SELECT identity_id FROM aliases WHERE alias_key = ?",
+                                         (normalize_company_name(alias),)).fetchone()
+                identity = self._fetch('identity_id', row[0]) if row else None
+
+            now = time.time()
+            if identity is None:
+                identity_id = self._conn.execute(
+                    "INSERT INTO identities (canonical_name, xiniu_id, credit_code, qichacha_key, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (canonical_name or name, xiniu_id, credit_code, qichacha_key, now)
+                ).lastrowid
+            else:
+                identity_id = identity.identity_id
+                # A credit code already held by another identity stays there
+                owner = self._fetch('credit_code', credit_code) if credit_code else None
+                if owner is not None and owner.identity_id != identity_id:
+                    credit_code = None
+                self._conn.execute(
+                    "UPDATE identities SET canonical_name = COALESCE(?, canonical_name), "
+                    "xiniu_id = COALESCE(?, xiniu_id), credit_code = COALESCE(?, credit_code), "
+                    "qichacha_key = COALESCE(?, qichacha_key), updated_at = ? WHERE identity_id = ?",
+                    (canonical_name, xiniu_id, credit_code, qichacha_key, now, identity_id)
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO aliases (alias_key, alias, identity_id) VALUES (?, ?, ?)",
+                [(normalize_company_name(alias), alias, identity_id) for alias in names]
+            )
+            self._conn.commit()
+            return self._fetch('identity_id', identity_id)
+
+    def aliases(self, identity_id):
+        """Return the names an identity was seen under"""
+        with self._lock:
+            rows = self._conn.execute("SELECT alias FROM aliases WHERE identity_id = ? ORDER BY alias",
+                                      (identity_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self):
+        """
+        Return entry counts
+
+        Returns:
+            dict: 'identities', 'aliases', 'xiniu_ids', 'credit_codes' and 'qichacha_keys' counts
+        """
+        with self._lock:
+            identities, xiniu_ids, credit_codes, qichacha_keys = self._conn.execute(
+                "SELECT COUNT(*), COUNT(xiniu_id), COUNT(credit_code), COUNT(qichacha_key) FROM identities"
+            ).fetchone()
+            aliases = self._conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0]
+        return {'identities': identities, 'aliases': aliases, 'xiniu_ids': xiniu_ids,
+                'credit_codes': credit_codes, 'qichacha_keys': qichacha_keys}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_identity_index():
+    """
+    Return the shared identity index, or None if caching is disabled
+
+    The index lives at IDENTITY_INDEX_PATH (default data/cache/identities.sqlite3)
+    and is turned off together with the response cache by API_CACHE_DISABLED=1.
+    """
+    global _default_index
+    if os.getenv('API_CACHE_DISABLED', '').lower() in ('1', 'true', 'yes'):
+        return None
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = CompanyIdentityIndex(os.getenv('IDENTITY_INDEX_PATH', DEFAULT_IDENTITY_PATH))
+        return _default_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the cross-source company identity index")
+    parser.add_argument('--path', default=os.getenv('IDENTITY_INDEX_PATH', DEFAULT_IDENTITY_PATH),
+                        help="Identity index database file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help="Show entry counts")
+    show_parser = subparsers.add_parser('show', help="Show the identity a company name is known under")
+    show_parser.add_argument('name', help="Company name or alias")
+    args = parser.parse_args()
+
+    index = CompanyIdentityIndex(args.path)
+    if args.command == 'stats':
+        stats = index.stats()
+        print(f"Identity index file: {args.path}")
+        print(f"Identities: {stats['identities']}  Aliases: {stats['aliases']}  Xiniu IDs: {stats['xiniu_ids']}  "
+              f"Credit codes: {stats['credit_codes']}  Qichacha keys: {stats['qichacha_keys']}")
+    elif args.command == 'show':
+        identity = index.lookup(args.name)
+        if identity is None:
+            print(f"Unknown company: {args.name}")
+        else:
+            for field, value in identity._asdict().items():
+                print(f"{field}: {value}")
+            print(f"aliases: {', '.join(index.aliases(identity.identity_id))}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Index of deallog company names for the 已在Deal List check
+
+A company is in the deal list when a deallog name part (longer than two
+characters) occurs in one of the company's name parts, or when a company part
+longer than two characters occurs in a deallog part. The original check scanned
+every deallog name for every company. DeallogIndex splits the deallog names
+once, answers the forward check with an Aho-Corasick automaton over all
+deallog parts and the reverse check with a trigram index, and returns the same
+是/不是 as the scan (kept below as reference_check_in_deallog).
+"""
+
+from collections import deque
+
+# Name parts this short (e.g. city names) are ignored by the matching
+MIN_PART_LENGTH = 3
+
+
+def is_likely_english(text):
+    """Check if text contains English characters"""
+    return any(ord(c) < 128 for c in text)
+
+
+def split_chinese_english(name):
+    """
+    Split a company name that might contain both Chinese and English parts
+    Example: "京东方 (BOE)" -> ["京东方", "BOE"]
+    But don't split location names like "展讯通信（上海）有限公司"
+    """
+    name = name.strip()
+
+    # Split by parentheses
+    for separator in ['(', '（', '[', '【']:
+        if separator in name:
+            # Split and clean each part
+            chinese_part = name.split(separator)[0].strip()
+            eng_part = name.split(separator)[1].split(')')[0].split('）')[0].split(']')[0].split('】')[0].strip()
+
+            # Only split if the part in parentheses looks like English
+            if is_likely_english(eng_part):
+                parts = []
+                if chinese_part:
+                    parts.append(chinese_part)
+                if eng_part:
+                    parts.append(eng_part)
+                return parts
+
+    # If no English part found, return the original name
+    return [name]
+
+
+class AhoCorasick:
+    """
+    Multi-pattern automaton answering "does any pattern occur in this text"
+    in one pass over the text
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]  # A pattern ending at (or via fail links, inside) the node
+
+        # Insert shorter patterns first: a pattern extending an existing one can never be
+        # the first match reported, so its tail is not added to the trie
+        for pattern in sorted(set(patterns), key=len):
+            node = 0
+            for char in pattern:
+                if self._output[node] is not None:
+                    break
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(None)
+                    self._goto[node][char] = next_node
+                node = next_node
+            else:
+                if pattern:
+                    self._output[node] = pattern
+
+        # Breadth-first pass setting failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                if self._output[child] is None:
+                    self._output[child] = self._output[self._fail[child]]
+
+    def __len__(self):
+        return len(self._goto)
+
+    def find(self, text):
+        """
+        Return a pattern occurring in text, or None
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node] is not None:
+                return output[node]
+        return None
+
+
+class DeallogIndex:
+    """
+    Deallog names pre-split into parts and indexed for check_in_deallog
+    """
+
+    def __init__(self, deallog_names):
+        self.names = list(deallog_names)
+        parts = {
+            part
+            for name in self.names
+            for part in split_chinese_english(name)
+            if len(part) >= MIN_PART_LENGTH
+        }
+        self.parts = sorted(parts)
+        self._automaton = AhoCorasick(self.parts)
+
+        # Trigram -> ids of the parts containing it
+        self._trigrams = {}
+        for part_id, part in enumerate(self.parts):
+            for trigram in {part[i:i + 3] for i in range(len(part) - 2)}:
+                self._trigrams.setdefault(trigram, []).append(part_id)
+
+    def __len__(self):
+        return len(self.names)
+
+    def find_containing_part(self, text):
+        """
+        Return a deallog part that contains text, or None
+        """
+        postings = []
+        for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            part_ids = self._trigrams.get(trigram)
+            if not part_ids:
+                return None
+            postings.append(part_ids)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for part_ids in postings[1:]:
+            candidates.intersection_update(part_ids)
+            if not candidates:
+                return None
+        for part_id in sorted(candidates):
+            if text in self.parts[part_id]:
+                return self.parts[part_id]
+        return None
+
+    def find_match(self, company_name):
+        """
+        Find the name parts that put a company in the deal list
+
+        Returns:
+            tuple: (company_part, deallog_part, direction) with direction 'forward'
+                (deallog part in company part) or 'reverse', or None if no match
+        """
+        if not company_name:
+            return None
+        for company_part in split_chinese_english(company_name):
+            deallog_part = self._automaton.find(company_part)
+            if deallog_part is not None:
+                return company_part, deallog_part, 'forward'
+            if len(company_part) >= MIN_PART_LENGTH:
+                deallog_part = self.find_containing_part(company_part)
+                if deallog_part is not None:
+                    return company_part, deallog_part, 'reverse'
+        return None
+
+    def check(self, company_name):
+        """Return 是 if the company is in the deal list, otherwise 不是"""
+        return "是" if self.find_match(company_name) else "不是"
+
+
+def reference_check_in_deallog(company_name, deallog_names):
+    """
+    The original O(companies x deallog names) scan, without logging. Kept as the
+    reference DeallogIndex is tested and benchmarked against.
+    """
+    if not company_name:
+        return "不是"
+    company_parts = split_chinese_english(company_name.strip())
+    for deallog_name in deallog_names:
+        for deallog_part in split_chinese_english(deallog_name):
+            if len(deallog_part) <= 2:
+                continue
+            for company_part in company_parts:
+                if deallog_part in company_part:
+                    return "是"
+                if len(company_part) > 2 and company_part in deallog_part:
+                    return "是"
+    return "不是"
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Vectorized funding analytics for a whole sheet
+
+The funding histories of all companies are flattened into one table with one
+row per (company, funding record, investor), and the derived columns
+Peer Fund, 某一年融资超2次, 单轮3家以上fund and 2家以上Peer Fund are computed
+for every company at once with pandas groupby operations. The results match
+find_peer_fund_intersection, check_multiple_fundings_in_year,
+check_multiple_investors_in_round and check_multiple_peer_funds in
+xiniu_api_client, which remain the per-company versions.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.utils.peer_fund_matcher import PeerFundMatcher, split_investors
+from src.utils.resilience import RETRY_MARKER
+
+FUNDING_FLAG_COLUMNS = ['Peer Fund', '某一年融资超2次', '单轮3家以上fund', '2家以上Peer Fund']
+
+FUNDING_TABLE_COLUMNS = ['company', 'record', 'date', 'year', 'round', 'amount', 'currency', 'investor']
+
+# 融资金额 as written by format_funding_list: "10,000,000 CNY" (or "金额未披露")
+AMOUNT_PATTERN = r'^([\d,.]+)\s+(\S+)$'
+
+
+def parse_amount(amount_text):
+    """
+    Split a 融资金额 string into its number and currency
+
+    Returns:
+        tuple: (amount as float, currency), or (None, None) if the amount is not disclosed
+    """
+    match = re.match(AMOUNT_PATTERN, amount_text) if isinstance(amount_text, str) else None
+    if not match:
+        return None, None
+    try:
+        return float(match.group(1).replace(',', '')), match.group(2)
+    except ValueError:
+        return None, None
+
+
+def build_funding_table(funding_histories):
+    """
+    Flatten funding histories into one columnar table
+
+    Args:
+        funding_histories (dict): {company key: funding history list}; entries that
+            are not lists (None, RETRY_MARKER) are skipped
+    Returns:
+        pd.DataFrame: One row per (company, record, investor) with FUNDING_TABLE_COLUMNS.
+            Records without investors keep one row with investor set to NaN.
+    """
+    # Flattening the nested records is the one Python-level pass; investors are
+    # split here so the table can be expanded without further string work
+    columns = {'company': [], 'record': [], 'date': [], 'round': [], 'amount_text': []}
+    investor_lists = []
+    for company, history in funding_histories.items():
+        if not isinstance(history, list):
+            continue
+        for position, funding in enumerate(history):
+            columns['company'].append(company)
+            columns['record'].append(position)
+            columns['date'].append(funding.get('融资时间') or '')
+            columns['round'].append(funding.get('融资轮次', ''))
+            columns['amount_text'].append(funding.get('融资金额') or '')
+            investor_lists.append(split_investors(funding.get('投资方', '')) or [None])
+    if not investor_lists:
+        return pd.DataFrame(columns=FUNDING_TABLE_COLUMNS)
+
+    records = pd.DataFrame(columns)
+    records['year'] = [date.split('/', 1)[0] if date else None for date in columns['date']]
+
+    # Amounts look like "10,000,000 CNY"; parse each distinct string once
+    amount_texts = pd.Series(records['amount_text'].astype(str).unique())
+    parsed = amount_texts.str.extract(AMOUNT_PATTERN)
+    parsed.index = amount_texts
+    records['amount'] = records['amount_text'].map(
+        pd.to_numeric(parsed[0].str.replace(',', '', regex=False), errors='coerce'))
+    records['currency'] = records['amount_text'].map(parsed[1])
+
+    # One row per investor
+    counts = np.fromiter(map(len, investor_lists), dtype=np.int64, count=len(investor_lists))
+    table = records.loc[records.index.repeat(counts)].reset_index(drop=True)
+    table['investor'] = [investor for investors in investor_lists for investor in investors]
+    return table[FUNDING_TABLE_COLUMNS]
+
+
+def compute_funding_flags(table, peer_funds, companies=None):
+    """
+    Compute the funding flag columns for every company in the table
+
+    Args:
+        table (pd.DataFrame): Result of build_funding_table
+        peer_funds (PeerFundMatcher): Peer fund matcher (a set of names is indexed on the fly)
+        companies (iterable): Company keys to return rows for; companies without
+            funding records get the "no funding" values
+    Returns:
+        tuple: (flags, alias_matches); flags is indexed by company key with
+            FUNDING_FLAG_COLUMNS, alias_matches lists the PeerFundMatch of each
+            distinct investor that matched other than by its exact fund name
+    """
+    if not isinstance(peer_funds, PeerFundMatcher):
+        peer_funds = PeerFundMatcher(peer_funds)
+    if companies is None:
+        companies = table['company'].unique()
+    index = pd.Index(list(companies), name='company')
+    flags = pd.DataFrame(index=index, columns=FUNDING_FLAG_COLUMNS)
+    flags['Peer Fund'] = "NULL"
+    flags[['某一年融资超2次', '单轮3家以上fund', '2家以上Peer Fund']] = "不是"
+    if table.empty:
+        return flags, []
+
+    # 某一年融资超2次: more than 2 funding records dated in the same year
+    records = table.drop_duplicates(['company', 'record'])
+    per_year = records.dropna(subset=['year']).groupby(['company', 'year']).size()
+    busy_years = per_year[per_year > 2].index.get_level_values('company').unique()
+
+    # 单轮3家以上fund: more than 3 investors in one record
+    per_record = table.dropna(subset=['investor']).groupby(['company', 'record']).size()
+    crowded_rounds = per_record[per_record > 3].index.get_level_values('company').unique()
+
+    # Peer funds: match each distinct investor name once (object dtype keeps the
+    # string concatenation below valid when no investor matches)
+    investor_names = table['investor'].dropna().unique()
+    fund_of = {}
+    alias_matches = []
+    for name in investor_names:
+        match = peer_funds.match(name)
+        if match is not None:
+            fund_of[name] = match.fund
+            if match.alias != match.fund or match.investor != match.fund:
+                alias_matches.append(match)
+    matched = (table[['company']].assign(fund=table['investor'].map(fund_of).astype(object))
+               .dropna(subset=['fund'])
+               .drop_duplicates()
+               .sort_values(['company', 'fund']))
+    # Concatenate the sorted fund names per company with a groupby sum on strings
+    funds = ("，" + matched['fund']).groupby(matched['company']).sum().str[1:]
+    fund_counts = matched.groupby('company').size()
+
+    flags.loc[flags.index.intersection(busy_years), '某一年融资超2次'] = "是"
+    flags.loc[flags.index.intersection(crowded_rounds), '单轮3家以上fund'] = "是"
+    funds = funds[funds.index.isin(flags.index)]
+    flags.loc[funds.index, 'Peer Fund'] = funds
+    multi_peer = fund_counts[fund_counts >= 2].index
+    flags.loc[flags.index.intersection(multi_peer), '2家以上Peer Fund'] = "是"
+    return flags, alias_matches
+
+
+def derive_funding_flags(funding_histories, peer_funds):
+    """
+    Build the funding table and compute the flags in one step
+
+    Args:
+        funding_histories (dict): {company key: funding history}; RETRY_MARKER entries
+            are left out of the result, and any other non-list entry (None, or the raw
+            round build_company_info keeps when there are no records) counts as no funding
+    Returns:
+        tuple: (flags, alias_matches), see compute_funding_flags
+    """
+    companies = [company for company, history in funding_histories.items()
+                 if not (isinstance(history, str) and history == RETRY_MARKER)]
+    table = build_funding_table(funding_histories)
+    return compute_funding_flags(table, peer_funds, companies=companies)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Run an aiohttp application on 127.0.0.1 in a background thread
+
+Used for the local servers the API clients can be pointed at (mock APIs,
+cassette record/replay) while the pipeline runs in the main thread.
+"""
+
+import asyncio
+import threading
+
+from aiohttp import web
+
+
+class LocalServer:
+    """
+    Serve an aiohttp application from its own event loop thread
+    """
+
+    def __init__(self, app, port=0, name='local-server'):
+        """
+        Args:
+            app (web.Application): Application to serve
+            port (int): Port to listen on; 0 picks a free port
+            name (str): Thread name
+        """
+        self.app = app
+        self.port = port
+        self.name = name
+        self.loop = None
+        self._runner = None
+        self._thread = None
+
+    def start(self):
+        """
+        Start serving; returns once the port is bound
+
+        Returns:
+            LocalServer: self, with .port set to the bound port
+        """
+        started = threading.Event()
+        errors = []
+
+        async def serve():
+            self._runner = web.AppRunner(self.app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, '127.0.0.1', self.port).start()
+            self.port = self._runner.addresses[0][1]
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            try:
+                self.loop.run_until_complete(serve())
+            except Exception as e:
+                # E.g. the port is taken; re-raised in the starting thread
+                errors.append(e)
+                self.loop.close()
+                self.loop = None
+                started.set()
+                return
+            self.loop.call_soon(started.set)
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def url(self, path=''):
+        """Return the http://127.0.0.1:<port> URL of a path"""
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    def stop(self):
+        """Stop serving and wait for the thread to finish"""
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+        self.loop = None
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lightweight in-process metrics for the API clients
+
+Every request to Xiniu, Metaso and Qichacha goes through the shared registry,
+keyed by (service, endpoint). Per endpoint it keeps:
+    - a latency histogram (fixed buckets, p50/p95/p99 estimated from them)
+    - response status counts ('exception class name' when no response came back)
+    - retries after transient failures, 429 throttles and open-circuit rejections
+    - bytes received
+    - response cache hits and misses
+
+get_metrics().summary_table() gives a text table for the end of a run, and
+write_snapshot() writes a JSON snapshot or, for *.prom paths, a Prometheus
+textfile. A MetricsExporter thread can rewrite the file periodically.
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets in seconds; the last bucket is unbounded
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# How often MetricsExporter rewrites its file, in seconds
+DEFAULT_EXPORT_INTERVAL = 30.0
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram; quantiles are interpolated within the bucket they fall in
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """
+        Estimate the q-quantile (0 < q <= 1)
+
+        Returns:
+            float: Estimated value, or None if nothing was observed
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for position, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                # Interpolate within the bucket, narrowed to the observed min/max
+                lower = max(self.bounds[position - 1] if position > 0 else 0.0, self.min)
+                upper = min(self.bounds[position] if position < len(self.bounds) else self.max, self.max)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+
+class EndpointMetrics:
+    """
+    Everything recorded for one (service, endpoint)
+    """
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = Counter()
+        self.retries = 0
+        self.throttled = 0
+        self.circuit_open = 0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def snapshot(self):
+        return {
+            'requests': self.latency.count,
+            'latency_seconds': {
+                'sum': round(self.latency.total, 6),
+                'max': round(self.latency.max, 6),
+                'p50': self.latency.quantile(0.5),
+                'p95': self.latency.quantile(0.95),
+                'p99': self.latency.quantile(0.99),
+                'buckets': dict(zip([str(bound) for bound in self.latency.bounds] + ['+Inf'],
+                                    self.latency.counts)),
+            },
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items(), key=str)},
+            'retries': self.retries,
+            'throttled': self.throttled,
+            'circuit_open': self.circuit_open,
+            'bytes': self.bytes,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+class RequestTimer:
+    """
+    Context manager timing one request. Set .status and .bytes inside the block;
+    an exception leaving the block is recorded as its class name.
+    """
+
+    def __init__(self, registry, service, endpoint):
+        self.registry = registry
+        self.service = service
+        self.endpoint = endpoint
+        self.status = None
+        self.bytes = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        status = self.status
+        if status is None:
+            status = exc_type.__name__ if exc_type is not None else 'ok'
+        self.registry.record_request(self.service, self.endpoint, time.perf_counter() - self.started,
+                                     status, self.bytes)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of per-endpoint metrics
+    """
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def _get(self, service, endpoint):
+        key = (service, endpoint)
+        if key not in self._endpoints:
+            self._endpoints[key] = EndpointMetrics()
+        return self._endpoints[key]
+
+    def request(self, service, endpoint):
+        """
+        Time one request: `with get_metrics().request('xiniu', 'company/get_2') as call: ...`
+        """
+        return RequestTimer(self, service, endpoint)
+
+    def record_request(self, service, endpoint, seconds, status, nbytes=0):
+        """Record a finished request"""
+        with self._lock:
+            metrics = self._get(service, endpoint)
+            metrics.latency.observe(seconds)
+            metrics.statuses[status] += 1
+            metrics.bytes += nbytes or 0
+
+    def record_retry(self, service, endpoint):
+        """Record a retry after a transient failure"""
+        with self._lock:
+            self._get(service, endpoint).retries += 1
+
+    def record_throttle(self, service, endpoint):
+        """Record a 429 answer that made the client wait and re-send"""
+        with self._lock:
+            self._get(service, endpoint).throttled += 1
+
+    def record_circuit_open(self, service, endpoint):
+        """Record a request rejected by an open circuit breaker"""
+        with self._lock:
+            self._get(service, endpoint).circuit_open += 1
+
+    def record_cache(self, service, endpoint, hit):
+        """Record a response cache lookup"""
+        with self._lock:
+            metrics = self._get(service, endpoint)
+            if hit:
+                metrics.cache_hits += 1
+            else:
+                metrics.cache_misses += 1
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._endpoints = {}
+            self.started = time.time()
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: {'started', 'timestamp', 'endpoints': {"service endpoint": metrics}}
+        """
+        with self._lock:
+            endpoints = {f"{service} {endpoint}": metrics.snapshot()
+                         for (service, endpoint), metrics in sorted(self._endpoints.items())}
+        return {'started': self.started, 'timestamp': time.time(), 'endpoints': endpoints}
+
+    def summary_table(self):
+        """
+        Returns:
+            str: One line per endpoint, slowest total time first
+        """
+        with self._lock:
+            rows = sorted(self._endpoints.items(), key=lambda item: item[1].latency.total, reverse=True)
+            lines = [f"{'Endpoint':<42} {'Reqs':>6} {'Total s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                     f"{'Errors':>6} {'Retry':>5} {'429':>4} {'Open':>4} {'KB':>8} {'Cache hit':>9}"]
+            for (service, endpoint), metrics in rows:
+                latency = metrics.latency
+                errors = sum(count for status, count in metrics.statuses.items()
+                             if not (status == 'ok' or (isinstance(status, int) and status < 400)))
+                lookups = metrics.cache_hits + metrics.cache_misses
+                hit_rate = f"{metrics.cache_hits / lookups * 100:.0f}%" if lookups else "-"
+                quantiles = [latency.quantile(q) for q in (0.5, 0.95, 0.99)]
+                quantiles = [f"{value * 1000:.0f}" if value is not None else "-" for value in quantiles]
+                lines.append(f"{service + ' ' + endpoint:<42} {latency.count:>6} {latency.total:>9.1f} "
+                             f"{quantiles[0]:>8} {quantiles[1]:>8} {quantiles[2]:>8} {errors:>6} "
+                             f"{metrics.retries:>5} {metrics.throttled:>4} {metrics.circuit_open:>4} "
+                             f"{metrics.bytes / 1024:>8.0f} {hit_rate:>9}")
+        return "\n".join(lines)
+
+    def to_prometheus(self):
+        """
+        Returns:
+            str: The metrics in the Prometheus text exposition format
+        """
+        def labels(service, endpoint, **extra):
+            pairs = {'service': service, 'endpoint': endpoint, **extra}
+            escaped = (key + '="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+                       for key, value in pairs.items())
+            return "{" + ",".join(escaped) + "}"
+
+        lines = [
+            "# HELP api_request_duration_seconds API request latency",
+            "# TYPE api_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            for (service, endpoint), metrics in items:
+                cumulative = 0
+                for bound, count in zip(list(metrics.latency.bounds) + ['+Inf'], metrics.latency.counts):
+                    cumulative += count
+                    lines.append(f"api_request_duration_seconds_bucket{labels(service, endpoint, le=bound)} {cumulative}")
+                lines.append(f"api_request_duration_seconds_sum{labels(service, endpoint)} {metrics.latency.total}")
+                lines.append(f"api_request_duration_seconds_count{labels(service, endpoint)} {metrics.latency.count}")
+
+            counters = [
+                ('api_requests_total', "API responses by status",
+                 lambda m: [({'status': status}, count) for status, count in sorted(m.statuses.items(), key=str)]),
+                ('api_retries_total', "Retries after transient failures", lambda m: [({}, m.retries)]),
+                ('api_throttled_total', "429 responses that were waited out", lambda m: [({}, m.throttled)]),
+                ('api_circuit_open_total', "Requests rejected by an open circuit", lambda m: [({}, m.circuit_open)]),
+                ('api_response_bytes_total', "Response bytes received", lambda m: [({}, m.bytes)]),
+                ('api_cache_lookups_total', "Response cache lookups",
+                 lambda m: [({'result': 'hit'}, m.cache_hits), ({'result': 'miss'}, m.cache_misses)]),
+            ]
+            for name, help_text, values in counters:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (service, endpoint), metrics in items:
+                    for extra, value in values(metrics):
+                        lines.append(f"{name}{labels(service, endpoint, **extra)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path):
+        """
+        Write the metrics to path: Prometheus text for *.prom, JSON otherwise.
+        The file is replaced atomically so scrapers never read a partial file.
+        """
+        if path.endswith('.prom'):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+
+class MetricsExporter:
+    """
+    Background thread that rewrites a metrics file every interval seconds
+    (and once more when stopped)
+    """
+
+    def __init__(self, registry, path, interval=DEFAULT_EXPORT_INTERVAL):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-exporter', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._write()
+
+    def _write(self):
+        try:
+            self.registry.write_snapshot(self.path)
+        except OSError as e:
+            logger.error("Error writing metrics to %s: %s", self.path, e)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._write()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+_default_registry = MetricsRegistry()
+
+
+def get_metrics():
+    """Return the metrics registry shared by all clients in this process"""
+    return _default_registry
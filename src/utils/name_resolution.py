@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Company name -> Xiniu ID resolution with a persistent name map
+
+Xiniu only matches a company's exact full name, and the input sheets write
+parentheses in several ways ("（）", "()", " () ") or add a parenthesized
+note. NameResolver looks up the name as given first; only when that misses are
+the other spellings (name_variants) looked up, concurrently, taking the first
+hit in priority order. A name found as given costs one lookup, and a miss costs
+two round trips instead of four.
+
+Every resolution is stored in a SQLite name map keyed on the normalized name.
+Found IDs are kept for POSITIVE_TTL and names that matched nothing for the
+shorter NEGATIVE_TTL, so later runs resolve known names without any request
+and retry unknown ones after a few days. Lookups that failed transiently are
+not stored.
+
+Usage:
+    python src/utils/name_resolution.py stats
+    python src/utils/name_resolution.py purge --negative
+    python src/utils/name_resolution.py purge --all
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+# Add the src directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.metrics import get_metrics
+from src.utils.resilience import RetryableError
+from src.utils.single_flight import normalize_company_name
+from src.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NAME_MAP_PATH = "data/cache/name_ids.sqlite3"
+
+DAY = 24 * 60 * 60
+
+# How long a found ID and a name without a match are remembered
+POSITIVE_TTL = 30 * DAY
+NEGATIVE_TTL = 3 * DAY
+
+# A parenthesized part of a name, in half- or full-width parentheses
+PARENTHESIZED = re.compile(r'\s*[(（][^()（）]*[)）]\s*')
+
+
+def name_variants(company_name):
+    """
+    List the spellings of a company name to look up, in priority order:
+    the name as given, its parentheses in the other width, spaces around
+    half-width parentheses, and the name without its parenthesized parts.
+
+    Returns:
+        list: Distinct candidate names; just the name itself when it has no parentheses
+    """
+    name = ' '.join(str(company_name).split())
+    variants = [name]
+    if PARENTHESIZED.search(name):
+        half_width = name.replace('（', '(').replace('）', ')')
+        variants.append(half_width)
+        variants.append(name.replace('(', '（').replace(')', '）'))
+        variants.append(' '.join(half_width.replace('(', ' (').replace(')', ') ').split()))
+        variants.append(' '.join(PARENTHESIZED.sub(' ', name).split()))
+    return [variant for i, variant in enumerate(variants) if variant and variant not in variants[:i]]
+
+
+class NameIdMap:
+    """
+    Persistent normalized name -> Xiniu ID map, including names without a match
+    """
+
+    def __init__(self, path=DEFAULT_NAME_MAP_PATH, positive_ttl=POSITIVE_TTL, negative_ttl=NEGATIVE_TTL):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode this only syncs at checkpoints; a lost entry is just looked up again
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS name_ids (
+                name_key TEXT PRIMARY KEY,
+                company_name TEXT NOT NULL,
+                company_id TEXT,
+                matched_name TEXT,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, company_name):
+        """
+        Look up a remembered resolution
+
+        Returns:
+            tuple: (found, company_id); found is False on a miss or an expired
+                entry, company_id is None for a name known to have no match
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT company_id, expires_at FROM name_ids WHERE name_key = ?",
+                (normalize_company_name(company_name),)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return False, None
+        return True, row[0]
+
+    def set(self, company_name, company_id, matched_name=None):
+        """
+        Remember the ID a name resolved to (None when nothing matched)
+
+        Args:
+            matched_name (str): The spelling that matched
+        """
+        now = time.time()
+        ttl = self.positive_ttl if company_id is not None else self.negative_ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO name_ids (name_key, company_name, company_id, matched_name, created_at, "
+                "expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_company_name(company_name), str(company_name), company_id, matched_name, now, now + ttl)
+            )
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Return entry counts
+
+        Returns:
+            dict: 'found', 'not_found' and 'expired' entry counts
+        """
+        with self._lock:
+            found, not_found, expired = self._conn.execute(
+                "SELECT SUM(CASE WHEN company_id IS NOT NULL THEN 1 ELSE 0 END), "
+                "SUM(CASE WHEN company_id IS NULL THEN 1 ELSE 0 END), "
+                "SUM(CASE WHEN expires_at < ? THEN 1 ELSE 0 END) FROM name_ids",
+                (time.time(),)
+            ).fetchone()
+        return {'found': found or 0, 'not_found': not_found or 0, 'expired': expired or 0}
+
+    def purge(self, negative_only=False):
+        """
+        Delete entries, optionally only the names without a match
+
+        Returns:
+            int: Number of deleted entries
+        """
+        query = "DELETE FROM name_ids"
+        if negative_only:
+            query += " WHERE company_id IS NULL"
+        with self._lock:
+            deleted = self._conn.execute(query).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class NameResolver:
+    """
+    Resolves company names to Xiniu IDs through the name map and concurrent variant lookups
+    """
+
+    def __init__(self, client, name_map=None, identities=None):
+        """
+        Args:
+            client: XiniuAsyncClient (anything with an async find_company_ids(name))
+            name_map (NameIdMap): Persistent map to read and update, if any
+            identities (CompanyIdentityIndex): Identity index to consult first and extend, if any
+        """
+        self.client = client
+        self.name_map = name_map
+        self.identities = identities
+
+    async def _lookup(self, variant, priority):
+        with span('resolve id', cat='xiniu', priority=priority, company_name=variant):
+            return await self.client.find_company_ids(variant)
+
+    async def _first_hit(self, variants, first_priority):
+        """
+        Look up spellings concurrently and take the first hit in priority order
+
+        Returns:
+            tuple: (company_id, matched_name, failed); failed is True if a lookup errored
+        Raises:
+            RetryableError: A lookup failed transiently
+        """
+        lookups = [asyncio.ensure_future(self._lookup(variant, priority))
+                   for priority, variant in enumerate(variants, start=first_priority)]
+        company_id = matched_name = None
+        failed = False
+        try:
+            # Take the first hit in priority order; lower-priority lookups keep running meanwhile
+            for variant, lookup in zip(variants, lookups):
+                try:
+                    company_ids = await lookup
+                except RetryableError:
+                    raise
+                except Exception as e:
+                    logger.warning("Error looking up %s: %s", variant, e)
+                    failed = True
+                    continue
+                if company_ids:
+                    company_id, matched_name = company_ids[0], variant
+                    break
+        finally:
+            for lookup in lookups:
+                if not lookup.done():
+                    lookup.cancel()
+                elif not lookup.cancelled():
+                    # Retrieve the errors of lookups that are no longer needed so they are not reported
+                    lookup.exception()
+
+        return company_id, matched_name, failed
+
+    async def resolve(self, company_name):
+        """
+        Resolve a company name to its Xiniu ID
+
+        Returns:
+            str: Company ID, or None if no spelling of the name matched
+        Raises:
+            RetryableError: A lookup that could have decided the result failed transiently
+        """
+        # The SQLite stores are read and written in a worker thread, off the event loop
+        if self.identities is not None:
+            identity = await asyncio.to_thread(self.identities.lookup, company_name)
+            get_metrics().record_cache('xiniu', 'identity index', bool(identity and identity.xiniu_id))
+            if identity and identity.xiniu_id:
+                return identity.xiniu_id
+
+        if self.name_map is not None:
+            found, company_id = await asyncio.to_thread(self.name_map.get, company_name)
+            get_metrics().record_cache('xiniu', 'name map', found)
+            if found:
+                return company_id
+
+        # Every lookup is billed, so the other spellings only go out when the exact name misses
+        variants = name_variants(company_name)
+        company_id, matched_name, failed = await self._first_hit(variants[:1], 0)
+        if company_id is None and len(variants) > 1:
+            company_id, matched_name, other_failed = await self._first_hit(variants[1:], 1)
+            failed = failed or other_failed
+
+        if matched_name is not None:
+            if matched_name != variants[0]:
+                logger.debug("Resolved %s as %s", company_name, matched_name)
+            if self.identities is not None:
+                await asyncio.to_thread(self.identities.record, company_name, xiniu_id=company_id,
+                                        aliases=[matched_name])
+        # A miss is only remembered when every spelling was actually looked up
+        if self.name_map is not None and (company_id is not None or not failed):
+            await asyncio.to_thread(self.name_map.set, company_name, company_id, matched_name)
+        return company_id
+
+
+_default_name_map = None
+_default_name_map_lock = threading.Lock()
+
+
+def get_name_map():
+    """
+    Return the shared name map, or None if caching is disabled
+
+    The map lives at NAME_MAP_PATH (default data/cache/name_ids.sqlite3) and is
+    turned off together with the response cache by API_CACHE_DISABLED=1.
+    """
+    global _default_name_map
+    if os.getenv('API_CACHE_DISABLED', '').lower() in ('1', 'true', 'yes'):
+        return None
+    with _default_name_map_lock:
+        if _default_name_map is None:
+            _default_name_map = NameIdMap(os.getenv('NAME_MAP_PATH', DEFAULT_NAME_MAP_PATH))
+        return _default_name_map
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and purge the company name -> Xiniu ID map")
+    parser.add_argument('--path', default=os.getenv('NAME_MAP_PATH', DEFAULT_NAME_MAP_PATH),
+                        help="Name map database file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help="Show entry counts")
+    purge_parser = subparsers.add_parser('purge', help="Delete entries")
+    purge_parser.add_argument('--negative', action='store_true', help="Only delete names without a match")
+    purge_parser.add_argument('--all', action='store_true', help="Delete every entry")
+    args = parser.parse_args()
+
+    name_map = NameIdMap(args.path)
+    if args.command == 'stats':
+        stats = name_map.stats()
+        print(f"Name map file: {args.path}")
+        print(f"Found: {stats['found']}  Not found: {stats['not_found']}  Expired: {stats['expired']}")
+    elif args.command == 'purge':
+        if not (args.negative or args.all):
+            parser.error("purge needs --negative or --all")
+        print(f"Deleted {name_map.purge(negative_only=args.negative)} entries")
+    name_map.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Pluggable output sinks for the enrichment pipeline
+
+Rows finish out of order because up to ROW_CONCURRENCY companies of a sheet
+are in flight at once. A ReorderBuffer holds the finished rows until every
+earlier row of the sheet's range is done and then releases them in sheet
+order, so streaming sinks can append them straight to disk:
+
+    CsvSink      one <base>_<sheet>.csv per sheet, appended and flushed per batch
+    JsonlSink    one <base>.jsonl for all sheets, one {"sheet", "row", "values"} line per row
+    ParquetSink  one <base>_<sheet>.parquet per sheet, one row group per batch (needs pyarrow)
+    ExcelSink    the formatted workbook, written once when the run finishes
+
+Streaming sinks only keep the current batch in memory, and whatever they have
+written is readable while the run is still going.
+"""
+
+import csv
+import json
+import math
+import os
+
+from src.utils.excel_writer import write_formatted_workbook
+
+# Names accepted by make_sink
+STREAMING_SINKS = ('csv', 'jsonl', 'parquet')
+
+
+def plain_value(value):
+    """
+    Convert a DataFrame cell to a plain Python value: NaN/None -> None, numpy scalars -> int/float/str
+    """
+    if value is None:
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class ReorderBuffer:
+    """
+    Release out-of-order rows in row order
+    """
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows (iterable): The row indexes that will be pushed, in output order
+        """
+        self._order = list(rows)
+        self._position = 0
+        self._waiting = {}
+
+    def push(self, row, item):
+        """
+        Add a finished row
+
+        Returns:
+            list: (row, item) pairs that are now ready, in order; empty if an earlier
+                row is still missing
+        """
+        self._waiting[row] = item
+        ready = []
+        while self._position < len(self._order) and self._order[self._position] in self._waiting:
+            next_row = self._order[self._position]
+            ready.append((next_row, self._waiting.pop(next_row)))
+            self._position += 1
+        return ready
+
+    def __len__(self):
+        """Number of rows held back waiting for an earlier row"""
+        return len(self._waiting)
+
+
+class OutputSink:
+    """
+    Base class for output sinks; every method is a no-op by default
+    """
+
+    def start_sheet(self, sheet_name, columns):
+        """Called once per sheet before its first rows, with the output column order"""
+
+    def write_rows(self, sheet_name, rows):
+        """
+        Write a batch of finished rows
+
+        Args:
+            sheet_name (str): Sheet the rows belong to
+            rows (list): (row index, {column: value}) pairs in sheet order
+        """
+
+    def finish_sheet(self, sheet_name, df):
+        """Called with the complete output DataFrame of a sheet once it is done"""
+
+    def close(self):
+        """Flush and close the sink"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class SinkGroup(OutputSink):
+    """
+    Forward every call to several sinks
+    """
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+
+    def start_sheet(self, sheet_name, columns):
+        for sink in self.sinks:
+            sink.start_sheet(sheet_name, columns)
+
+    def write_rows(self, sheet_name, rows):
+        for sink in self.sinks:
+            sink.write_rows(sheet_name, rows)
+
+    def finish_sheet(self, sheet_name, df):
+        for sink in self.sinks:
+            sink.finish_sheet(sheet_name, df)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def _sheet_file(base_path, sheet_name, extension):
+    safe_name = "".join('_' if c in '/\\:*?"<>|' else c for c in str(sheet_name))
+    return f"{base_path}_{safe_name}.{extension}"
+
+
+class CsvSink(OutputSink):
+    """
+    Stream each sheet to its own CSV file (UTF-8 with BOM so Excel opens it correctly)
+    """
+
+    def __init__(self, base_path):
+        """
+        Args:
+            base_path (str): Output path without extension; files are <base_path>_<sheet>.csv
+        """
+        self.base_path = base_path
+        self._files = {}
+        self._columns = {}
+
+    def start_sheet(self, sheet_name, columns):
+        path = _sheet_file(self.base_path, sheet_name, 'csv')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        f = open(path, 'w', encoding='utf-8-sig', newline='')
+        csv.writer(f).writerow(columns)
+        f.flush()
+        self._files[sheet_name] = f
+        self._columns[sheet_name] = list(columns)
+
+    def write_rows(self, sheet_name, rows):
+        f = self._files[sheet_name]
+        writer = csv.writer(f)
+        columns = self._columns[sheet_name]
+        for _, values in rows:
+            cells = [plain_value(values.get(col)) for col in columns]
+            writer.writerow(['' if cell is None else cell for cell in cells])
+        f.flush()
+
+    def finish_sheet(self, sheet_name, df):
+        f = self._files.pop(sheet_name, None)
+        if f is not None:
+            f.close()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+
+class JsonlSink(OutputSink):
+    """
+    Stream the rows of all sheets to one JSONL file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write_rows(self, sheet_name, rows):
+        for row, values in rows:
+            record = {'sheet': sheet_name, 'row': row,
+                      'values': {col: plain_value(value) for col, value in values.items()}}
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class ParquetSink(OutputSink):
+    """
+    Stream each sheet to its own Parquet file, one row group per batch
+
+    All columns are stored as nullable strings so every row group of a sheet
+    shares one schema whatever the cell types of the batch are.
+    """
+
+    def __init__(self, base_path):
+        """
+        Args:
+            base_path (str): Output path without extension; files are <base_path>_<sheet>.parquet
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("The parquet sink needs pyarrow: pip install pyarrow")
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.base_path = base_path
+        self._writers = {}
+        self._columns = {}
+
+    def start_sheet(self, sheet_name, columns):
+        path = _sheet_file(self.base_path, sheet_name, 'parquet')
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        schema = self._pa.schema([(str(col), self._pa.string()) for col in columns])
+        self._writers[sheet_name] = self._pq.ParquetWriter(path, schema)
+        self._columns[sheet_name] = list(columns)
+
+    def write_rows(self, sheet_name, rows):
+        if not rows:
+            return
+        writer = self._writers[sheet_name]
+        arrays = {}
+        for col in self._columns[sheet_name]:
+            column_values = [plain_value(values.get(col)) for _, values in rows]
+            arrays[str(col)] = [None if value is None else str(value) for value in column_values]
+        writer.write_table(self._pa.table(arrays, schema=writer.schema))
+
+    def finish_sheet(self, sheet_name, df):
+        writer = self._writers.pop(sheet_name, None)
+        if writer is not None:
+            writer.close()
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+
+class ExcelSink(OutputSink):
+    """
+    Write the formatted workbook with every sheet once the run is finished
+    """
+
+    def __init__(self, output_file):
+        """
+        Args:
+            output_file (str): Path of the .xlsx file; sheets appear in the order they are finished
+        """
+        self.output_file = output_file
+        self._sheets = []
+
+    def finish_sheet(self, sheet_name, df):
+        self._sheets.append((sheet_name, df))
+
+    def close(self):
+        if self._sheets:
+            write_formatted_workbook(self.output_file, self._sheets)
+            self._sheets = []
+
+
+def make_sink(kind, base_path):
+    """
+    Create a streaming sink by name
+
+    Args:
+        kind (str): One of STREAMING_SINKS
+        base_path (str): Output path without extension
+    Returns:
+        OutputSink: The sink
+    """
+    if kind == 'csv':
+        return CsvSink(base_path)
+    if kind == 'jsonl':
+        return JsonlSink(base_path + '.jsonl')
+    if kind == 'parquet':
+        return ParquetSink(base_path)
+    raise ValueError(f"Unknown output sink: {kind}")
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Columnar Parquet store of the enriched companies
+
+Every run also writes its journaled rows to a Parquet dataset partitioned by
+input file and sheet:
+
+    data/output/parquet/input_file=<input name>/sheet=<sheet>/part-0.parquet
+
+Each row holds the enriched output columns as written to the formatted
+workbook (the yes/no flags dictionary-encoded, so they load as categoricals),
+plus typed columns rebuilt from the raw API payload that the workbook only has
+as text:
+
+    establish_date  date
+    funding_rounds  list of {date, round, amount (float), currency, investors (list of str)}
+    industry_tags   list of str
+    payload_json    the raw payload, as JSON
+
+A partition is replaced as a whole on every write, so re-running or
+re-deriving a sheet does not duplicate its rows. Needs pyarrow.
+"""
+
+import json
+import os
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from src.utils.funding_analytics import parse_amount
+from src.utils.output_sinks import plain_value
+from src.utils.peer_fund_matcher import split_investors
+
+# Enriched columns stored as strings, in workbook order
+ENRICHED_COLUMNS = ['成立时间', '是否上市', '母公司', '母公司是否上市', '融资历史', 'Peer Fund',
+                    '某一年融资超2次', '单轮3家以上fund', '2家以上Peer Fund', '已在Deal List',
+                    '行业属性', '赛道名称', '产品/公司介绍', '创始人信息', '是否是股份公司', '股改时间']
+
+# Low-cardinality columns (是/不是/NULL, listing status) stored dictionary-encoded
+DICTIONARY_COLUMNS = {'是否上市', '母公司是否上市', '某一年融资超2次', '单轮3家以上fund',
+                      '2家以上Peer Fund', '已在Deal List', '是否是股份公司'}
+
+DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%Y.%m.%d', '%Y-%m', '%Y/%m', '%Y')
+
+
+def parquet_available():
+    """Return True if pyarrow is installed"""
+    return pa is not None
+
+
+def store_path_for(input_file):
+    """
+    Return the Parquet store directory used for an input workbook (data/output/parquet)
+    """
+    return os.path.join(os.path.dirname(os.path.dirname(input_file)), 'output', 'parquet')
+
+
+def parse_date(text):
+    """
+    Parse the date formats seen in Xiniu data ("2001-01-01", "2020/01/01", "2020/01")
+
+    Returns:
+        datetime.date: The date, or None if the text is empty or not a date
+    """
+    if not isinstance(text, str) or not text.strip():
+        return None
+    text = text.strip().split()[0]
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _funding_rounds(funding_history):
+    if not isinstance(funding_history, list):
+        return None
+    rounds = []
+    for funding in funding_history:
+        amount, currency = parse_amount(funding.get('融资金额'))
+        rounds.append({
+            'date': parse_date(funding.get('融资时间')),
+            'round': funding.get('融资轮次') or None,
+            'amount': amount,
+            'currency': currency,
+            'investors': split_investors(funding.get('投资方', ''))
+        })
+    return rounds
+
+
+def _industry_tags(industry_info):
+    if not isinstance(industry_info, dict):
+        return None
+    details = industry_info.get('详细行业信息')
+    if not isinstance(details, dict):
+        return None
+    return [tag.get('标签名') for tag in details.get('所有行业标签', []) if tag.get('标签名')]
+
+
+def _schema():
+    funding_round = pa.struct([
+        ('date', pa.date32()),
+        ('round', pa.string()),
+        ('amount', pa.float64()),
+        ('currency', pa.string()),
+        ('investors', pa.list_(pa.string()))
+    ])
+    fields = [('row', pa.int64()), ('company_name', pa.string())]
+    for col in ENRICHED_COLUMNS:
+        if col in DICTIONARY_COLUMNS:
+            fields.append((col, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append((col, pa.string()))
+    fields += [
+        ('establish_date', pa.date32()),
+        ('funding_rounds', pa.list_(funding_round)),
+        ('industry_tags', pa.list_(pa.string())),
+        ('payload_json', pa.string())
+    ]
+    return pa.schema(fields)
+
+
+def company_table(df, records):
+    """
+    Build the Arrow table for the journaled rows of one sheet
+
+    Args:
+        df (pd.DataFrame): Finished output sheet
+        records (dict): {row: journal row record} of the sheet
+    Returns:
+        pyarrow.Table: One row per journaled row, in row order
+    """
+    if pa is None:
+        raise ImportError("The Parquet store needs pyarrow: pip install pyarrow")
+    rows = sorted(records)
+    columns = {name: [] for name in _schema().names}
+    # The enriched values are taken column by column; empty cells are stored as nulls
+    enriched = df.reindex(index=rows, columns=ENRICHED_COLUMNS)
+    for col in ENRICHED_COLUMNS:
+        values = map(plain_value, enriched[col].tolist())
+        columns[col] = [None if value is None or value == '' else str(value) for value in values]
+    for idx in rows:
+        record = records[idx]
+        payload = record.get('payload') or {}
+        company_info = payload.get('company_info') if isinstance(payload.get('company_info'), dict) else {}
+        columns['row'].append(idx)
+        columns['company_name'].append(record.get('company_name'))
+        columns['establish_date'].append(parse_date(company_info.get('成立时间')))
+        columns['funding_rounds'].append(_funding_rounds(company_info.get('融资历史')))
+        columns['industry_tags'].append(_industry_tags(company_info.get('行业属性')))
+        columns['payload_json'].append(json.dumps(payload, ensure_ascii=False, default=str) if payload else None)
+    return pa.table(columns, schema=_schema())
+
+
+def _partition_value(value):
+    # Hive partition values are URI-decoded on read; escape only what breaks the path
+    return str(value).replace('%', '%25').replace('/', '%2F').replace('=', '%3D')
+
+
+def write_partition(store_dir, input_name, sheet_name, table):
+    """
+    Replace the partition of one sheet with table
+
+    Returns:
+        str: Path of the written file
+    """
+    partition_dir = os.path.join(store_dir, f"input_file={_partition_value(input_name)}",
+                                 f"sheet={_partition_value(sheet_name)}")
+    os.makedirs(partition_dir, exist_ok=True)
+    path = os.path.join(partition_dir, 'part-0.parquet')
+    # Write next to the target and swap it in, so readers never see a half-written file
+    # (dot-prefixed files are ignored when the dataset is read)
+    temp_path = os.path.join(partition_dir, '.part-0.parquet.tmp')
+    pq.write_table(table, temp_path)
+    os.replace(temp_path, path)
+    return path
+
+
+def write_company_store(store_dir, input_file, results, journal):
+    """
+    Write the journaled rows of every finished sheet to the store
+
+    Args:
+        store_dir (str): Root directory of the dataset
+        input_file (str): Input workbook; its base name is the input_file partition
+        results (list): (sheet_name, df) pairs of finished output sheets
+        journal (dict): Run journal, see read_journal
+    Returns:
+        int: Number of rows written
+    """
+    input_name = os.path.splitext(os.path.basename(input_file))[0]
+    written = 0
+    for sheet_name, df in results:
+        records = journal['rows'].get(sheet_name)
+        if not records:
+            continue
+        table = company_table(df, records)
+        write_partition(store_dir, input_name, sheet_name, table)
+        written += table.num_rows
+    return written
+
+
+def load_company_store(store_dir, columns=None, filters=None):
+    """
+    Load the store (or part of it) into a DataFrame
+
+    Args:
+        store_dir (str): Root directory of the dataset
+        columns (list): Columns to read, all by default
+        filters (list): pyarrow filters, e.g. [('sheet', '=', '第一批'), ('2家以上Peer Fund', '=', '是')]
+    Returns:
+        pd.DataFrame: One row per company, with input_file and sheet partition columns
+    """
+    if pq is None:
+        raise ImportError("The Parquet store needs pyarrow: pip install pyarrow")
+    return pq.read_table(store_dir, columns=columns, filters=filters, partitioning='hive').to_pandas()
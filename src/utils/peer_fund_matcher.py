@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Matching of funding-round investors against the peer fund list
+
+Xiniu returns the investors of a round as one string ("红杉资本，高瓴 、IDG Capital").
+The matcher splits it on "，", "," and "、", normalizes each
+name (full-width/half-width, whitespace, case and common fund suffixes such as
+(有限合伙)/资本/投资) and looks it up in a hash index built once from
+pf_companies.json plus an optional alias table, so "红杉资本" and
+"红杉投资（有限合伙）" both resolve to the same tracked fund.
+"""
+
+import json
+import logging
+import os
+import re
+import unicodedata
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Separators between investors in the 投资方 field, with the whitespace around them.
+# Other punctuation ("/", ";") can be part of a name and does not split.
+INVESTOR_SEPARATORS = re.compile(r'\s*[，,、]+\s*')
+
+# Suffixes dropped from the end of a normalized name, longest first
+FUND_SUFFIXES = sorted([
+    '(有限合伙)', '有限合伙', '股份有限公司', '有限责任公司', '有限公司', '集团',
+    '管理', '资本', '投资', '创投', '创业投资', '股权投资', '基金', '资产',
+    'capital', 'ventures', 'venture', 'partners', 'investment', 'investments', 'fund',
+], key=len, reverse=True)
+
+# A normalized name is never cut below this many characters
+MIN_NAME_LENGTH = 2
+
+PeerFundMatch = namedtuple('PeerFundMatch', ['investor', 'fund', 'alias'])
+
+
+def normalize_investor_name(name):
+    """
+    Normalize an investor or fund name for matching
+
+    Example: "红杉资本中国 (有限合伙)" -> "红杉资本中国", "IDG Capital" -> "idg"
+    """
+    name = unicodedata.normalize('NFKC', str(name))
+    name = re.sub(r'\s+', '', name).lower()
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in FUND_SUFFIXES:
+            if name.endswith(suffix) and len(name) - len(suffix) >= MIN_NAME_LENGTH:
+                name = name[:-len(suffix)]
+                stripped = True
+                break
+    return name
+
+
+def split_investors(investors):
+    """
+    Split a 投资方 string into individual investor names, dropping empty entries
+    """
+    if not investors or not isinstance(investors, str):
+        return []
+    return [investor for investor in INVESTOR_SEPARATORS.split(investors.strip()) if investor]
+
+
+def load_peer_fund_aliases(file_path="data/input/pf_aliases.json"):
+    """
+    Load the alias table for peer funds
+
+    The file maps a fund name from pf_companies.json to the other names it
+    appears under: {"红杉资本中国基金": ["红杉中国", "HongShan", "Sequoia China"]}.
+    A missing file means no aliases.
+
+    Returns:
+        dict: {fund name: [alias, ...]}
+    """
+    if not os.path.exists(file_path):
+        return {}
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            aliases = json.load(f)
+        logger.info("Loaded aliases for %d peer funds", len(aliases))
+        return aliases
+    except Exception as e:
+        logger.error("Error loading peer fund aliases: %s", e)
+        return {}
+
+
+class PeerFundMatcher:
+    """
+    Hash index of normalized peer fund names and aliases
+    """
+
+    def __init__(self, peer_funds, aliases=None):
+        """
+        Args:
+            peer_funds (iterable): Fund names from pf_companies.json
+            aliases (dict): {fund name: [alias, ...]}, see load_peer_fund_aliases
+        """
+        self.peer_funds = set(peer_funds)
+        self._index = {}
+        # Fund names win over aliases when both normalize to the same key
+        for fund in sorted(self.peer_funds):
+            self._index.setdefault(normalize_investor_name(fund), (fund, fund))
+        for fund, fund_aliases in (aliases or {}).items():
+            for alias in fund_aliases:
+                self._index.setdefault(normalize_investor_name(alias), (fund, alias))
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.peer_funds)
+
+    def match(self, investor):
+        """
+        Look up one investor name
+
+        Returns:
+            PeerFundMatch: (investor, fund, alias) where alias is the fund name or alias
+                that matched, or None if the investor is not a peer fund
+        """
+        if investor not in self._cache:
+            hit = self._index.get(normalize_investor_name(investor))
+            self._cache[investor] = PeerFundMatch(investor, *hit) if hit else None
+        return self._cache[investor]
+
+    def match_round(self, funding):
+        """
+        Split the investors of one funding record and match them
+
+        Returns:
+            tuple: (investors, matches) with matches a list of PeerFundMatch
+        """
+        investors = split_investors(funding.get('投资方', ''))
+        matches = [match for match in map(self.match, investors) if match is not None]
+        return investors, matches
+
+    def summarize(self, funding_history):
+        """
+        Match every funding record once and collect what the peer fund columns need
+
+        Returns:
+            dict: 'funds' (sorted matched fund names), 'matches' (all PeerFundMatch)
+                and 'max_round_investors' (largest investor count in one round)
+        """
+        funds = set()
+        all_matches = []
+        max_round_investors = 0
+        for funding in funding_history or []:
+            investors, matches = self.match_round(funding)
+            max_round_investors = max(max_round_investors, len(investors))
+            all_matches.extend(matches)
+            funds.update(match.fund for match in matches)
+        return {
+            'funds': sorted(funds),
+            'matches': all_matches,
+            'max_round_investors': max_round_investors
+        }
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Token-bucket rate limiting shared by the Xiniu, Metaso and Qichacha clients
+
+Every provider has its own bucket (requests per second plus burst size), and
+individual endpoints can get an extra bucket of their own. Both sync and async
+callers draw from the same buckets, so mixing the two modes stays within quota.
+When a provider answers 429, the affected buckets are paused for the
+Retry-After period before any further request is let through.
+
+Limits can be overridden with environment variables:
+    XINIU_RPS, XINIU_BURST, METASO_RPS, METASO_BURST, QICHACHA_RPS, QICHACHA_BURST
+    RATE_LIMIT_ENDPOINTS='{"xiniu:company/get_2": {"rate": 5, "burst": 5}}'
+"""
+
+import asyncio
+import email.utils
+import json
+import logging
+import os
+import threading
+import time
+
+from src.utils.metrics import get_metrics
+from src.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Requests per second and burst size per provider
+PROVIDER_LIMITS = {
+    'xiniu': {'rate': 10.0, 'burst': 10},
+    'metaso': {'rate': 2.0, 'burst': 4},
+    'qichacha': {'rate': 5.0, 'burst': 5},
+}
+
+# Extra per-endpoint limits, keyed by (provider, endpoint)
+ENDPOINT_LIMITS = {}
+
+# How many times a request is re-sent after a 429 before giving up
+MAX_THROTTLE_RETRIES = 3
+
+# Pause used when a 429 response carries no usable Retry-After header
+DEFAULT_RETRY_AFTER = 5.0
+
+
+def parse_retry_after(value, default=DEFAULT_RETRY_AFTER):
+    """
+    Parse a Retry-After header (delay in seconds or an HTTP date) into seconds
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Callers reserve a token and get back how long they
+    must wait before using it, so sync and async callers can share one bucket.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take one token, going into debt if none is available
+
+        Returns:
+            float: Seconds to wait before sending the request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def pause(self, seconds):
+        """Let no request through for the given number of seconds"""
+        with self._lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = now
+
+
+class RateLimiter:
+    """
+    Registry of token buckets per provider and per endpoint
+    """
+
+    def __init__(self, provider_limits=None, endpoint_limits=None):
+        self.provider_limits = dict(PROVIDER_LIMITS if provider_limits is None else provider_limits)
+        self.endpoint_limits = dict(ENDPOINT_LIMITS if endpoint_limits is None else endpoint_limits)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key, limits):
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(limits['rate'], limits['burst'])
+            return self._buckets[key]
+
+    def _buckets_for(self, provider, endpoint=None):
+        buckets = []
+        if provider in self.provider_limits:
+            buckets.append(self._bucket((provider, None), self.provider_limits[provider]))
+        if endpoint is not None and (provider, endpoint) in self.endpoint_limits:
+            buckets.append(self._bucket((provider, endpoint), self.endpoint_limits[(provider, endpoint)]))
+        return buckets
+
+    def _reserve(self, provider, endpoint):
+        return max([bucket.reserve() for bucket in self._buckets_for(provider, endpoint)], default=0.0)
+
+    def acquire(self, provider, endpoint=None):
+        """Block until a request to provider/endpoint may be sent"""
+        wait = self._reserve(provider, endpoint)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, provider, endpoint=None):
+        """Wait (without blocking the event loop) until a request may be sent"""
+        wait = self._reserve(provider, endpoint)
+        if wait > 0:
+            with span('rate limit wait', cat=provider, endpoint=endpoint):
+                await asyncio.sleep(wait)
+
+    def throttled(self, provider, endpoint=None, retry_after=None):
+        """
+        Record a 429 response: pause the provider (and endpoint) buckets
+
+        Args:
+            retry_after (str): Retry-After header value, if any
+        Returns:
+            float: Seconds the buckets are paused for
+        """
+        seconds = parse_retry_after(retry_after)
+        get_metrics().record_throttle(provider, endpoint)
+        logger.warning("Rate limited by %s %s, pausing for %.1f seconds", provider, endpoint or '', seconds)
+        for bucket in self._buckets_for(provider, endpoint):
+            bucket.pause(seconds)
+        return seconds
+
+
+def load_limits_from_env():
+    """
+    Build provider and endpoint limits from the defaults plus environment overrides
+    """
+    provider_limits = {provider: dict(limits) for provider, limits in PROVIDER_LIMITS.items()}
+    for provider, limits in provider_limits.items():
+        rate = os.getenv(f'{provider.upper()}_RPS')
+        burst = os.getenv(f'{provider.upper()}_BURST')
+        if rate:
+            limits['rate'] = float(rate)
+        if burst:
+            limits['burst'] = int(burst)
+
+    endpoint_limits = dict(ENDPOINT_LIMITS)
+    overrides = os.getenv('RATE_LIMIT_ENDPOINTS')
+    if overrides:
+        for key, limits in json.loads(overrides).items():
+            provider, endpoint = key.split(':', 1)
+            endpoint_limits[(provider, endpoint)] = limits
+
+    return provider_limits, endpoint_limits
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Return the rate limiter shared by all clients in this process"""
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter(*load_limits_from_env())
+        return _default_limiter
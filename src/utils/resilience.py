@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Retries with jittered exponential backoff and per-endpoint circuit breakers
+
+Idempotent API calls are wrapped with call_with_retry / call_with_retry_async.
+Transient failures (connection errors, timeouts, 5xx responses and 429s that
+outlasted the clients' throttle retries) are retried a bounded number of times. Each (provider, endpoint) pair has a circuit breaker:
+after repeated transient failures it opens and further calls fail fast until
+a cool-down has passed, so a provider outage costs one error per row instead
+of one timeout per row.
+
+When retries are exhausted or the breaker is open a RetryableError is raised,
+and the pipeline writes RETRY_MARKER into the affected output fields instead
+of "NULL", so those rows are picked up again by a --resume run.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+
+import aiohttp
+import requests
+
+from src.utils.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Value written to output fields whose lookup failed transiently
+RETRY_MARKER = "RETRY"
+
+# HTTP status codes worth retrying; a 429 only gets here once the clients' own
+# MAX_THROTTLE_RETRIES are used up
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    """A call failed transiently and can be retried in a later run"""
+
+
+class CircuitOpenError(RetryableError):
+    """The circuit breaker for an endpoint is open, the call was not attempted"""
+
+
+class RetryPolicy:
+    """
+    Bounded retries with full-jitter exponential backoff
+    """
+
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=8.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt):
+        """Seconds to wait after the given (0-based) failed attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive transient failures. Once
+    reset_timeout seconds have passed, one trial call is let through
+    (half-open); its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may be attempted now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release(self):
+        """End a call that says nothing about the endpoint's health (a non-transient error)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Circuit breaker for %s opened after %d failures", self.name, self.failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(provider, endpoint):
+    """Return the circuit breaker shared by all calls to provider/endpoint"""
+    key = (provider, endpoint)
+    with _breakers_lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(f"{provider} {endpoint}")
+        return _breakers[key]
+
+
+def is_transient(exc):
+    """
+    Return True if an exception from aiohttp or requests is worth retrying
+    """
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status in RETRYABLE_STATUS
+    if isinstance(exc, requests.exceptions.HTTPError):
+        return exc.response is not None and exc.response.status_code in RETRYABLE_STATUS
+    return isinstance(exc, (
+        asyncio.TimeoutError,
+        aiohttp.ClientConnectionError,
+        aiohttp.ClientPayloadError,
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+    ))
+
+
+async def call_with_retry_async(func, provider, endpoint, policy=DEFAULT_RETRY_POLICY):
+    """
+    Await func() with retries and the endpoint's circuit breaker
+
+    Args:
+        func (callable): Zero-argument function returning the coroutine to run
+        provider (str): Provider name, e.g. 'xiniu'
+        endpoint (str): Endpoint name, e.g. 'company/get_2'
+    Returns:
+        The result of func()
+    Raises:
+        RetryableError: Retries were exhausted or the breaker is open
+        Exception: Non-transient errors are raised unchanged on the first attempt
+    """
+    breaker = get_circuit_breaker(provider, endpoint)
+    for attempt in range(policy.max_attempts):
+        if not breaker.allow():
+            get_metrics().record_circuit_open(provider, endpoint)
+            raise CircuitOpenError(f"Circuit open for {provider} {endpoint}")
+        try:
+            result = await func()
+        except Exception as e:
+            if not is_transient(e):
+                breaker.release()
+                raise
+            breaker.record_failure()
+            if attempt + 1 >= policy.max_attempts:
+                raise RetryableError(f"{provider} {endpoint} failed after {policy.max_attempts} attempts: {e}") from e
+            delay = policy.delay(attempt)
+            logger.warning("Transient error from %s %s (%s), retrying in %.1f seconds", provider, endpoint, e, delay)
+            get_metrics().record_retry(provider, endpoint)
+            await asyncio.sleep(delay)
+        except BaseException:
+            # A cancelled or interrupted call must still free a half-open trial slot
+            breaker.release()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+
+def call_with_retry(func, provider, endpoint, policy=DEFAULT_RETRY_POLICY):
+    """
+    Blocking version of call_with_retry_async for requests-based clients
+    """
+    breaker = get_circuit_breaker(provider, endpoint)
+    for attempt in range(policy.max_attempts):
+        if not breaker.allow():
+            get_metrics().record_circuit_open(provider, endpoint)
+            raise CircuitOpenError(f"Circuit open for {provider} {endpoint}")
+        try:
+            result = func()
+        except Exception as e:
+            if not is_transient(e):
+                breaker.release()
+                raise
+            breaker.record_failure()
+            if attempt + 1 >= policy.max_attempts:
+                raise RetryableError(f"{provider} {endpoint} failed after {policy.max_attempts} attempts: {e}") from e
+            delay = policy.delay(attempt)
+            logger.warning("Transient error from %s %s (%s), retrying in %.1f seconds", provider, endpoint, e, delay)
+            get_metrics().record_retry(provider, endpoint)
+            time.sleep(delay)
+        except BaseException:
+            # A cancelled or interrupted call must still free a half-open trial slot
+            breaker.release()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+
+def has_retry_marker(value):
+    """
+    Return True if RETRY_MARKER appears anywhere in a (nested) result
+    """
+    if isinstance(value, str):
+        return value == RETRY_MARKER
+    if isinstance(value, dict):
+        return any(has_retry_marker(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(has_retry_marker(v) for v in value)
+    return False
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SQLite-backed cache for raw API responses (Xiniu, Metaso, Qichacha)
+
+Entries are keyed by endpoint plus the canonical JSON of the request payload
+(signatures, timestamps and tokens are never part of the key), and expire
+after a per-endpoint TTL.
+
+Usage:
+    python src/utils/response_cache.py stats
+    python src/utils/response_cache.py list --endpoint company/get_2 --limit 20
+    python src/utils/response_cache.py purge --expired
+    python src/utils/response_cache.py purge --endpoint company/funding/list_all_2
+    python src/utils/response_cache.py purge --all
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = "data/cache/api_cache.sqlite3"
+
+DAY = 24 * 60 * 60
+
+# Time-to-live in seconds for each endpoint
+ENDPOINT_TTLS = {
+    # Xiniu
+    'company/id/list_by_fullname': 30 * DAY,
+    'company/get_2': 30 * DAY,
+    'company/funding/list_all_2': 3 * DAY,
+    'company/tag/list_primary_tag': 14 * DAY,
+    'company/tag/list_ordered': 14 * DAY,
+    'company/list_member': 14 * DAY,
+    'company/industry/list': 14 * DAY,
+    # Metaso
+    'metaso/search': 30 * DAY,
+    # Qichacha
+    'qichacha/ECIChange/GetList': 7 * DAY,
+}
+DEFAULT_TTL = 7 * DAY
+
+
+def make_cache_key(endpoint, payload):
+    """
+    Build the cache key for an endpoint and request payload
+
+    Args:
+        endpoint (str): Endpoint name, e.g. 'company/get_2'
+        payload (dict): Request payload, without signature or timestamp
+    Returns:
+        str: Hex digest identifying the request
+    """
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(f"{endpoint}\n{canonical}".encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent response cache stored in a single SQLite file
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, default_ttl=DEFAULT_TTL):
+        self.path = path
+        self.ttls = dict(ENDPOINT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode this only syncs at checkpoints; a lost cache write is just a cache miss
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_endpoint ON responses (endpoint)")
+        self._conn.commit()
+
+    def ttl_for(self, endpoint):
+        """Return the TTL in seconds for an endpoint"""
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint, payload):
+        """
+        Look up a cached response
+
+        Returns:
+            The decoded response, or None on a miss or an expired entry
+        """
+        key = make_cache_key(endpoint, payload)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, endpoint, payload, response, ttl=None):
+        """
+        Store a response for an endpoint and payload
+        """
+        now = time.time()
+        ttl = self.ttl_for(endpoint) if ttl is None else ttl
+        key = make_cache_key(endpoint, payload)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, payload, response, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    endpoint,
+                    json.dumps(payload, ensure_ascii=False, sort_keys=True),
+                    json.dumps(response, ensure_ascii=False),
+                    now,
+                    now + ttl,
+                )
+            )
+            self._conn.commit()
+
+    def stats(self):
+        """
+        Return per-endpoint entry counts
+
+        Returns:
+            list: (endpoint, total entries, expired entries) tuples
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT endpoint, COUNT(*), SUM(CASE WHEN expires_at < ? THEN 1 ELSE 0 END) "
+                "FROM responses GROUP BY endpoint ORDER BY endpoint",
+                (time.time(),)
+            ).fetchall()
+
+    def entries(self, endpoint=None, limit=50):
+        """
+        Return the most recent entries, optionally for one endpoint
+
+        Returns:
+            list: (endpoint, payload, created_at, expires_at) tuples
+        """
+        query = "SELECT endpoint, payload, created_at, expires_at FROM responses"
+        params = []
+        if endpoint:
+            query += " WHERE endpoint = ?"
+            params.append(endpoint)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def purge(self, endpoint=None, expired_only=False):
+        """
+        Delete entries, optionally only for one endpoint and/or only expired ones
+
+        Returns:
+            int: Number of deleted entries
+        """
+        conditions = []
+        params = []
+        if endpoint:
+            conditions.append("endpoint = ?")
+            params.append(endpoint)
+        if expired_only:
+            conditions.append("expires_at < ?")
+            params.append(time.time())
+        query = "DELETE FROM responses"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            deleted = self._conn.execute(query, params).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Return the shared response cache, or None if caching is disabled
+
+    The cache lives at API_CACHE_PATH (default data/cache/api_cache.sqlite3)
+    and is turned off by setting API_CACHE_DISABLED=1.
+    """
+    global _default_cache
+    if os.getenv('API_CACHE_DISABLED', '').lower() in ('1', 'true', 'yes'):
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(os.getenv('API_CACHE_PATH', DEFAULT_CACHE_PATH))
+        return _default_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and purge the API response cache")
+    parser.add_argument('--path', default=os.getenv('API_CACHE_PATH', DEFAULT_CACHE_PATH),
+                        help="Cache database file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('stats', help="Show entry counts per endpoint")
+
+    list_parser = subparsers.add_parser('list', help="List the most recent entries")
+    list_parser.add_argument('--endpoint', help="Only show entries for this endpoint")
+    list_parser.add_argument('--limit', type=int, default=50, help="Maximum number of entries to show")
+
+    purge_parser = subparsers.add_parser('purge', help="Delete entries")
+    purge_parser.add_argument('--endpoint', help="Only delete entries for this endpoint")
+    purge_parser.add_argument('--expired', action='store_true', help="Only delete expired entries")
+    purge_parser.add_argument('--all', action='store_true', help="Delete every entry")
+
+    args = parser.parse_args()
+    cache = ResponseCache(args.path)
+
+    if args.command == 'stats':
+        rows = cache.stats()
+        print(f"Cache file: {args.path}")
+        print(f"{'Endpoint':<35} {'Entries':>8} {'Expired':>8} {'TTL (days)':>11}")
+        for endpoint, total, expired in rows:
+            print(f"{endpoint:<35} {total:>8} {expired or 0:>8} {cache.ttl_for(endpoint) / DAY:>11.1f}")
+        print(f"Total entries: {sum(row[1] for row in rows)}")
+
+    elif args.command == 'list':
+        for endpoint, payload, created_at, expires_at in cache.entries(args.endpoint, args.limit):
+            created = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created_at))
+            expires = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(expires_at))
+            print(f"{created}  expires {expires}  {endpoint}  {payload}")
+
+    elif args.command == 'purge':
+        if not (args.endpoint or args.expired or args.all):
+            parser.error("purge needs --endpoint, --expired or --all")
+        deleted = cache.purge(endpoint=args.endpoint, expired_only=args.expired)
+        print(f"Deleted {deleted} entries")
+
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Append-only JSONL journal of per-row results for long sheet runs
+
+Every completed company is written as one line as soon as it finishes, so a
+crash or Ctrl-C only loses the rows that were still in flight. A resumed run
+reads the journal back, skips the rows recorded as "ok" and rebuilds the
+output from the journaled values.
+
+Line types:
+    {"type": "sheet", "sheet": ..., "start_row": ..., "end_row": ..., "company_name_column": ...}
+    {"type": "row", "sheet": ..., "row": ..., "company_name": ..., "status": "ok" | "failed" | "retry",
+     "values": {...}, "payload": {...}, "ts": ...}
+    {"type": "values", "sheet": ..., "row": ..., "values": {...}, "ts": ...}
+
+A "values" line completes the values of a row recorded earlier: the columns
+derived for a whole batch of rows (Peer Fund and the funding flags) are only
+known once the batch is released.
+"""
+
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def journal_path_for(input_file, output_dir=None):
+    """
+    Return the journal file used for an input workbook
+
+    Args:
+        input_file (str): Path of the input Excel file
+        output_dir (str): Directory for the journal, defaults to data/output next to data/input
+    Returns:
+        str: Path of the journal file
+    """
+    if output_dir is None:
+        output_dir = os.path.join(os.path.dirname(os.path.dirname(input_file)), 'output')
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(output_dir, f"{base_name}_journal.jsonl")
+
+
+class RunJournal:
+    """
+    Writer for the per-row journal. Each record is flushed immediately.
+    """
+
+    def __init__(self, path, resume=False):
+        """
+        Args:
+            path (str): Journal file path
+            resume (bool): Append to an existing journal instead of starting a new one.
+                When starting fresh, a previous journal is kept as <path>.prev
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if not resume and os.path.exists(path):
+            os.replace(path, path + '.prev')
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def start_sheet(self, sheet_name, start_row, end_row, company_name_column):
+        """Record the row range processed for a sheet"""
+        self._write({
+            'type': 'sheet',
+            'sheet': sheet_name,
+            'start_row': start_row,
+            'end_row': end_row,
+            'company_name_column': company_name_column,
+            'ts': time.time()
+        })
+
+    def record_row(self, sheet_name, row, company_name, status, values, payload=None):
+        """
+        Record the result of one company
+
+        Args:
+            sheet_name (str): Sheet the row belongs to
+            row (int): 0-based DataFrame index of the row
+            company_name (str): Company name from the input sheet
+            status (str): "ok", "failed", or "retry" when some values are RETRY_MARKER
+            values (dict): Output column values written for the row
+            payload (dict): Raw API results the values were derived from
+        """
+        self._write({
+            'type': 'row',
+            'sheet': sheet_name,
+            'row': int(row),
+            'company_name': company_name,
+            'status': status,
+            'values': values,
+            'payload': payload,
+            'ts': time.time()
+        })
+
+    def update_values(self, sheet_name, rows):
+        """
+        Record the final output values of rows recorded earlier
+
+        Args:
+            sheet_name (str): Sheet the rows belong to
+            rows (dict): {row: {column: value}}; merged into the rows' journaled values
+        """
+        now = time.time()
+        for row, values in rows.items():
+            self._file.write(json.dumps({
+                'type': 'values',
+                'sheet': sheet_name,
+                'row': int(row),
+                'values': values,
+                'ts': now
+            }, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_journal(path):
+    """
+    Read a journal back into memory. Later records for the same row win, "values"
+    records are merged into the row's values, and a truncated last line (from a
+    crash mid-write) is ignored.
+
+    Returns:
+        dict: {'sheets': {sheet: sheet record}, 'rows': {sheet: {row: row record}}}
+    """
+    journal = {'sheets': {}, 'rows': {}}
+    if not os.path.exists(path):
+        return journal
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping unreadable journal line in %s", path)
+                continue
+
+            if record.get('type') == 'sheet':
+                journal['sheets'][record['sheet']] = record
+            elif record.get('type') == 'row':
+                journal['rows'].setdefault(record['sheet'], {})[record['row']] = record
+            elif record.get('type') == 'values':
+                row_record = journal['rows'].get(record['sheet'], {}).get(record['row'])
+                if row_record is not None:
+                    row_record['values'].update(record['values'])
+
+    return journal
+
+
+def completed_rows(journal, sheet_name):
+    """
+    Return the journaled rows of a sheet that finished successfully
+
+    Returns:
+        dict: {row: row record}
+    """
+    rows = journal['rows'].get(sheet_name, {})
+    return {row: record for row, record in rows.items() if record.get('status') == 'ok'}
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Single-flight deduplication of identical lookups
+
+Concurrent callers asking for the same key share one in-flight call, and
+later callers reuse the remembered result instead of fetching it again.
+"""
+
+import asyncio
+import copy
+import re
+import unicodedata
+
+
+def normalize_company_name(company_name):
+    """
+    Normalize a company name for deduplication: full-width characters are folded
+    to half-width (e.g. "（）" -> "()"), whitespace is removed and Latin letters
+    are lower-cased, so "京东方 (BOE)" and "京东方（boe）" share a key.
+    """
+    name = unicodedata.normalize('NFKC', str(company_name))
+    name = re.sub(r'\s+', '', name)
+    return name.lower()
+
+
+class SingleFlight:
+    """
+    Shares one in-flight coroutine per key and remembers finished results
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self._results = {}
+        self.requests = 0
+        self.executed = 0
+        self.shared = 0
+        self.reused = 0
+
+    async def do(self, key, func, remember_if=None):
+        """
+        Run func() once per key
+
+        Args:
+            key (str): Deduplication key
+            func (callable): Zero-argument function returning the coroutine to run
+            remember_if (callable): Predicate deciding whether a result is kept for
+                later callers; by default every result is kept
+        Returns:
+            The result of func(); callers other than the first get a deep copy
+        """
+        self.requests += 1
+
+        if key in self._results:
+            self.reused += 1
+            return copy.deepcopy(self._results[key])
+
+        if key in self._in_flight:
+            self.shared += 1
+            result = await asyncio.shield(self._in_flight[key])
+            return copy.deepcopy(result)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.executed += 1
+        try:
+            result = await func()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else is waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if remember_if is None or remember_if(result):
+                self._results[key] = result
+            return result
+        finally:
+            del self._in_flight[key]
+
+    @property
+    def saved(self):
+        """Number of calls avoided by sharing or reusing a result"""
+        return self.shared + self.reused
+
+    def reset(self):
+        """Forget remembered results and zero the counters"""
+        self._results.clear()
+        self.requests = 0
+        self.executed = 0
+        self.shared = 0
+        self.reused = 0
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'executed': self.executed,
+            'shared_in_flight': self.shared,
+            'reused': self.reused,
+            'saved': self.saved
+        }
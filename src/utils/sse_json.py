@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Incremental parsing of JSON answers streamed by the Metaso search API
+
+Metaso streams its answer as server-sent events; each "append-text" event
+carries the next fragment of the model's text. The answer we ask for is a
+single JSON object, often wrapped in ```json fences and sometimes followed by
+prose. The extractor below scans fragments as they arrive and reports the
+object as soon as its closing brace is seen, so callers can stop reading and
+close the stream instead of waiting for the rest of the answer.
+"""
+
+import json
+import re
+
+# Characters that change the scanner state; everything else is skipped over
+_SPECIAL = re.compile(r'[{}"\\]')
+
+
+def parse_sse_line(line):
+    """
+    Return the text fragment of an "append-text" SSE line, or None
+
+    Args:
+        line (bytes | str): One line of the event stream
+    """
+    if isinstance(line, bytes):
+        line = line.decode('utf-8')
+    if not line.startswith("data:") or line.startswith("data:[DONE]"):
+        return None
+    try:
+        event = json.loads(line[5:])  # Remove "data:" prefix
+    except json.JSONDecodeError:
+        return None
+    if isinstance(event, dict) and event.get("type") == "append-text":
+        return event.get("text", "")
+    return None
+
+
+class JSONObjectExtractor:
+    """
+    Finds the first complete top-level JSON object in text fed piece by piece
+    """
+
+    def __init__(self):
+        self._parts = []  # Every fragment seen, for the fallback parse
+        self._object_parts = None  # Fragments of the object being scanned
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.result = None
+
+    def feed(self, text):
+        """
+        Add the next fragment of the answer
+
+        Returns:
+            dict: The parsed object once it is complete, otherwise None
+        """
+        if self.result is not None or not text:
+            return self.result
+        self._parts.append(text)
+
+        pos = 0
+        if self._escape:
+            # The previous fragment ended with a backslash inside a string
+            self._escape = False
+            pos = 1
+        chunk_start = 0 if self._object_parts is None else None
+
+        while True:
+            match = _SPECIAL.search(text, pos)
+            if match is None:
+                break
+            char, pos = match.group(), match.start()
+
+            if self._in_string:
+                if char == '\\':
+                    if pos + 1 >= len(text):
+                        self._escape = True
+                    pos += 2
+                    continue
+                if char == '"':
+                    self._in_string = False
+            elif char == '"':
+                if self._object_parts is not None:
+                    self._in_string = True
+            elif char == '{':
+                if self._object_parts is None:
+                    self._object_parts = []
+                    chunk_start = pos
+                self._depth += 1
+            elif char == '}' and self._object_parts is not None:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._object_parts.append(text[chunk_start:pos + 1])
+                    candidate = "".join(self._object_parts)
+                    self._object_parts = None
+                    try:
+                        result = json.loads(candidate)
+                    except json.JSONDecodeError:
+                        result = None
+                    if isinstance(result, dict):
+                        self.result = result
+                        return result
+            pos += 1
+
+        if self._object_parts is not None:
+            self._object_parts.append(text[chunk_start or 0:])
+        return None
+
+    @property
+    def text(self):
+        """All text fed so far"""
+        return "".join(self._parts)
+
+    def finish(self):
+        """
+        Parse the whole answer when no complete object was found while streaming
+
+        Returns:
+            The parsed JSON value
+        Raises:
+            json.JSONDecodeError: The answer is not valid JSON; e.doc holds the raw text
+        """
+        if self.result is not None:
+            return self.result
+        full_response = self.text.strip()
+        if full_response.startswith('```json'):
+            full_response = full_response[7:]  # Remove ```json
+        if full_response.endswith('```'):
+            full_response = full_response[:-3]  # Remove ```
+        return json.loads(full_response.strip())
+
+
+def read_sse_json(lines):
+    """
+    Read SSE lines until the answer's JSON object is complete
+
+    Args:
+        lines (iterable): Lines of the event stream (bytes or str)
+    Returns:
+        The parsed answer; the remaining lines are left unread
+    Raises:
+        json.JSONDecodeError: The answer is not valid JSON
+    """
+    extractor = JSONObjectExtractor()
+    for line in lines:
+        fragment = parse_sse_line(line) if line else None
+        if fragment and extractor.feed(fragment) is not None:
+            return extractor.result
+    return extractor.finish()
+
+
+async def read_sse_json_async(lines):
+    """
+    Async version of read_sse_json for aiohttp response streams
+    """
+    extractor = JSONObjectExtractor()
+    async for line in lines:
+        fragment = parse_sse_line(line) if line else None
+        if fragment and extractor.feed(fragment) is not None:
+            return extractor.result
+    return extractor.finish()
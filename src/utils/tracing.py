@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Span tracing of a run, exported in Chrome trace format
+
+Code marks the work it does with spans:
+
+    with span('xiniu company/get_2', cat='xiniu', company_id=company_id):
+        ...
+
+Tracing is off by default: span() then returns a shared no-op context manager,
+so an instrumented call costs one function call and a global lookup. Once
+start_tracing(path) has been called, every span is kept as a complete ("X")
+event and stop_tracing() writes them as Chrome trace JSON, which opens in
+Perfetto (ui.perfetto.dev) or chrome://tracing.
+
+Each asyncio task (or thread, for synchronous code) gets its own track, so the
+API calls a company fires in parallel show up side by side, and the gaps
+between spans show where a task was idle. A span opened with label=... names
+the tracks of its task and of every task started inside it, e.g. all tracks of
+one company are named after its row.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+import weakref
+
+# Label given to the tracks of the current task and the tasks it starts
+_track_label = contextvars.ContextVar('trace_track_label', default=None)
+
+_tracer = None
+
+
+class _NoopSpan:
+    """Context manager used while tracing is off"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """
+    One traced operation; recorded as a complete event when it exits
+    """
+
+    def __init__(self, tracer, name, cat, label, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.label = label
+        self.args = args
+        self._label_token = None
+
+    def __enter__(self):
+        if self.label is not None:
+            self._label_token = _track_label.set(self.label)
+        self.tid = self.tracer.current_track()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.add_event(self.name, self.cat, self.tid, self.start, end, self.args)
+        if self._label_token is not None:
+            _track_label.reset(self._label_token)
+        return False
+
+    def set(self, **args):
+        """Attach more arguments to the span, e.g. a result found inside it"""
+        self.args.update(args)
+
+
+class Tracer:
+    """
+    Collects span events in memory until they are written
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._events = []
+        self._lock = threading.Lock()
+        self._task_tracks = weakref.WeakKeyDictionary()
+        self._thread_tracks = {}
+        self._next_tid = 1
+
+    def current_track(self):
+        """
+        Return the track ID of the running asyncio task, or of the thread outside of one
+        """
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        tracks = self._task_tracks if task is not None else self._thread_tracks
+        key = task if task is not None else threading.get_ident()
+        tid = tracks.get(key)
+        if tid is None:
+            with self._lock:
+                tid = tracks.get(key)
+                if tid is None:
+                    tid = self._next_tid
+                    self._next_tid += 1
+                    tracks[key] = tid
+                    if task is not None:
+                        name = task.get_name()
+                    else:
+                        name = threading.current_thread().name
+                    label = _track_label.get()
+                    self._events.append({
+                        'ph': 'M', 'name': 'thread_name', 'pid': self.pid, 'tid': tid,
+                        'args': {'name': f"{label} ({name})" if label else name}
+                    })
+        return tid
+
+    def add_event(self, name, cat, tid, start, end, args):
+        """Record a complete event; start and end are time.perf_counter() values"""
+        event = {
+            'ph': 'X', 'name': name, 'cat': cat, 'pid': self.pid, 'tid': tid,
+            'ts': round((start - self._origin) * 1e6, 1), 'dur': round((end - start) * 1e6, 1),
+        }
+        if args:
+            event['args'] = args
+        self._events.append(event)
+
+    def event_count(self):
+        return sum(1 for event in self._events if event['ph'] == 'X')
+
+    def write(self):
+        """
+        Write the events collected so far as Chrome trace JSON
+
+        Returns:
+            str: Path of the trace file
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        metadata = [{'ph': 'M', 'name': 'process_name', 'pid': self.pid, 'args': {'name': 'pipeline'}}]
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': metadata + list(self._events), 'displayTimeUnit': 'ms'},
+                      f, ensure_ascii=False, default=str)
+        return self.path
+
+
+def start_tracing(path):
+    """
+    Start recording spans for a trace written to path by stop_tracing()
+
+    Returns:
+        Tracer: The active tracer
+    """
+    global _tracer
+    _tracer = Tracer(path)
+    return _tracer
+
+
+def stop_tracing():
+    """
+    Stop tracing and write the trace file
+
+    Returns:
+        Tracer: The tracer that was stopped, or None if tracing was off
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.write()
+    return tracer
+
+
+def span(name, cat='pipeline', label=None, **args):
+    """
+    Trace the enclosed block as a span (a no-op unless tracing was started)
+
+    Args:
+        name (str): Span name shown in the trace viewer
+        cat (str): Category, e.g. 'xiniu' or 'metaso'
+        label (str): Name for the tracks of this task and the tasks started inside the span
+        **args: Arguments shown with the span
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP_SPAN
+    return Span(tracer, name, cat, label, args)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Read input workbooks once, with optional column and row projection
+
+pd.read_excel re-parses the whole .xlsx file on every call, so reading a
+workbook sheet by sheet costs one full parse per sheet. read_workbook parses
+all requested sheets in a single call, can restrict the columns (usecols) and
+the data rows (row_window) that are materialized, and keeps the parsed frames
+in memory keyed on the file's path, size and mtime, so repeated reads of an
+unchanged file are free. When python-calamine is installed it is used as the
+(much faster) parsing engine.
+"""
+
+import importlib.util
+import os
+import threading
+
+import pandas as pd
+
+# Parsed workbooks, keyed on (path, mtime, size, sheets, usecols, row_window)
+_cache = {}
+_cache_lock = threading.Lock()
+
+# Number of distinct reads kept in memory
+MAX_CACHED_READS = 16
+
+
+def excel_engine():
+    """
+    Return the pandas Excel engine to use: 'calamine' if python-calamine is
+    installed, otherwise None (pandas' default, openpyxl for .xlsx)
+    """
+    if importlib.util.find_spec('python_calamine') is not None:
+        return 'calamine'
+    return None
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+def sheet_names(path):
+    """
+    Return the sheet names of a workbook without parsing the cell data
+    """
+    key = ('sheet_names',) + _file_key(path)
+    with _cache_lock:
+        if key in _cache:
+            return list(_cache[key])
+    with pd.ExcelFile(path, engine=excel_engine()) as excel_file:
+        names = list(excel_file.sheet_names)
+    _remember(key, names)
+    return list(names)
+
+
+def _remember(key, value):
+    with _cache_lock:
+        if len(_cache) >= MAX_CACHED_READS:
+            _cache.pop(next(iter(_cache)))
+        _cache[key] = value
+
+
+def _row_kwargs(row_window):
+    """skiprows/nrows that keep the header line and the (start_row, end_row) data rows"""
+    if row_window is None:
+        return {}
+    start_row, end_row = row_window
+    return {'skiprows': range(1, start_row + 1), 'nrows': end_row - start_row}
+
+
+def read_workbook(path, sheets=None, usecols=None, row_window=None, use_cache=True):
+    """
+    Parse the requested sheets of a workbook in one pass
+
+    Args:
+        path (str): Excel file path
+        sheets (list): Sheet names to read, all sheets by default
+        usecols (list or callable): Columns to keep (names or positions, or a function
+            called with each column name), all by default
+        row_window (tuple or dict): (start_row, end_row) of 0-based data rows to keep,
+            or {sheet: (start_row, end_row)} for a window per sheet; the returned
+            frames keep those row numbers as their index
+        use_cache (bool): Reuse the frames of an earlier read of the unchanged file
+    Returns:
+        dict: {sheet name: pd.DataFrame}; each call gets its own copies
+    """
+    sheet_key = tuple(sheets) if sheets is not None else None
+    cols_key = tuple(usecols) if isinstance(usecols, (list, tuple)) else usecols
+    if isinstance(row_window, dict):
+        window_key = tuple(sorted((sheet, tuple(window)) for sheet, window in row_window.items()))
+    else:
+        window_key = tuple(row_window) if row_window is not None else None
+    key = _file_key(path) + (sheet_key, cols_key, window_key)
+
+    frames = None
+    if use_cache:
+        with _cache_lock:
+            frames = _cache.get(key)
+
+    if frames is None:
+        usecols = list(usecols) if isinstance(usecols, (list, tuple)) else usecols
+        if isinstance(row_window, dict):
+            # One open workbook, each sheet parsed with its own window
+            frames = {}
+            with pd.ExcelFile(path, engine=excel_engine()) as excel_file:
+                for sheet in (sheets if sheets is not None else excel_file.sheet_names):
+                    window = row_window.get(sheet)
+                    frames[sheet] = excel_file.parse(sheet, usecols=usecols, **_row_kwargs(window))
+                    if window is not None:
+                        frames[sheet].index = range(window[0], window[0] + len(frames[sheet]))
+        else:
+            frames = pd.read_excel(path, sheet_name=list(sheets) if sheets is not None else None,
+                                   usecols=usecols, engine=excel_engine(), **_row_kwargs(row_window))
+            if row_window is not None:
+                for df in frames.values():
+                    df.index = range(row_window[0], row_window[0] + len(df))
+        if use_cache:
+            _remember(key, frames)
+
+    return {name: df.copy() for name, df in frames.items()}
+
+
+def clear_cache():
+    """Drop all cached workbooks"""
+    with _cache_lock:
+        _cache.clear()